@@ -6,6 +6,7 @@ and exposes the app instance for Gunicorn/WSGI servers.
 
 import os
 import sqlite3
+from datetime import timedelta
 from flask import Flask
 from dotenv import load_dotenv
 
@@ -22,6 +23,10 @@ def create_app(test_config=None):
     """
     app = Flask(__name__, instance_relative_config=True)
     
+    # Serialize JSON with the fast provider (orjson when installed)
+    from app.serializers import FastJSONProvider, compress_response
+    app.json = FastJSONProvider(app)
+    
     # Load environment variables
     load_dotenv()
     
@@ -31,6 +36,29 @@ def create_app(test_config=None):
         DATABASE=os.getenv('DATABASE_URL', 'instance/miniban.sqlite'),  # Use Supabase or fallback to SQLite
         SUPABASE_URL=os.getenv('SUPABASE_URL'),
         SUPABASE_KEY=os.getenv('SUPABASE_KEY'),
+        # Due date scheduler (SQLite only); off unless explicitly enabled
+        DUE_SCHEDULER_ENABLED=os.getenv('DUE_SCHEDULER_ENABLED', 'false').lower() == 'true',
+        DUE_REMINDER_LEAD_MINUTES=int(os.getenv('DUE_REMINDER_LEAD_MINUTES', '1440')),
+        DUE_WEBHOOK_URL=os.getenv('DUE_WEBHOOK_URL'),
+        # Responses smaller than this many bytes are not compressed
+        COMPRESS_MIN_SIZE=int(os.getenv('COMPRESS_MIN_SIZE', '1024')),
+        # Done tasks completed this many days ago are archived by default (SQLite only)
+        ARCHIVE_AFTER_DAYS=int(os.getenv('ARCHIVE_AFTER_DAYS', '30')),
+        # Request profiling: a fraction of requests to profile, plus any request
+        # sending a token from `flask profile token` in X-Profile
+        PROFILE_SAMPLE_RATE=float(os.getenv('PROFILE_SAMPLE_RATE', '0')),
+        PROFILE_TOKEN_MAX_AGE=int(os.getenv('PROFILE_TOKEN_MAX_AGE', '3600')),
+        PROFILE_INTERVAL_MS=float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+        PROFILE_KEEP=int(os.getenv('PROFILE_KEEP', '50')),
+        # SQLite statements slower than this are logged with their query plan
+        SLOW_QUERY_MS=float(os.getenv('SLOW_QUERY_MS', '100')),
+        # Write admission control per worker: concurrent writes (0 disables it),
+        # and waiting requests and seconds of waiting allowed per priority class
+        ADMISSION_CONCURRENCY=int(os.getenv('ADMISSION_CONCURRENCY', '4')),
+        ADMISSION_QUEUE_INTERACTIVE=int(os.getenv('ADMISSION_QUEUE_INTERACTIVE', '32')),
+        ADMISSION_QUEUE_BULK=int(os.getenv('ADMISSION_QUEUE_BULK', '4')),
+        ADMISSION_MAX_WAIT_INTERACTIVE=float(os.getenv('ADMISSION_MAX_WAIT_INTERACTIVE', '5')),
+        ADMISSION_MAX_WAIT_BULK=float(os.getenv('ADMISSION_MAX_WAIT_BULK', '10')),
     )
     
     # Log configuration for debugging
@@ -51,6 +79,25 @@ def create_app(test_config=None):
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
     
+    # Compress large responses with brotli/gzip
+    app.after_request(compress_response)
+    
+    # Fingerprinted, precompressed CSS/JS bundles for the board UI
+    from app import assets
+    assets.init_app(app)
+    
+    # Opt-in request profiling (pstats + collapsed stacks in instance/profiles)
+    from app import profiling
+    profiling.init_app(app)
+    
+    # Cycle time, WIP and cumulative flow from the status history (needs NumPy)
+    from app import analytics
+    analytics.init_app(app)
+    
+    # Bounded, prioritized queues in front of the mutating routes
+    from app import admission
+    admission.init_app(app)
+    
     # Initialize the database and task DAO
     from app.dao.database_factory import DatabaseFactory, SQLiteTaskDAO, SupabaseTaskDAO
     
@@ -61,7 +108,7 @@ def create_app(test_config=None):
     if isinstance(db_connection, sqlite3.Connection):
         # Get the database path from the connection
         db_path = os.getenv('DATABASE', 'instance/miniban.sqlite')
-        task_dao = SQLiteTaskDAO(db_path)
+        task_dao = SQLiteTaskDAO(db_path, slow_query_ms=app.config['SLOW_QUERY_MS'])
         print("📊 Using SQLite TaskDAO")
     else:
         # Supabase client
@@ -72,6 +119,27 @@ def create_app(test_config=None):
     app.extensions['task_dao'] = task_dao
     app.extensions['db_connection'] = db_connection
     
+    # Register CLI commands (flask tasks import/export)
+    from app import cli
+    cli.init_app(app)
+    
+    # Start the due date scheduler; every worker runs one, but only the
+    # worker holding the database lease emits events
+    if app.config['DUE_SCHEDULER_ENABLED'] and isinstance(task_dao, SQLiteTaskDAO):
+        from app.scheduler import DueDateScheduler, WebhookNotifier
+        
+        scheduler = DueDateScheduler(
+            task_dao.db_path,
+            reminder_lead=timedelta(minutes=app.config['DUE_REMINDER_LEAD_MINUTES'])
+        )
+        scheduler.subscribe(lambda event: app.logger.info("⏰ %s: task %s (%s)",
+                                                          event['type'], event['task_id'], event['due_date']))
+        if app.config['DUE_WEBHOOK_URL']:
+            scheduler.subscribe(WebhookNotifier(app.config['DUE_WEBHOOK_URL']))
+        scheduler.start()
+        app.extensions['due_scheduler'] = scheduler
+        print("⏰ Due date scheduler started")
+    
     return app
 
 
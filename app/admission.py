@@ -0,0 +1,268 @@
+"""
+Admission control for the write path.
+Mutating routes run in a fixed number of write slots per worker process.
+Requests beyond that wait in a bounded queue for their class, interactive
+edits ahead of bulk and admin operations, and are turned away with 503 and
+Retry-After when their queue is full or when they would not get a slot
+before their deadline: on arrival, judged by the work queued ahead of them
+and the average time a write holds a slot, or once they have waited that
+long. Bulk operations never hold the last slot, so a long import cannot
+lock interactive edits out. Only writes ever wait here, so the worker's
+remaining threads keep serving reads while writes pile up behind SQLite's
+write lock. With a single-threaded (sync) worker nothing ever waits, so
+this only takes effect with threaded workers such as gunicorn's gthread.
+"""
+
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import current_app, jsonify
+
+# Request classes, highest priority first
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+CLASSES = (INTERACTIVE, BULK)
+
+# Weight of the newest sample in the average time a write holds a slot
+_SMOOTHING = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a write is not admitted; `retry_after` is in whole seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('event', 'admitted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.admitted = False
+
+
+class AdmissionController:
+    """
+    A priority semaphore with bounded, deadline-aware queues.
+
+    A finishing write hands its slot straight to the first waiter of the
+    highest-priority class that may take it, so arrivals cannot overtake
+    queued requests. BULK writes are capped at `bulk_slots`, one fewer than
+    the slot count, so one slot is always kept for INTERACTIVE ones; a free
+    slot can therefore only mean that no interactive request is waiting.
+    """
+
+    def __init__(self, concurrency=4, queue_limits=None, max_waits=None):
+        """
+        Args:
+            concurrency (int, optional): Writes allowed to run at once.
+            queue_limits (dict, optional): Waiting requests allowed per class.
+            max_waits (dict, optional): Seconds a request of each class may wait for a slot.
+        """
+        self.concurrency = concurrency
+        # With a single slot, bulk writes have to share it
+        self.bulk_slots = max(1, concurrency - 1)
+        self.queue_limits = {INTERACTIVE: 32, BULK: 4, **(queue_limits or {})}
+        self.max_waits = {INTERACTIVE: 5.0, BULK: 10.0, **(max_waits or {})}
+        self._lock = threading.Lock()
+        self._queues = {request_class: deque() for request_class in CLASSES}
+        self._running = {request_class: 0 for request_class in CLASSES}
+        self._service_time = {request_class: None for request_class in CLASSES}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start counting admissions, rejections and waits from zero."""
+        with self._lock:
+            self._stats = {
+                request_class: {"admitted": 0, "queued": 0, "rejected_queue_full": 0,
+                                "rejected_deadline": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0,
+                                "peak_waiting": len(self._queues[request_class])}
+                for request_class in CLASSES
+            }
+
+    def _expected_wait(self, request_class):
+        """Estimate the wait for a slot of a request arriving now; call with the lock held."""
+        work = 0.0
+        for queued_class in CLASSES:
+            # Queued requests of this class and of higher ones are served first
+            work += len(self._queues[queued_class]) * (self._service_time[queued_class] or 0.0)
+            if queued_class == request_class:
+                break
+        # Running writes are on average halfway done
+        work += sum(self._running[running_class] * (self._service_time[running_class] or 0.0)
+                    for running_class in CLASSES) / 2
+        return work / self._slots(request_class)
+
+    def _slots(self, request_class):
+        """The number of slots a class may hold at once."""
+        return self.bulk_slots if request_class == BULK else self.concurrency
+
+    def _may_run(self, request_class):
+        """Tell whether a request of a class may take a free slot now; call with the lock held."""
+        return (sum(self._running.values()) < self.concurrency
+                and self._running[request_class] < self._slots(request_class))
+
+    def _reject(self, request_class, reason, expected_wait):
+        self._stats[request_class][f"rejected_{reason}"] += 1
+        return Overloaded(reason, max(1, math.ceil(expected_wait)))
+
+    def acquire(self, request_class):
+        """
+        Wait for a write slot.
+
+        Args:
+            request_class (str): INTERACTIVE or BULK.
+
+        Returns:
+            float: The monotonic time the slot was granted, for release().
+
+        Raises:
+            Overloaded: If the class's queue is full, or no slot is expected
+                or turns out to be free within the class's maximum wait.
+        """
+        arrived = time.monotonic()
+        max_wait = self.max_waits[request_class]
+        queue = self._queues[request_class]
+        with self._lock:
+            stats = self._stats[request_class]
+            # A waiting request of the class would have been handed any slot it may take
+            if not queue and self._may_run(request_class):
+                self._running[request_class] += 1
+                stats["admitted"] += 1
+                return arrived
+            expected_wait = self._expected_wait(request_class)
+            if len(queue) >= self.queue_limits[request_class]:
+                raise self._reject(request_class, 'queue_full', expected_wait)
+            if expected_wait > max_wait:
+                raise self._reject(request_class, 'deadline', expected_wait)
+            waiter = _Waiter()
+            queue.append(waiter)
+            stats["queued"] += 1
+            stats["peak_waiting"] = max(stats["peak_waiting"], len(queue))
+
+        waiter.event.wait(max_wait)
+        with self._lock:
+            # The slot may have been handed over between the timeout and taking the lock
+            if not waiter.admitted:
+                queue.remove(waiter)
+                raise self._reject(request_class, 'deadline', self._expected_wait(request_class))
+            stats = self._stats[request_class]
+            granted = time.monotonic()
+            stats["admitted"] += 1
+            stats["waited"] += 1
+            stats["wait_total"] += granted - arrived
+            stats["wait_max"] = max(stats["wait_max"], granted - arrived)
+        return granted
+
+    def release(self, request_class, granted):
+        """
+        Give up a write slot, handing it to the next waiter if there is one.
+
+        Args:
+            request_class (str): The class the slot was acquired for.
+            granted (float): What acquire() returned.
+        """
+        elapsed = time.monotonic() - granted
+        with self._lock:
+            average = self._service_time[request_class]
+            self._service_time[request_class] = (
+                elapsed if average is None else average + _SMOOTHING * (elapsed - average)
+            )
+            self._running[request_class] -= 1
+            for queued_class in CLASSES:
+                if self._queues[queued_class] and self._may_run(queued_class):
+                    waiter = self._queues[queued_class].popleft()
+                    waiter.admitted = True
+                    self._running[queued_class] += 1
+                    waiter.event.set()
+                    break
+
+    @contextmanager
+    def admit(self, request_class):
+        """Hold a write slot for the duration of a with block."""
+        granted = self.acquire(request_class)
+        try:
+            yield
+        finally:
+            self.release(request_class, granted)
+
+    def stats(self):
+        """
+        Get the current load and the counts since the last reset.
+
+        Returns:
+            dict: The slot count and running writes, and per class the slots it may hold, its limits,
+            current and peak queue length, admissions, rejections by reason,
+            mean and max queue wait and average slot time in milliseconds.
+        """
+        with self._lock:
+            classes = {}
+            for request_class in CLASSES:
+                stats = self._stats[request_class]
+                service_time = self._service_time[request_class]
+                classes[request_class] = {
+                    "slots": self._slots(request_class),
+                    "queue_limit": self.queue_limits[request_class],
+                    "max_wait_ms": round(self.max_waits[request_class] * 1000),
+                    "running": self._running[request_class],
+                    "waiting": len(self._queues[request_class]),
+                    "peak_waiting": stats["peak_waiting"],
+                    "admitted": stats["admitted"],
+                    "queued": stats["queued"],
+                    "rejected": {"queue_full": stats["rejected_queue_full"],
+                                 "deadline": stats["rejected_deadline"]},
+                    "wait_ms": {
+                        "mean": round(stats["wait_total"] * 1000 / stats["waited"], 2) if stats["waited"] else None,
+                        "max": round(stats["wait_max"] * 1000, 2),
+                    },
+                    "service_ms": round(service_time * 1000, 2) if service_time is not None else None,
+                }
+            return {
+                "concurrency": self.concurrency,
+                "running": sum(self._running.values()),
+                "classes": classes,
+            }
+
+
+def limit(request_class):
+    """
+    Run a view in a write slot of the application's admission controller.
+
+    Requests that are not admitted get `503` with a Retry-After header.
+    Without a controller (ADMISSION_CONCURRENCY=0) the view runs unguarded.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = current_app.extensions.get('admission')
+            if controller is None:
+                return view(*args, **kwargs)
+            try:
+                with controller.admit(request_class):
+                    return view(*args, **kwargs)
+            except Overloaded as e:
+                return jsonify({
+                    "error": "Too many changes in progress, try again later",
+                    "reason": e.reason
+                }), 503, {"Retry-After": str(e.retry_after)}
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Attach the write admission controller to the application."""
+    concurrency = app.config['ADMISSION_CONCURRENCY']
+    app.extensions['admission'] = AdmissionController(
+        concurrency,
+        queue_limits={INTERACTIVE: app.config['ADMISSION_QUEUE_INTERACTIVE'],
+                      BULK: app.config['ADMISSION_QUEUE_BULK']},
+        max_waits={INTERACTIVE: app.config['ADMISSION_MAX_WAIT_INTERACTIVE'],
+                   BULK: app.config['ADMISSION_MAX_WAIT_BULK']},
+    ) if concurrency > 0 else None
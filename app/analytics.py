@@ -0,0 +1,242 @@
+"""
+Flow analytics over task status transitions.
+Every status change is recorded in the task_transitions table (SQLite
+only). A board's transitions are loaded into NumPy arrays, incrementally
+as new ones arrive, and the flow metrics are computed over whole arrays
+at once: cycle and lead time percentiles, WIP and the cumulative flow
+diagram. Results are cached per board version. NumPy is optional; without
+it the analytics endpoint answers 501.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from app.models import TaskStatus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Statuses are stored as their position here; REMOVED marks a deleted task
+STATUSES = tuple(status.value for status in TaskStatus)
+REMOVED = -1
+_IN_PROGRESS = STATUSES.index(TaskStatus.IN_PROGRESS.value)
+_DONE = STATUSES.index(TaskStatus.DONE.value)
+
+# Spacing of the WIP and cumulative flow points, in seconds
+INTERVALS = {'day': 86400, 'hour': 3600}
+MAX_POINTS = 10_000
+
+PERCENTILES = (50, 85, 95)
+
+
+def _time_stats(seconds):
+    """Summarize durations in seconds as hours."""
+    if not len(seconds):
+        return {"count": 0, "mean": None, **{f"p{p}": None for p in PERCENTILES}}
+    hours = seconds / 3600
+    values = np.percentile(hours, PERCENTILES)
+    return {
+        "count": int(len(hours)),
+        "mean": round(float(hours.mean()), 2),
+        **{f"p{p}": round(float(value), 2) for p, value in zip(PERCENTILES, values)},
+    }
+
+
+def compute_flow(task_ids, statuses, times, start, end, step):
+    """
+    Compute flow metrics from a board's transitions.
+
+    A task's lead time runs from its first transition (creation) to its
+    last one into Done, its cycle time from the first time it entered In
+    Progress (or Done, if it skipped In Progress) to that same point. Only
+    tasks that are Done now, or were deleted straight from Done (as the
+    Done cleanup does), and finished inside the window are counted.
+
+    Status counts are sampled at the end of every `step` seconds from
+    `start` to `end`: each transition is +1 for the status entered and -1
+    for the one left, so the counts are a running sum of bucketed deltas.
+
+    Args:
+        task_ids (numpy.ndarray): Task of each transition, in the order they were recorded.
+        statuses (numpy.ndarray): Status code entered (index into STATUSES, or REMOVED).
+        times (numpy.ndarray): Unix time of each transition.
+        start (int): Start of the window, aligned to `step`.
+        end (int): End of the window, aligned to `step`.
+        step (int): Seconds between points.
+
+    Returns:
+        dict: `cycle_time` and `lead_time` summaries in hours, the point
+        `timestamps`, `wip` (tasks In Progress) and `cumulative_flow` (tasks
+        per status) at each point.
+    """
+    points = np.arange(start + step, end + 1, step, dtype=np.int64)
+    counts = np.zeros((len(points), len(STATUSES)), dtype=np.int64)
+    cycle = lead = np.empty(0, dtype=np.int64)
+
+    if len(task_ids):
+        # A stable sort by task keeps each task's transitions in recorded order
+        order = np.argsort(task_ids, kind='stable')
+        task, status, at = task_ids[order], statuses[order], times[order]
+        first = np.empty(len(task), dtype=bool)
+        first[0] = True
+        np.not_equal(task[1:], task[:-1], out=first[1:])
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:], len(task)) - 1
+
+        # A task's completion is its last transition, or the one before a final removal
+        removed = (status[ends] == REMOVED) & (ends > starts)
+        finished = np.where(removed, ends - 1, ends)
+        done = (status[finished] == _DONE) & (at[finished] >= start)
+        done_at = at[finished][done]
+        entered_work = (status == _IN_PROGRESS) | (status == _DONE)
+        started = np.minimum.reduceat(np.where(entered_work, at, np.iinfo(np.int64).max), starts)
+        cycle = done_at - started[done]
+        lead = done_at - at[starts][done]
+
+        # The status each transition left; a task's first transition leaves none
+        previous = np.empty_like(status)
+        previous[1:] = status[:-1]
+        previous[first] = REMOVED
+        # Each transition shows from the first point at or after it
+        bucket = np.searchsorted(points, at, side='left')
+        size = len(points) * len(STATUSES)
+        entered = (status != REMOVED) & (bucket < len(points))
+        left = (previous != REMOVED) & (bucket < len(points))
+        deltas = (np.bincount(bucket[entered] * len(STATUSES) + status[entered], minlength=size)
+                  - np.bincount(bucket[left] * len(STATUSES) + previous[left], minlength=size))
+        counts = np.cumsum(deltas.reshape(len(points), len(STATUSES)), axis=0)
+
+    timestamps = np.datetime_as_string(points.astype('datetime64[s]'), unit='s')
+    return {
+        "cycle_time": _time_stats(cycle),
+        "lead_time": _time_stats(lead),
+        "timestamps": [timestamp + 'Z' for timestamp in timestamps.tolist()],
+        "wip": counts[:, _IN_PROGRESS].tolist(),
+        "cumulative_flow": {name: counts[:, code].tolist() for code, name in enumerate(STATUSES)},
+    }
+
+
+class TransitionLog:
+    """A board's transitions as NumPy arrays, in recorded order; extended, never modified."""
+
+    def __init__(self, version=0, last_id=0, task_ids=None, statuses=None, times=None):
+        self.version = version
+        self.last_id = last_id
+        self.task_ids = np.empty(0, dtype=np.int64) if task_ids is None else task_ids
+        self.statuses = np.empty(0, dtype=np.int8) if statuses is None else statuses
+        self.times = np.empty(0, dtype=np.int64) if times is None else times
+
+    def extend(self, version, rows):
+        """
+        Get a log with more transitions appended.
+
+        Args:
+            version (int): The board version the rows were read at.
+            rows (list): (id, task_id, status, at) rows in ID order.
+
+        Returns:
+            TransitionLog: A new log; this one is left as it is for readers still using it.
+        """
+        if not rows:
+            return TransitionLog(version, self.last_id, self.task_ids, self.statuses, self.times)
+        # One flat pass over the rows instead of a Python object per value
+        columns = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=4 * len(rows)).reshape(-1, 4)
+        return TransitionLog(
+            version,
+            int(columns[-1, 0]),
+            np.concatenate((self.task_ids, columns[:, 1])),
+            np.concatenate((self.statuses, columns[:, 2].astype(np.int8))),
+            np.concatenate((self.times, columns[:, 3])),
+        )
+
+
+class FlowAnalytics:
+    """
+    Flow metrics per board, from transition logs kept in memory.
+
+    Transitions are only ever appended, so each request reads just the
+    ones recorded since the last (usually none). Results are cached by
+    board version, window and point interval, and by the current point, so
+    a board nobody changes is recomputed once per interval at most.
+    """
+
+    def __init__(self, max_boards=16, max_results=64):
+        """
+        Args:
+            max_boards (int, optional): Boards whose transition logs are kept.
+            max_results (int, optional): Computed results kept.
+        """
+        self.max_boards = max_boards
+        self.max_results = max_results
+        self._logs = OrderedDict()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def flow(self, task_dao, board_id, days=90, interval='day', now=None):
+        """
+        Get a board's flow metrics over the last `days` days.
+
+        Args:
+            task_dao: A DAO with get_transitions().
+            board_id (int): The board.
+            days (int, optional): Window length in days. Defaults to 90.
+            interval (str, optional): 'day' or 'hour' between points. Defaults to 'day'.
+            now (float, optional): Current Unix time, for tests.
+
+        Returns:
+            dict: The metrics from compute_flow() plus the board `version`, or None if the board does not exist.
+
+        Raises:
+            ValueError: If the interval is unknown or the window has too many points.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+        step = INTERVALS[interval]
+        if days < 1 or days * 86400 // step > MAX_POINTS:
+            raise ValueError(f"days must be between 1 and {MAX_POINTS * step // 86400} for interval {interval}")
+        now = time.time() if now is None else now
+        end = (int(now) // step + 1) * step
+        start = end - days * 86400
+
+        # Reading and appending under the lock keeps concurrent requests from appending the same rows twice
+        with self._lock:
+            log = self._logs.get(board_id)
+            if log is None:
+                log = TransitionLog()
+            version, rows = task_dao.get_transitions(board_id, after_id=log.last_id)
+            if version is None:
+                self._logs.pop(board_id, None)
+                return None
+            if version < log.version:
+                # The database was replaced; start over
+                version, rows = task_dao.get_transitions(board_id)
+                log = TransitionLog()
+            log = log.extend(version, rows)
+            self._logs[board_id] = log
+            self._logs.move_to_end(board_id)
+            while len(self._logs) > self.max_boards:
+                self._logs.popitem(last=False)
+
+            key = (board_id, version, days, interval, end)
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        result = compute_flow(log.task_ids, log.statuses, log.times, start, end, step)
+        result = {"board_id": board_id, "version": version, "days": days, "interval": interval,
+                  "unit": "hours", **result}
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+
+def init_app(app):
+    """Attach the flow analytics cache to the application."""
+    app.extensions['flow_analytics'] = FlowAnalytics() if np is not None else None
@@ -0,0 +1,318 @@
+"""
+Static asset pipeline for the board UI.
+The stylesheet and script in app/static are minified, fingerprinted with a
+hash of their content and precompressed with gzip and brotli when the app
+starts. Their URLs change whenever their content does, so browsers may
+cache them forever. The /kanban page embeds the board's tasks, so it is
+rendered once per board version and revalidated with an ETag.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app, render_template, request, url_for
+from jinja2.utils import htmlsafe_json_dumps
+
+from app.serializers import brotli, choose_encoding
+
+# Bundles served under /assets, by logical name, with their source under app/static
+BUNDLES = {
+    'kanban.css': 'css/kanban.css',
+    'kanban.js': 'js/kanban.js',
+}
+
+MIMETYPES = {
+    '.css': 'text/css',
+    '.js': 'application/javascript',
+    '.html': 'text/html',
+}
+
+# Fingerprinted URLs never change content, so they can be cached for a year
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def minify_css(text):
+    """Strip comments and insignificant whitespace from a stylesheet."""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,])\s*', r'\1', text)
+    # Only the space after a colon goes: the one before can be a descendant combinator
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+# A '/' after one of these (or at the start) begins a regex literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def _literal_line_breaks(text):
+    """
+    Find the line breaks that are part of a string or template literal.
+
+    A small scanner over the script's strings, template literals (with
+    nested ${...} expressions), comments and regex literals. Only line
+    breaks outside all of them may have whitespace removed around them.
+
+    Returns:
+        list: One flag per line break, in order; True if it is inside a literal.
+    """
+    flags = []
+    # Innermost context last: 'template', or the brace depth of code (the outermost code never closes)
+    stack = [0]
+    previous = ''
+    i, length = 0, len(text)
+    while i < length:
+        char = text[i]
+        if stack[-1] == 'template':
+            if char == '\\':
+                if text[i + 1:i + 2] == '\n':
+                    flags.append(True)
+                i += 2
+                continue
+            if char == '`':
+                stack.pop()
+                previous = '`'
+            elif text.startswith('${', i):
+                stack.append(0)
+                i += 1
+            elif char == '\n':
+                flags.append(True)
+            i += 1
+            continue
+
+        if char == '\n':
+            flags.append(False)
+        elif char in '\'"':
+            i += 1
+            while i < length and text[i] != char:
+                if text[i] == '\\':
+                    # A backslash before a line break continues the string onto the next line
+                    if text[i + 1:i + 2] == '\n':
+                        flags.append(True)
+                    i += 1
+                elif text[i] == '\n':
+                    # Unterminated; the line break is handled as code
+                    i -= 1
+                    break
+                i += 1
+            previous = char
+        elif char == '`':
+            stack.append('template')
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            flags.extend(False for _ in range(text.count('\n', i, end)))
+            i = end
+            continue
+        elif char == '/' and (not previous or previous in _REGEX_PRECEDERS):
+            in_class = False
+            i += 1
+            while i < length and text[i] != '\n' and (in_class or text[i] != '/'):
+                if text[i] == '\\':
+                    i += 1
+                elif text[i] in '[]':
+                    in_class = text[i] == '['
+                i += 1
+            if i < length and text[i] == '\n':
+                # Not a regex after all; the line break is handled as code
+                i -= 1
+            previous = '/'
+        elif char == '{':
+            stack[-1] += 1
+        elif char == '}':
+            if stack[-1] == 0 and len(stack) > 1:
+                # The end of a ${...} expression: back inside its template literal
+                stack.pop()
+            else:
+                stack[-1] -= 1
+        if not char.isspace() and char not in '\'"/':
+            previous = char
+        i += 1
+    return flags
+
+
+def minify_js(text):
+    """
+    Strip indentation, blank lines and whole-line comments from a script.
+
+    Line breaks are kept, so automatic semicolon insertion behaves exactly
+    as in the source; gzip and brotli remove most of what is left. Lines
+    that begin or end inside a multi-line template literal or continued
+    string keep their whitespace on that side, and are never dropped.
+    """
+    lines = text.split('\n')
+    breaks = _literal_line_breaks(text)
+    kept = []
+    for number, line in enumerate(lines):
+        starts_inside = number > 0 and breaks[number - 1]
+        ends_inside = number < len(breaks) and breaks[number]
+        if not starts_inside:
+            line = line.lstrip()
+        if not ends_inside:
+            line = line.rstrip()
+        if starts_inside or ends_inside or (line and not line.startswith('//')):
+            kept.append(line)
+    return '\n'.join(kept)
+
+
+class Asset:
+    """A built asset: its content, ETag and precompressed variants."""
+
+    def __init__(self, name, content, mimetype, effort='max'):
+        """
+        Args:
+            name (str): The logical name, e.g. "kanban.js".
+            content (str): The built content.
+            mimetype (str): The content type to serve it with.
+            effort (str, optional): 'max' for assets built once, 'fast' for pages
+                rebuilt as data changes (the levels compress_response uses).
+        """
+        self.mimetype = mimetype
+        self.body = content.encode('utf-8')
+        self.digest = hashlib.sha256(self.body).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        self.filename = f"{stem}.{self.digest}{ext}"
+        gzip_level, brotli_quality = (9, 11) if effort == 'max' else (6, 5)
+        self.variants = {
+            None: self.body,
+            'gzip': gzip.compress(self.body, compresslevel=gzip_level, mtime=0),
+        }
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(self.body, quality=brotli_quality)
+
+    def response(self, cache_control):
+        """
+        Serve the asset in the best encoding the client accepts, or 304 if its copy is current.
+
+        Args:
+            cache_control (str): The Cache-Control header value.
+
+        Returns:
+            Response: The response.
+        """
+        headers = {'ETag': f'"{self.digest}"', 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+        if request.if_none_match.contains_weak(self.digest):
+            return current_app.response_class(status=304, headers=headers)
+
+        encoding = choose_encoding()
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return current_app.response_class(self.variants[encoding], mimetype=self.mimetype, headers=headers)
+
+
+class AssetPipeline:
+    """Builds the bundles and the rendered board pages, and keeps them in memory."""
+    
+    # Boards whose rendered page is kept
+    PAGE_CACHE_SIZE = 16
+
+    def __init__(self, app):
+        """
+        Args:
+            app (Flask): The application whose static folder holds the sources.
+        """
+        self.app = app
+        self._bundles = {}
+        self._by_filename = {}
+        self._mtimes = None
+        # board_id -> (board version, rendered page), most recently used last
+        self._pages = OrderedDict()
+        self._pages_lock = threading.Lock()
+
+    def _sources(self):
+        return {name: os.path.join(self.app.static_folder, path) for name, path in BUNDLES.items()}
+
+    def build(self):
+        """(Re)build every bundle from its source and forget the rendered pages."""
+        bundles = {}
+        for name, path in self._sources().items():
+            with open(path, encoding='utf-8') as f:
+                source = f.read()
+            ext = os.path.splitext(name)[1]
+            content = minify_css(source) if ext == '.css' else minify_js(source)
+            bundles[name] = Asset(name, content, MIMETYPES[ext])
+        self._bundles = bundles
+        self._by_filename = {asset.filename: asset for asset in bundles.values()}
+        with self._pages_lock:
+            self._pages.clear()
+
+    def _refresh(self):
+        """Build on first use, and again in debug mode whenever a source file changes."""
+        if self._mtimes is not None and not self.app.debug:
+            return
+        mtimes = {path: os.path.getmtime(path) for path in self._sources().values()}
+        if mtimes != self._mtimes:
+            self.build()
+            self._mtimes = mtimes
+
+    def url(self, name):
+        """Get the fingerprinted URL of a bundle."""
+        self._refresh()
+        return url_for('main.serve_asset', filename=self._bundles[name].filename)
+
+    def get(self, filename):
+        """Get a bundle by fingerprinted filename, or None if it is not current."""
+        self._refresh()
+        return self._by_filename.get(filename)
+
+    def board_page(self, task_dao, board_id):
+        """
+        Get the board page with the board's tasks embedded as a JSON bootstrap blob.
+        
+        Pages are cached per board and reused while the board's version is
+        unchanged; every task mutation bumps it, so a stale page is never
+        served. Backends whose snapshots carry no version, and debug mode
+        (where templates reload), render the page on every request.
+        
+        Args:
+            task_dao: The task DAO to read the board from.
+            board_id (int): The board to render.
+        
+        Returns:
+            Asset: The rendered page.
+        """
+        self._refresh()
+        cacheable = hasattr(task_dao, 'get_task_changes') and not self.app.debug
+        if cacheable:
+            board = task_dao.get_board(board_id)
+            with self._pages_lock:
+                cached = self._pages.get(board_id)
+                if board and cached and cached[0] == board['version']:
+                    self._pages.move_to_end(board_id)
+                    return cached[1]
+            # The page is keyed by the version its tasks were read at, which may be newer
+            snapshot = task_dao.get_task_changes(board_id)
+            version, tasks = (snapshot['version'], snapshot['changed']) if snapshot else (None, [])
+        else:
+            version, tasks = None, task_dao.get_all_tasks(board_id)
+        
+        # Escaped for a <script> element; the tojson filter would pass options that bypass orjson
+        bootstrap = htmlsafe_json_dumps(
+            {"board_id": board_id, "version": version, "tasks": tasks}, dumps=self.app.json.dumps
+        )
+        page = Asset('kanban.html', render_template('kanban.html', bootstrap=bootstrap), MIMETYPES['.html'],
+                     effort='fast')
+        if cacheable and version is not None:
+            with self._pages_lock:
+                self._pages[board_id] = (version, page)
+                self._pages.move_to_end(board_id)
+                while len(self._pages) > self.PAGE_CACHE_SIZE:
+                    self._pages.popitem(last=False)
+        return page
+
+
+def init_app(app):
+    """Attach an asset pipeline to the application and expose `asset_url` to templates."""
+    pipeline = AssetPipeline(app)
+    app.extensions['assets'] = pipeline
+    app.jinja_env.globals['asset_url'] = pipeline.url
+    # Build now rather than in the first request
+    pipeline._refresh()
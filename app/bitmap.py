@@ -0,0 +1,288 @@
+"""
+Roaring-style compressed bitmaps of task IDs.
+A bitmap splits its values (non-negative integers) by their high bits into
+containers of 65536 values each, keyed by value >> 16. Sparse containers
+are sorted arrays of the low 16 bits; a container holding more than
+ARRAY_LIMIT values becomes a 65536-bit set stored in a Python int, whose
+& and | run in C over the whole container at once. Set operations pair up
+containers by key, so keys only one side has cost nothing to intersect.
+"""
+
+from array import array
+from bisect import bisect_left
+from itertools import chain
+
+# Above this many values a sorted array (2 bytes per value) is larger than
+# a bitset (8 KiB), so the container switches representation
+ARRAY_LIMIT = 4096
+
+_BITSET_BYTES = 65536 // 8
+
+
+def _to_bitset(lows):
+    buffer = bytearray(_BITSET_BYTES)
+    for low in lows:
+        buffer[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _iter_bitset(bits):
+    # bin() and str.find() run in C, so this costs one step per set bit
+    # rather than one per bit; digits are reversed to put bit 0 first
+    digits = bin(bits)[:1:-1]
+    position = digits.find('1')
+    while position != -1:
+        yield position
+        position = digits.find('1', position + 1)
+
+
+def _container(lows):
+    """Build the smaller container for sorted, distinct low bits; None if there are none."""
+    if not lows:
+        return None
+    if len(lows) > ARRAY_LIMIT:
+        return _to_bitset(lows)
+    return array('H', lows)
+
+
+def _shrink(bits):
+    """Turn a bitset that lost values back into an array once that is smaller."""
+    count = bits.bit_count()
+    if count > ARRAY_LIMIT:
+        return bits
+    return array('H', _iter_bitset(bits)) if count else None
+
+
+def _cardinality(container):
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _intersect(containers):
+    """Intersect any number of containers, converting the result to its final form only once."""
+    bits = None
+    arrays = []
+    for container in containers:
+        if isinstance(container, int):
+            bits = container if bits is None else bits & container
+        else:
+            arrays.append(container)
+    if not arrays:
+        return _shrink(bits)
+    arrays.sort(key=len)
+    lows = arrays[0]
+    for other in arrays[1:]:
+        lows = sorted(set(lows).intersection(other))
+        if not lows:
+            return None
+    if bits is not None:
+        # One character per bit, bit 0 first: indexing a str is the cheapest membership test
+        digits = format(bits, '065536b')[::-1]
+        lows = [low for low in lows if digits[low] == '1']
+    return _container(lows)
+
+
+def _union(containers):
+    """Unite any number of containers in one pass."""
+    bitsets = [container for container in containers if isinstance(container, int)]
+    arrays = [container for container in containers if not isinstance(container, int)]
+    if not bitsets:
+        return _container(sorted(set().union(*arrays)))
+    bits = 0
+    for bitset in bitsets:
+        bits |= bitset
+    return bits | _to_bitset(chain.from_iterable(arrays)) if arrays else bits
+
+
+class Bitmap:
+    """A compressed set of non-negative integers."""
+
+    __slots__ = ('_containers',)
+
+    def __init__(self, values=()):
+        """
+        Args:
+            values (iterable, optional): The initial values, in any order.
+        """
+        self._containers = {}
+        if values:
+            self._load(sorted(set(values)))
+
+    @classmethod
+    def from_sorted(cls, values):
+        """
+        Build a bitmap from values that are already sorted and distinct.
+
+        This is the fast path for index builds: each container is made in
+        one step rather than one value at a time.
+
+        Args:
+            values (list): Sorted, distinct non-negative integers.
+
+        Returns:
+            Bitmap: The new bitmap.
+        """
+        bitmap = cls()
+        bitmap._load(values)
+        return bitmap
+
+    def _load(self, values):
+        start = 0
+        while start < len(values):
+            key = values[start] >> 16
+            end = bisect_left(values, (key + 1) << 16, start)
+            base = key << 16
+            self._containers[key] = _container([value - base for value in values[start:end]])
+            start = end
+
+    def add(self, value):
+        """Add a value."""
+        key, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(key)
+        if container is None:
+            self._containers[key] = array('H', (low,))
+        elif isinstance(container, int):
+            self._containers[key] = container | (1 << low)
+        else:
+            position = bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                container.insert(position, low)
+                if len(container) > ARRAY_LIMIT:
+                    self._containers[key] = _to_bitset(container)
+
+    def discard(self, value):
+        """Remove a value if present."""
+        key, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(key)
+        if container is None:
+            return
+        if isinstance(container, int):
+            if container >> low & 1:
+                container = _shrink(container ^ (1 << low))
+        else:
+            position = bisect_left(container, low)
+            if position < len(container) and container[position] == low:
+                del container[position]
+            if not container:
+                container = None
+        if container is None:
+            del self._containers[key]
+        else:
+            self._containers[key] = container
+
+    def __contains__(self, value):
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self._containers.values())
+
+    def __bool__(self):
+        return bool(self._containers)
+
+    def __iter__(self):
+        """Iterate over the values in ascending order."""
+        for key in sorted(self._containers):
+            base = key << 16
+            container = self._containers[key]
+            lows = _iter_bitset(container) if isinstance(container, int) else container
+            for low in lows:
+                yield base + low
+
+    def __eq__(self, other):
+        # Containers are canonical (an array exactly when it holds at most
+        # ARRAY_LIMIT values), so equal sets have equal containers
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._containers == other._containers
+
+    def copy(self):
+        """Get an independent copy of the bitmap."""
+        result = Bitmap()
+        result._containers = {
+            key: container if isinstance(container, int) else array('H', container)
+            for key, container in self._containers.items()
+        }
+        return result
+
+    def __and__(self, other):
+        return Bitmap.intersection((self, other))
+
+    def __or__(self, other):
+        return Bitmap.union((self, other))
+
+    @staticmethod
+    def intersection(bitmaps):
+        """
+        Intersect several bitmaps, one container key at a time.
+
+        Only keys present in every bitmap are visited, and the bitsets of a
+        key are ANDed together before any array is filtered against them.
+
+        Returns:
+            Bitmap: A new bitmap; empty if `bitmaps` is.
+        """
+        bitmaps = sorted(bitmaps, key=lambda bitmap: len(bitmap._containers))
+        result = Bitmap()
+        if not bitmaps:
+            return result
+        for key, container in bitmaps[0]._containers.items():
+            containers = [container]
+            for bitmap in bitmaps[1:]:
+                container = bitmap._containers.get(key)
+                if container is None:
+                    break
+                containers.append(container)
+            else:
+                container = _intersect(containers)
+                if container is not None:
+                    result._containers[key] = container
+        return result
+
+    @staticmethod
+    def union(bitmaps):
+        """
+        Unite several bitmaps, merging the containers of each key in one pass.
+
+        Returns:
+            Bitmap: A new bitmap; empty if `bitmaps` is.
+        """
+        by_key = {}
+        for bitmap in bitmaps:
+            for key, container in bitmap._containers.items():
+                by_key.setdefault(key, []).append(container)
+        result = Bitmap()
+        for key, containers in by_key.items():
+            container = containers[0]
+            if len(containers) > 1:
+                container = _union(containers)
+            elif not isinstance(container, int):
+                container = array('H', container)
+            result._containers[key] = container
+        return result
+
+    def stats(self):
+        """
+        Get the bitmap's layout.
+
+        Returns:
+            dict: The number of values, of array and bitset containers, and the bytes they hold.
+        """
+        bitsets = sum(1 for container in self._containers.values() if isinstance(container, int))
+        arrays = len(self._containers) - bitsets
+        return {
+            "values": len(self),
+            "arrays": arrays,
+            "bitsets": bitsets,
+            "bytes": bitsets * _BITSET_BYTES + sum(
+                len(container) * 2 for container in self._containers.values() if not isinstance(container, int)
+            ),
+        }
+
+    def __repr__(self):
+        return f"Bitmap({len(self)} values)"
@@ -0,0 +1,235 @@
+"""
+Bulk import and export of tasks.
+This module streams CSV and NDJSON through the DAO in fixed-size chunks,
+so memory use stays constant regardless of the size of the board.
+"""
+
+import csv
+import io
+import json
+
+from app import ranking
+from app.dao.labels import normalize_labels
+from app.dao.task_dao import TaskDAO
+from app.due_dates import normalize_due_date
+from app.models import DEFAULT_BOARD_ID
+
+# Number of records written per transaction during an import
+DEFAULT_CHUNK_SIZE = 5000
+
+# Columns written by an export, in order; in CSV, labels are joined with commas
+EXPORT_FIELDS = ['id', 'board_id', 'title', 'description', 'status', 'priority', 'due_date', 'labels', 'rank',
+                 'created_at']
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class BulkFormatError(ValueError):
+    """Raised when an import stream cannot be parsed."""
+
+
+def detect_format(explicit_format=None, content_type=None, filename=None):
+    """
+    Work out which bulk format to use.
+    
+    Args:
+        explicit_format (str, optional): A format requested by name ("csv" or "ndjson").
+        content_type (str, optional): The Content-Type of an uploaded body.
+        filename (str, optional): A file name whose extension hints at the format.
+        
+    Returns:
+        str: Either "csv" or "ndjson".
+        
+    Raises:
+        ValueError: If an explicitly requested format is not supported.
+    """
+    if explicit_format:
+        if explicit_format not in FORMATS:
+            raise ValueError(f"Unsupported format: {explicit_format}")
+        return explicit_format
+    if content_type and 'csv' in content_type:
+        return 'csv'
+    if filename and filename.endswith('.csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+def iter_records(stream, fmt):
+    """
+    Parse records lazily from a text stream.
+    
+    Args:
+        stream: A text file-like object.
+        fmt (str): Either "csv" or "ndjson".
+        
+    Yields:
+        dict: One record per CSV row or NDJSON line.
+        
+    Raises:
+        BulkFormatError: If the stream is not valid UTF-8, CSV or NDJSON.
+    """
+    line_number = record_number = 0
+    try:
+        if fmt == 'csv':
+            for record_number, record in enumerate(csv.DictReader(stream), start=1):
+                yield record
+            return
+        
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise BulkFormatError(f"Line {line_number}: invalid JSON ({e.msg})")
+    except csv.Error as e:
+        # Such as a field over csv.field_size_limit() or an unterminated quote
+        raise BulkFormatError(f"Record {record_number + 1}: invalid CSV ({e})")
+    except UnicodeDecodeError:
+        # The stream decodes a block at a time, so the bad bytes are somewhere past this point
+        position = f"record {record_number}" if fmt == 'csv' else f"line {line_number}"
+        raise BulkFormatError(f"Invalid UTF-8 after {position}")
+
+
+def validate_record(record):
+    """
+    Validate a single import record and convert it to a DAO row.
+    
+    Status, priority and labels are checked against the same rules the
+    TaskDAO uses, so imported tasks are indistinguishable from ones
+    created through the API. Labels are a list (NDJSON) or a comma-separated
+    string (CSV); an exported rank is kept so cards keep their column order.
+    
+    Args:
+        record (dict): The parsed record.
+        
+    Returns:
+        tuple: (title, description, status, priority, due_date, labels, rank),
+        with rank None if the record has none.
+        
+    Raises:
+        ValueError: If the record is missing a title or has an invalid status/priority/due date/labels/rank.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+    
+    title = record.get('title')
+    if not title:
+        raise ValueError("Missing title")
+    
+    status = TaskDAO._string_to_status(record.get('status') or 'To Do').value
+    priority = TaskDAO._string_to_priority(record.get('priority') or 'Medium').value
+    
+    labels = record.get('labels') or []
+    if isinstance(labels, str):
+        labels = [label for label in labels.split(',') if label.strip()]
+    rank = record.get('rank') or None
+    if rank is not None:
+        if not isinstance(rank, str):
+            raise ValueError(f"Invalid rank key: {rank!r}")
+        ranking.validate_key(rank)
+    
+    return (
+        title,
+        record.get('description') or '',
+        status,
+        priority,
+        normalize_due_date(record.get('due_date')),
+        normalize_labels(labels),
+        rank,
+    )
+
+
+def import_tasks(task_dao, records, chunk_size=DEFAULT_CHUNK_SIZE, offset=0, on_progress=None,
+                 board_id=DEFAULT_BOARD_ID):
+    """
+    Import records through the DAO in chunked transactions.
+    
+    The first `offset` records are skipped, which lets an interrupted import
+    resume where it left off. The import stops at the first invalid record;
+    everything before it is committed, so the returned `next_offset` can be
+    used to resume once the record has been fixed.
+    
+    Args:
+        task_dao: The task DAO to write to. Must provide create_tasks_bulk().
+        records: An iterable of record dictionaries.
+        chunk_size (int, optional): Records per transaction. Defaults to DEFAULT_CHUNK_SIZE.
+        offset (int, optional): Number of leading records to skip. Defaults to 0.
+        on_progress (callable, optional): Called with the new offset after each committed chunk.
+        board_id (int, optional): The board to import into. Defaults to DEFAULT_BOARD_ID.
+        
+    Returns:
+        dict: A summary with "imported", "next_offset" and, on failure, "error".
+    """
+    position = 0
+    imported = 0
+    chunk = []
+    error = None
+    
+    def flush():
+        nonlocal imported
+        if chunk:
+            imported += task_dao.create_tasks_bulk(chunk, board_id)
+            chunk.clear()
+            if on_progress:
+                on_progress(offset + imported)
+    
+    try:
+        for record in records:
+            position += 1
+            if position <= offset:
+                continue
+            try:
+                chunk.append(validate_record(record))
+            except ValueError as e:
+                error = f"Record {position}: {e}"
+                break
+            if len(chunk) >= chunk_size:
+                flush()
+    except BulkFormatError as e:
+        error = str(e)
+    
+    flush()
+    
+    summary = {
+        "imported": imported,
+        "next_offset": offset + imported,
+    }
+    if error:
+        summary["error"] = error
+    return summary
+
+
+def export_tasks(task_dao, fmt, chunk_size=DEFAULT_CHUNK_SIZE, board_id=DEFAULT_BOARD_ID):
+    """
+    Serialize all tasks chunk by chunk.
+    
+    Args:
+        task_dao: The task DAO to read from. Must provide iter_tasks().
+        fmt (str): Either "csv" or "ndjson".
+        chunk_size (int, optional): Tasks read per query. Defaults to DEFAULT_CHUNK_SIZE.
+        board_id (int, optional): The board to export. Defaults to DEFAULT_BOARD_ID.
+        
+    Yields:
+        str: Encoded output, one chunk of tasks at a time.
+    """
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for tasks in task_dao.iter_tasks(chunk_size, board_id):
+            writer.writerows({**task, 'labels': ','.join(task.get('labels') or [])} for task in tasks)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # No tasks at all: still emit the header row
+            yield buffer.getvalue()
+        return
+    
+    for tasks in task_dao.iter_tasks(chunk_size, board_id):
+        yield ''.join(json.dumps(task, default=str) + '\n' for task in tasks)
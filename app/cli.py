@@ -0,0 +1,130 @@
+"""
+Command line interface for Miniban.
+This module registers `flask tasks ...` commands on the application.
+"""
+
+import os
+import sys
+from datetime import timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import bulk, profiling
+from app.models import DEFAULT_BOARD_ID
+
+tasks_cli = AppGroup('tasks', help='Bulk task operations.')
+
+
+def _progress_path(path, board_id):
+    """Return the file used to remember how far an import of `path` got."""
+    name = os.path.basename(os.path.abspath(path))
+    return os.path.join(current_app.instance_path, f"import-board{board_id}-{name}.progress")
+
+
+@tasks_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(sorted(bulk.FORMATS)), help='Input format (defaults to the file extension).')
+@click.option('--chunk-size', default=bulk.DEFAULT_CHUNK_SIZE, show_default=True, help='Records committed per transaction.')
+@click.option('--restart', is_flag=True, help='Ignore saved progress and start from the first record.')
+@click.option('--board', 'board_id', default=DEFAULT_BOARD_ID, show_default=True, help='Board to import into.')
+def import_command(path, fmt, chunk_size, restart, board_id):
+    """Import tasks from a CSV or NDJSON file, resuming after interruptions."""
+    task_dao = current_app.extensions['task_dao']
+    if task_dao.get_board(board_id) is None:
+        raise click.BadParameter(f"Board {board_id} does not exist", param_hint='--board')
+    fmt = bulk.detect_format(fmt, filename=path)
+    progress_path = _progress_path(path, board_id)
+    
+    offset = 0
+    if not restart and os.path.exists(progress_path):
+        with open(progress_path) as f:
+            offset = int(f.read().strip() or 0)
+        click.echo(f"↩️  Resuming from record {offset}")
+    
+    def save_progress(position):
+        with open(progress_path, 'w') as f:
+            f.write(str(position))
+        click.echo(f"📥 {position} records imported", err=True)
+    
+    with open(path, encoding='utf-8', newline='') as stream:
+        summary = bulk.import_tasks(
+            task_dao, bulk.iter_records(stream, fmt), chunk_size, offset,
+            on_progress=save_progress, board_id=board_id
+        )
+    
+    if 'error' in summary:
+        click.echo(f"❌ {summary['error']}", err=True)
+        click.echo(f"💡 Fix the record and re-run to resume from record {summary['next_offset']}", err=True)
+        sys.exit(1)
+    
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    click.echo(f"✅ Imported {summary['imported']} tasks")
+
+
+@tasks_cli.command('export')
+@click.argument('path', required=False, type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'fmt', type=click.Choice(sorted(bulk.FORMATS)), help='Output format (defaults to the file extension).')
+@click.option('--chunk-size', default=bulk.DEFAULT_CHUNK_SIZE, show_default=True, help='Tasks read per query.')
+@click.option('--board', 'board_id', default=DEFAULT_BOARD_ID, show_default=True, help='Board to export.')
+def export_command(path, fmt, chunk_size, board_id):
+    """Export all tasks as CSV or NDJSON to PATH (or stdout)."""
+    task_dao = current_app.extensions['task_dao']
+    fmt = bulk.detect_format(fmt, filename=path)
+    
+    out = open(path, 'w', encoding='utf-8', newline='') if path else sys.stdout
+    try:
+        for chunk in bulk.export_tasks(task_dao, fmt, chunk_size, board_id):
+            out.write(chunk)
+    finally:
+        if path:
+            out.close()
+
+
+@tasks_cli.command('rebalance')
+@click.option('--board', 'board_id', default=DEFAULT_BOARD_ID, show_default=True, help='Board to rebalance.')
+@click.option('--status', help='Only rebalance this column.')
+def rebalance_command(board_id, status):
+    """Rewrite card ranks as short, evenly spaced keys."""
+    task_dao = current_app.extensions['task_dao']
+    if not hasattr(task_dao, 'rebalance_ranks'):
+        raise click.UsageError("Rank rebalancing is not supported by this database backend")
+    columns = task_dao.rebalance_ranks(board_id, status)
+    click.echo(f"✅ Rebalanced {columns} column(s)")
+
+
+@tasks_cli.command('archive')
+@click.option('--days', type=click.FloatRange(0, timedelta.max.days), help='Archive Done tasks completed at least this many days ago (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--board', 'board_id', default=DEFAULT_BOARD_ID, show_default=True, help='Board to archive.')
+def archive_command(days, board_id):
+    """Move old Done tasks to the archive table."""
+    task_dao = current_app.extensions['task_dao']
+    if not hasattr(task_dao, 'archive_done_tasks'):
+        raise click.UsageError("Archiving is not supported by this database backend")
+    if days is None:
+        days = current_app.config['ARCHIVE_AFTER_DAYS']
+    archived = task_dao.archive_done_tasks(timedelta(days=days), board_id)
+    click.echo(f"📦 Archived {archived} task(s) completed more than {days:g} day(s) ago")
+
+
+profile_cli = AppGroup('profile', help='Request profiling.')
+
+
+@profile_cli.command('token')
+def token_command():
+    """Print a token that profiles requests sending it in the X-Profile header."""
+    try:
+        token = profiling.make_token(current_app)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(token)
+    click.echo(f"💡 curl -H '{profiling.PROFILE_HEADER}: {token}' ... "
+               f"(valid for {current_app.config['PROFILE_TOKEN_MAX_AGE']}s)", err=True)
+
+
+def init_app(app):
+    """Register the CLI command groups on the application."""
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(profile_cli)
@@ -3,11 +3,31 @@ Database factory for creating the appropriate database backend.
 Supports SQLite (default) and Supabase.
 """
 
+import json
 import os
+import queue
 import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
 from supabase import create_client, Client
 from typing import Union, Optional
 
+from app.models import DEFAULT_BOARD_ID
+from app import ranking
+from app.analytics import REMOVED, STATUSES
+from app.bitmap import Bitmap
+from app.dao.errors import LinkCycleError, VersionConflictError
+from app.dao.labels import AND, LabelIndex, LabelIndexCache, normalize_labels
+from app.dao.links import BLOCKED_BY, BLOCKS, CLOSURE_SQL, ClosureCache, closure_from_links, task_graph
+from app.dao.statements import TASK_UPDATE_COLUMNS, StatementCache, canonical_fields
+from app.dao.task_dao import TaskDAO
+from app.dao.tracing import QueryTracer, TracingConnection
+from app.due_dates import normalize_due_date
+
 class DatabaseFactory:
     """Factory for creating database connections."""
     
@@ -105,6 +125,25 @@ class DatabaseFactory:
         """
         cursor = conn.cursor()
         
+        # Write-ahead logging lets readers run alongside the writer instead of
+        # waiting for it; the setting is stored in the database file
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
+        # Create boards table if it doesn't exist; version is bumped on
+        # every change to the board's tasks and keys the per-board caches
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS boards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute(
+            'INSERT OR IGNORE INTO boards (id, name) VALUES (?, ?)',
+            (DEFAULT_BOARD_ID, 'Default')
+        )
+        
         # Create tasks table if it doesn't exist
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS tasks (
@@ -118,7 +157,323 @@ class DatabaseFactory:
             )
         ''')
         
+        # Columns added after the first release
+        DatabaseFactory._add_column_if_missing(
+            cursor, 'tasks', 'board_id', f'INTEGER NOT NULL DEFAULT {DEFAULT_BOARD_ID}'
+        )
+        DatabaseFactory._add_column_if_missing(cursor, 'tasks', 'rank', 'TEXT')
+        
+        # Every task query is scoped to a board; columns are read in rank order
+        cursor.execute('DROP INDEX IF EXISTS idx_tasks_board_status')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_board_status_rank ON tasks(board_id, status, rank)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_board_id ON tasks(board_id, id)')
+        
+        # Give tasks created before ranks existed a position in their column
+        cursor.execute('SELECT DISTINCT board_id, status FROM tasks WHERE rank IS NULL')
+        unranked_columns = cursor.fetchall()
+        if unranked_columns:
+            cursor.execute('BEGIN IMMEDIATE')
+            for board_id, status in unranked_columns:
+                SQLiteTaskDAO._rebalance_column(cursor, board_id, status)
+            cursor.execute('COMMIT')
+        
+        # Due dates are range-scanned by the due date scheduler; most tasks have none
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date) WHERE due_date IS NOT NULL'
+        )
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT,
+                expires_at REAL NOT NULL DEFAULT 0,
+                high_water TEXT
+            )
+        ''')
+        
+        # Done tasks are archived some time after they were completed; the
+        # triggers keep completed_at current on every write path. Tasks
+        # completed before the column existed fall back to created_at.
+        DatabaseFactory._add_column_if_missing(cursor, 'tasks', 'completed_at', 'TIMESTAMP')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_on_insert AFTER INSERT ON tasks
+            WHEN NEW.status = 'Done' AND NEW.completed_at IS NULL
+            BEGIN
+                UPDATE tasks SET completed_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_on_update AFTER UPDATE OF status ON tasks
+            WHEN NEW.status IS NOT OLD.status
+            BEGIN
+                UPDATE tasks SET completed_at = CASE WHEN NEW.status = 'Done' THEN CURRENT_TIMESTAMP END
+                WHERE id = NEW.id;
+            END
+        ''')
+        
+        # Cold tier for archived Done tasks, read newest first by ID
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tasks_archive (
+                id INTEGER PRIMARY KEY,
+                board_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                due_date TEXT,
+                rank TEXT,
+                created_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Row versions for conditional updates (If-Match); archived tasks keep theirs
+        DatabaseFactory._add_column_if_missing(cursor, 'tasks', 'version', 'INTEGER NOT NULL DEFAULT 1')
+        DatabaseFactory._add_column_if_missing(cursor, 'tasks_archive', 'version', 'INTEGER NOT NULL DEFAULT 1')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_archive_board_id ON tasks_archive(board_id, id)')
+        
+        # Dependencies between tasks, walked in both directions by recursive CTEs.
+        # A board's link_version changes with its links, so cached closures can
+        # be checked against it.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_links (
+                blocker_id INTEGER NOT NULL,
+                blocked_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (blocker_id, blocked_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_links_blocked ON task_links(blocked_id, blocker_id)')
+        DatabaseFactory._add_column_if_missing(cursor, 'boards', 'link_version', 'INTEGER NOT NULL DEFAULT 0')
+        
+        # Delta sync: every task remembers the board version it last changed
+        # at, and deleted tasks leave a tombstone, so a client holding version
+        # V only has to fetch what changed after it. Every write transaction
+        # bumps the board version once after its task writes, so version + 1
+        # read here is the version the transaction commits as.
+        DatabaseFactory._add_column_if_missing(cursor, 'tasks', 'changed_seq', 'INTEGER')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_board_changed ON tasks(board_id, changed_seq)')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_tombstones (
+                task_id INTEGER PRIMARY KEY,
+                board_id INTEGER NOT NULL,
+                deleted_seq INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_task_tombstones_board ON task_tombstones(board_id, deleted_seq)'
+        )
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_changed_on_insert AFTER INSERT ON tasks
+            WHEN NEW.changed_seq IS NULL
+            BEGIN
+                UPDATE tasks SET changed_seq = (SELECT version + 1 FROM boards WHERE id = NEW.board_id)
+                WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_changed_on_update AFTER UPDATE ON tasks
+            WHEN NEW.changed_seq IS OLD.changed_seq
+            BEGIN
+                UPDATE tasks SET changed_seq = (SELECT version + 1 FROM boards WHERE id = NEW.board_id)
+                WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS tasks_tombstone_on_delete AFTER DELETE ON tasks
+            BEGIN
+                INSERT OR REPLACE INTO task_tombstones (task_id, board_id, deleted_seq)
+                VALUES (OLD.id, OLD.board_id, (SELECT version + 1 FROM boards WHERE id = OLD.board_id));
+            END
+        ''')
+        
+        # Labels, one row per task and label. Archived tasks keep theirs for
+        # when they are restored. Label filters are answered from per-label
+        # bitmaps built off the (board_id, label, task_id) index; a board's
+        # label_version changes with its labels, so cached bitmaps can be
+        # checked against it.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_labels (
+                task_id INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                board_id INTEGER NOT NULL,
+                PRIMARY KEY (task_id, label)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_task_labels_board_label ON task_labels(board_id, label, task_id)'
+        )
+        DatabaseFactory._add_column_if_missing(cursor, 'boards', 'label_version', 'INTEGER NOT NULL DEFAULT 0')
+        
+        # Status history for flow analytics: one row per status a task
+        # enters, with the status stored as its index in STATUSES and the
+        # time as Unix seconds. Rows are only ever appended, and a deleted
+        # task gets a final REMOVED row. Tasks restored from the archive
+        # already have their history, so nothing is recorded for them.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_transitions (
+                id INTEGER PRIMARY KEY,
+                board_id INTEGER NOT NULL,
+                task_id INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                at INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_task_transitions_board ON task_transitions(board_id, id)'
+        )
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_transitions_task ON task_transitions(task_id)')
+        known_status = f"NEW.status IN ({', '.join(repr(status) for status in STATUSES)})"
+        status_code = 'CASE NEW.status ' + ' '.join(
+            f"WHEN '{status}' THEN {code}" for code, status in enumerate(STATUSES)
+        ) + ' END'
+        record_transition = f'''
+            INSERT INTO task_transitions (board_id, task_id, status, at)
+            VALUES (NEW.board_id, NEW.id, {status_code}, CAST(strftime('%s', 'now') AS INTEGER));
+        '''
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_transition_on_insert AFTER INSERT ON tasks
+            WHEN {known_status} AND NOT EXISTS (SELECT 1 FROM task_transitions WHERE task_id = NEW.id)
+            BEGIN {record_transition} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_transition_on_update AFTER UPDATE OF status ON tasks
+            WHEN NEW.status IS NOT OLD.status AND {known_status}
+            BEGIN {record_transition} END
+        ''')
+        
+        # One-off data migrations, tracked in SQLite's user_version
+        cursor.execute('PRAGMA user_version')
+        user_version = cursor.fetchone()[0]
+        if user_version < 1:
+            DatabaseFactory._normalize_due_dates(cursor)
+            cursor.execute('PRAGMA user_version = 1')
+        if user_version < 2:
+            DatabaseFactory._backfill_transitions(cursor)
+            cursor.execute('PRAGMA user_version = 2')
+        if user_version < 3:
+            DatabaseFactory._backfill_changed_seq(cursor)
+            cursor.execute('PRAGMA user_version = 3')
+        
         conn.commit()
+    
+    @staticmethod
+    def _normalize_due_dates(cursor: sqlite3.Cursor):
+        """
+        Rewrite free-form due dates stored before normalization as ISO 8601.
+        
+        Values that cannot be parsed are left as they are so nothing is lost;
+        they sort after every ISO date and are never picked up by the scheduler.
+        
+        Args:
+            cursor (sqlite3.Cursor): SQLite cursor
+        """
+        normalized_count = 0
+        last_id = 0
+        cursor.execute('BEGIN IMMEDIATE')
+        while True:
+            # Walk the table in ID order so memory use does not grow with its size
+            cursor.execute(
+                'SELECT id, due_date FROM tasks WHERE id > ? AND due_date IS NOT NULL ORDER BY id LIMIT 10000',
+                (last_id,)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            updates = []
+            for task_id, due_date in rows:
+                try:
+                    normalized = normalize_due_date(due_date)
+                except ValueError:
+                    continue
+                if normalized != due_date:
+                    updates.append((normalized, task_id))
+            cursor.executemany('UPDATE tasks SET due_date = ? WHERE id = ?', updates)
+            normalized_count += len(updates)
+        cursor.execute('COMMIT')
+        
+        if normalized_count:
+            print(f"🗓  Normalized {normalized_count} due dates")
+    
+    @staticmethod
+    def _backfill_transitions(cursor: sqlite3.Cursor):
+        """
+        Give tasks created before transitions were recorded a starting history.
+        
+        Each task enters its current status when it was created; completed
+        Done tasks instead start in To Do and enter Done when they were
+        completed, so their lead times are known. Tasks that already have
+        transitions are left alone, which makes this safe to run twice.
+        
+        Args:
+            cursor (sqlite3.Cursor): SQLite cursor
+        """
+        codes = 'CASE status ' + ' '.join(
+            f"WHEN '{status}' THEN {code}" for code, status in enumerate(STATUSES)
+        ) + ' END'
+        todo, done = STATUSES.index('To Do'), STATUSES.index('Done')
+        untracked = (f"status IN ({', '.join(repr(status) for status in STATUSES)}) "
+                     "AND NOT EXISTS (SELECT 1 FROM task_transitions WHERE task_id = tasks.id)")
+        created = "CAST(strftime('%s', COALESCE(created_at, CURRENT_TIMESTAMP)) AS INTEGER)"
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(f'''
+            INSERT INTO task_transitions (board_id, task_id, status, at)
+            SELECT board_id, id, CASE WHEN status = 'Done' AND completed_at IS NOT NULL THEN {todo} ELSE {codes} END,
+                   {created}
+            FROM tasks WHERE {untracked}
+            UNION ALL
+            SELECT board_id, id, {done}, MAX(CAST(strftime('%s', completed_at) AS INTEGER), {created})
+            FROM tasks WHERE status = 'Done' AND completed_at IS NOT NULL AND {untracked}
+            ORDER BY 2, 4, 3
+        ''')
+        backfilled = cursor.rowcount
+        cursor.execute('COMMIT')
+        
+        if backfilled:
+            print(f"📈 Recorded {backfilled} status transitions for existing tasks")
+    
+    @staticmethod
+    def _backfill_changed_seq(cursor: sqlite3.Cursor):
+        """
+        Stamp tasks from before delta sync with their board's current version.
+        
+        Without a changed_seq they would never be part of a delta. Any
+        client at an older version fetches them on its next sync; one at the
+        current version loaded them in full already. Only rows without a
+        changed_seq are touched, which makes this safe to run twice.
+        
+        Args:
+            cursor (sqlite3.Cursor): SQLite cursor
+        """
+        cursor.execute('BEGIN IMMEDIATE')
+        # Assigning changed_seq leaves the update trigger alone
+        cursor.execute(
+            'UPDATE tasks SET changed_seq = (SELECT version FROM boards WHERE boards.id = tasks.board_id) '
+            'WHERE changed_seq IS NULL'
+        )
+        cursor.execute('COMMIT')
+    
+    @staticmethod
+    def _add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+        """
+        Add a column to an existing table unless it is already there.
+        
+        Args:
+            cursor (sqlite3.Cursor): SQLite cursor
+            table (str): Table name
+            column (str): Column name
+            definition (str): Column type and constraints
+        """
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in {row[1] for row in cursor.fetchall()}:
+            try:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+            except sqlite3.OperationalError as e:
+                # Another worker starting up at the same time got there first
+                if 'duplicate column' not in str(e):
+                    raise
 
 
 class SupabaseTaskDAO:
@@ -140,9 +495,32 @@ class SupabaseTaskDAO:
         except Exception as e:
             print(f"⚠️  Supabase table check failed: {e}")
     
-    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None):
+    def create_board(self, name):
+        """Create a new board in Supabase."""
+        response = self.client.table('boards').insert({'name': name}).execute()
+        if response.data:
+            return response.data[0]
+        else:
+            raise Exception("Failed to create board in Supabase")
+    
+    def get_board(self, board_id):
+        """Get a single board by ID from Supabase."""
+        response = self.client.table('boards').select('*').eq('id', board_id).execute()
+        return response.data[0] if response.data else None
+    
+    def get_all_boards(self):
+        """Get all boards from Supabase."""
+        response = self.client.table('boards').select('*').order('id').execute()
+        return response.data or []
+    
+    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None,
+                    board_id=DEFAULT_BOARD_ID):
         """Create a new task in Supabase."""
+        status = TaskDAO._string_to_status(status).value
+        priority = TaskDAO._string_to_priority(priority).value
+        due_date = normalize_due_date(due_date)
         task_data = {
+            'board_id': board_id,
             'title': title,
             'description': description,
             'status': status,
@@ -157,125 +535,1103 @@ class SupabaseTaskDAO:
         else:
             raise Exception("Failed to create task in Supabase")
     
-    def get_all_tasks(self):
-        """Get all tasks from Supabase."""
-        response = self.client.table(self.table_name).select('*').execute()
+    def get_all_tasks(self, board_id=DEFAULT_BOARD_ID):
+        """Get all tasks of a board from Supabase."""
+        response = self.client.table(self.table_name).select('*').eq('board_id', board_id).execute()
         return response.data or []
     
-    def update_task(self, task_id, **kwargs):
-        """Update an existing task in Supabase."""
-        if not kwargs:
-            return None
-            
-        # Build the update data
-        update_data = {key: value for key, value in kwargs.items()}
+    # Attempts at an unconditional update before giving up on concurrent writers
+    UPDATE_RETRIES = 5
+    
+    def update_task(self, task_id, board_id=DEFAULT_BOARD_ID, expected_version=None, **kwargs):
+        """
+        Update an existing task in Supabase, incrementing its version.
         
-        # Update the task
-        response = self.client.table(self.table_name).update(update_data).eq('id', task_id).execute()
+        PostgREST cannot express `version = version + 1`, so every update is
+        a compare-and-swap on the version that was read; without
+        `expected_version` a lost race is retried against the new version.
         
-        if response.data:
-            return response.data[0]
-        else:
+        Raises:
+            ValueError: If a field is not updatable or its value is invalid.
+            VersionConflictError: If the task is not at `expected_version`.
+        """
+        if not kwargs:
             return None
+        canonical_fields(kwargs)
+        if 'status' in kwargs:
+            kwargs['status'] = TaskDAO._string_to_status(kwargs['status']).value
+        if 'priority' in kwargs:
+            kwargs['priority'] = TaskDAO._string_to_priority(kwargs['priority']).value
+        if 'due_date' in kwargs:
+            kwargs['due_date'] = normalize_due_date(kwargs['due_date'])
+        
+        for _ in range(self.UPDATE_RETRIES):
+            current = self.get_task(task_id, board_id)
+            if current is None:
+                return None
+            if expected_version is not None and current['version'] != expected_version:
+                raise VersionConflictError(current)
+            
+            # Build the update data
+            update_data = dict(kwargs, version=current['version'] + 1)
+            
+            # Update the task only if nobody else did in the meantime
+            response = (
+                self.client.table(self.table_name)
+                .update(update_data)
+                .eq('id', task_id)
+                .eq('board_id', board_id)
+                .eq('version', current['version'])
+                .execute()
+            )
+            if response.data:
+                return response.data[0]
+            if expected_version is not None:
+                raise VersionConflictError(self.get_task(task_id, board_id) or current)
+        raise VersionConflictError(self.get_task(task_id, board_id) or current)
     
-    def get_task(self, task_id):
+    def get_task(self, task_id, board_id=DEFAULT_BOARD_ID):
         """Get a single task by ID from Supabase."""
-        response = self.client.table(self.table_name).select('*').eq('id', task_id).execute()
+        response = (
+            self.client.table(self.table_name)
+            .select('*')
+            .eq('id', task_id)
+            .eq('board_id', board_id)
+            .execute()
+        )
         return response.data[0] if response.data else None
     
-    def delete_task(self, task_id):
+    def delete_task(self, task_id, board_id=DEFAULT_BOARD_ID):
         """Delete a task from Supabase."""
-        response = self.client.table(self.table_name).delete().eq('id', task_id).execute()
+        response = (
+            self.client.table(self.table_name)
+            .delete()
+            .eq('id', task_id)
+            .eq('board_id', board_id)
+            .execute()
+        )
         return len(response.data) > 0 if response.data else False
     
+    def create_tasks_bulk(self, rows, board_id=DEFAULT_BOARD_ID):
+        """Insert many validated task rows with a single request; this backend stores no labels or ranks."""
+        task_data = [
+            {
+                'board_id': board_id,
+                'title': title,
+                'description': description,
+                'status': status,
+                'priority': priority,
+                'due_date': due_date
+            }
+            for title, description, status, priority, due_date, _labels, _rank in rows
+        ]
+        self.client.table(self.table_name).insert(task_data, returning='minimal').execute()
+        return len(task_data)
+    
+    def iter_tasks(self, chunk_size=1000, board_id=DEFAULT_BOARD_ID):
+        """Iterate over all tasks of a board in ID order using keyset pagination."""
+        last_id = 0
+        while True:
+            response = (
+                self.client.table(self.table_name)
+                .select('*')
+                .eq('board_id', board_id)
+                .gt('id', last_id)
+                .order('id')
+                .limit(chunk_size)
+                .execute()
+            )
+            tasks = response.data or []
+            if not tasks:
+                return
+            yield tasks
+            last_id = tasks[-1]['id']
+    
     # Add other methods as needed...
 
 
 class SQLiteTaskDAO:
     """Task DAO implementation for SQLite."""
     
-    def __init__(self, db_path: str):
+    # Number of boards whose task lists are kept in the per-board cache
+    BOARD_CACHE_SIZE = 64
+    
+    # Idle read-only connections kept open for reuse
+    READ_POOL_SIZE = 8
+    
+    # Seconds the writer waits for another process's write lock
+    WRITE_TIMEOUT = 30
+    
+    # Prepared statements kept per connection by sqlite3
+    STATEMENT_CACHE_SIZE = 128
+    
+    # Columns copied between the tasks and tasks_archive tables
+    ARCHIVE_COLUMNS = ('id', 'board_id', 'title', 'description', 'status', 'priority', 'due_date', 'rank',
+                       'created_at', 'completed_at', 'version')
+    
+    # Tasks are read with their labels, joined in primary key (label) order
+    TASK_SELECT = (
+        "SELECT tasks.*, (SELECT group_concat(label, ',') FROM task_labels WHERE task_labels.task_id = tasks.id) "
+        "AS labels FROM tasks"
+    )
+    ARCHIVE_SELECT = (
+        "SELECT tasks_archive.*, (SELECT group_concat(label, ',') FROM task_labels "
+        "WHERE task_labels.task_id = tasks_archive.id) AS labels FROM tasks_archive"
+    )
+    
+    def __init__(self, db_path: str, slow_query_ms: float = 100):
         self.db_path = db_path
+        # Times every statement; slower ones are logged with their query plan
+        self._tracer = QueryTracer(slow_query_ms)
+        self._read_pool = queue.LifoQueue(maxsize=self.READ_POOL_SIZE)
+        # Mutations are queued to a single writer thread, started on first use
+        self._writer = None
+        self._writer_conn = None
+        self._writer_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._statements = StatementCache()
+        # board_id -> (board version, tasks), most recently used last
+        self._board_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # (board_id, status) columns with a background rebalance in flight
+        self._pending_rebalances = set()
+        # Transitive closures of task links, per board link version
+        self._closures = ClosureCache()
+        # Label bitmaps, per board label version
+        self._label_indexes = LabelIndexCache()
     
-    def _get_connection(self):
-        """Get a new SQLite connection for each operation."""
-        conn = sqlite3.connect(
-            self.db_path,
-            check_same_thread=False,
-            isolation_level=None
-        )
+    def _connect(self, read_only=False):
+        """Open a connection to the database, read-only or for the writer."""
+        if read_only:
+            # mode=ro refuses to open a missing file; query_only also rejects
+            # writes that would otherwise slip through on an existing connection
+            uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None,
+                                   cached_statements=self.STATEMENT_CACHE_SIZE, factory=TracingConnection)
+            conn.tracer = self._tracer
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   timeout=self.WRITE_TIMEOUT, cached_statements=self.STATEMENT_CACHE_SIZE,
+                                   factory=TracingConnection)
+            conn.tracer = self._tracer
+            # Safe with WAL: a crash can lose the last commits but never corrupts the file
+            conn.execute('PRAGMA synchronous = NORMAL')
         conn.row_factory = sqlite3.Row
         return conn
     
-    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None):
-        """Create a new task in SQLite."""
-        conn = self._get_connection()
+    @contextmanager
+    def _read_connection(self):
+        """
+        Borrow a read-only connection from the pool.
+        
+        Yields:
+            sqlite3.Connection: A connection that is returned to the pool afterwards.
+        """
+        self._check_fork()
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-            INSERT INTO tasks (title, description, status, priority, due_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (title, description, status, priority, due_date))
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            # Read-only connections cannot create the WAL index; the writer's connection does
+            self._get_writer()
+            conn = self._connect(read_only=True)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            try:
+                self._read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def _write(self, work):
+        """
+        Run a block of writes in a single immediate transaction on the writer thread.
+        
+        Writes from every request thread are queued to one thread that owns
+        the only read-write connection, so they never contend with each
+        other for SQLite's lock, and readers on the pool never wait for them.
+        
+        Args:
+            work (callable): Called with a cursor bound to the transaction.
+            
+        Returns:
+            The value returned by `work`. Exceptions it raises roll the transaction back and are re-raised.
+        """
+        return self._get_writer().submit(self._run_write, work).result()
+    
+    def _get_writer(self):
+        """Get the writer thread's executor, starting it and opening its connection on first use."""
+        self._check_fork()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-writer')
+                self._writer.submit(self._open_writer_connection).result()
+            return self._writer
+    
+    def _open_writer_connection(self):
+        """Open the read-write connection; runs on the writer thread only."""
+        self._writer_conn = self._connect()
+        self._writer_conn.execute('PRAGMA journal_mode = WAL')
+    
+    def _run_write(self, work):
+        """Execute one queued write; runs on the writer thread only."""
+        cursor = self._writer_conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            result = work(cursor)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return result
+    
+    def _check_fork(self):
+        """Drop connections and the writer thread inherited from a parent process."""
+        if self._pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._pid != os.getpid():
+                self._read_pool = queue.LifoQueue(maxsize=self.READ_POOL_SIZE)
+                self._writer = None
+                self._writer_conn = None
+                self._pid = os.getpid()
+    
+    @staticmethod
+    def _fetch_dicts(cursor, sql, params=()):
+        """
+        Run a query and return its rows as dictionaries.
+        
+        Rows are built straight from the plain tuples sqlite3 produces,
+        skipping the intermediate sqlite3.Row objects; this is the hot path
+        for board loads and exports.
+        """
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+    
+    @classmethod
+    def _fetch_tasks(cls, cursor, condition, params=(), select=None):
+        """Run TASK_SELECT, or `select`, with a WHERE/ORDER BY clause and return tasks with their labels as lists."""
+        tasks = cls._fetch_dicts(cursor, f'{select or cls.TASK_SELECT} {condition}', params)
+        for task in tasks:
+            labels = task['labels']
+            task['labels'] = labels.split(',') if labels else []
+        return tasks
+    
+    @staticmethod
+    def _bump_board_version(cursor, board_id):
+        """Record that a board changed; must run inside the writing transaction."""
+        cursor.execute('UPDATE boards SET version = version + 1 WHERE id = ?', (board_id,))
+    
+    @staticmethod
+    def _last_rank(cursor, board_id, status, exclude_id=None):
+        """Get the highest rank in a column, answered from the (board_id, status, rank) index."""
+        cursor.execute(
+            'SELECT rank FROM tasks WHERE board_id = ? AND status = ? AND rank IS NOT NULL AND id != ? '
+            'ORDER BY rank DESC LIMIT 1',
+            (board_id, status, exclude_id or 0)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    @staticmethod
+    def _rebalance_column(cursor, board_id, status):
+        """
+        Rewrite the ranks of one column as short, evenly spaced keys.
+        
+        This is the only operation that touches every card in a column; it
+        runs rarely, when keys have grown past ranking.REBALANCE_LENGTH.
+        """
+        cursor.execute(
+            'SELECT id FROM tasks WHERE board_id = ? AND status = ? ORDER BY rank IS NULL, rank, id',
+            (board_id, status)
+        )
+        task_ids = [row[0] for row in cursor.fetchall()]
+        keys = ranking.keys_between(None, None, len(task_ids))
+        cursor.executemany('UPDATE tasks SET rank = ? WHERE id = ?', zip(keys, task_ids))
+        cursor.execute('UPDATE boards SET version = version + 1 WHERE id = ?', (board_id,))
+    
+    def rebalance_ranks(self, board_id=DEFAULT_BOARD_ID, status=None):
+        """
+        Rebalance the ranks of one column, or of every column of a board.
+        
+        Returns:
+            int: The number of columns rebalanced.
+        """
+        def work(cursor):
+            if status is None:
+                cursor.execute('SELECT DISTINCT status FROM tasks WHERE board_id = ?', (board_id,))
+                statuses = [row[0] for row in cursor.fetchall()]
+            else:
+                statuses = [status]
+            for column_status in statuses:
+                self._rebalance_column(cursor, board_id, column_status)
+            return len(statuses)
+        
+        return self._write(work)
+    
+    def _schedule_rebalance(self, board_id, status):
+        """Rebalance a column in a background thread, at most once at a time per column."""
+        column = (board_id, status)
+        with self._cache_lock:
+            if column in self._pending_rebalances:
+                return
+            self._pending_rebalances.add(column)
+        
+        def run():
+            try:
+                self.rebalance_ranks(board_id, status)
+            finally:
+                with self._cache_lock:
+                    self._pending_rebalances.discard(column)
+        
+        threading.Thread(target=run, name='rank-rebalance', daemon=True).start()
+    
+    def statement_stats(self):
+        """Get hit and miss counts of the built statement cache."""
+        return self._statements.stats()
+    
+    def query_stats(self):
+        """Get timings, row counts and query plans per statement, most total time first."""
+        return self._tracer.stats()
+    
+    def reset_query_stats(self):
+        """Forget the collected query statistics."""
+        self._tracer.reset()
+    
+    def create_board(self, name):
+        """Create a new board."""
+        def work(cursor):
+            cursor.execute('INSERT INTO boards (name) VALUES (?)', (name,))
+            return cursor.lastrowid
         
-            conn.commit()
+        return self.get_board(self._write(work))
+    
+    def get_board(self, board_id):
+        """Get a single board by ID."""
+        with self._read_connection() as conn:
+            row = conn.execute('SELECT * FROM boards WHERE id = ?', (board_id,)).fetchone()
+            return dict(row) if row else None
+    
+    def get_all_boards(self):
+        """Get all boards."""
+        with self._read_connection() as conn:
+            return [dict(row) for row in conn.execute('SELECT * FROM boards ORDER BY id').fetchall()]
+    
+    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None,
+                    board_id=DEFAULT_BOARD_ID, labels=None):
+        """Create a new task in SQLite."""
+        status = TaskDAO._string_to_status(status).value
+        priority = TaskDAO._string_to_priority(priority).value
+        due_date = normalize_due_date(due_date)
+        labels = normalize_labels(labels) if labels is not None else []
         
-            # Return the created task
+        def work(cursor):
+            # New cards go to the bottom of their column
+            rank = ranking.key_between(self._last_rank(cursor, board_id, status), None)
+            cursor.execute('''
+            INSERT INTO tasks (board_id, title, description, status, priority, due_date, rank)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (board_id, title, description, status, priority, due_date, rank))
             task_id = cursor.lastrowid
-            return self.get_task(task_id)
-        finally:
-            conn.close()
+            self._bump_board_version(cursor, board_id)
+            return task_id, self._replace_labels(cursor, board_id, task_id, labels) if labels else None
+        
+        task_id, label_change = self._write(work)
+        if label_change is not None:
+            self._label_indexes.labels_changed(board_id, task_id=task_id, **label_change)
+        
+        # Return the created task
+        return self.get_task(task_id, board_id)
     
-    def get_task(self, task_id):
+    def get_task(self, task_id, board_id=DEFAULT_BOARD_ID):
         """Get a single task by ID."""
-        conn = self._get_connection()
-        try:
+        with self._read_connection() as conn:
+            tasks = self._fetch_tasks(conn.cursor(), 'WHERE tasks.id = ? AND tasks.board_id = ?', (task_id, board_id))
+            return tasks[0] if tasks else None
+    
+    def get_all_tasks(self, board_id=DEFAULT_BOARD_ID):
+        """
+        Get all tasks of a board from SQLite.
+        
+        Results are cached per board and reused for as long as the board's
+        version is unchanged, so repeated board loads cost a single primary
+        key lookup. The version lives in the database, which keeps the cache
+        correct when several processes write to the same file.
+        """
+        return self._board_snapshot(board_id)[1]
+    
+    def _board_snapshot(self, board_id):
+        """Get a board's version and all its tasks, read in one transaction; (None, []) if it does not exist."""
+        with self._read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
+            # One read transaction, so the tasks match the version they are cached under
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT version FROM boards WHERE id = ?', (board_id,))
             row = cursor.fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+            if row is None:
+                return None, []
+            version = row['version']
+            
+            with self._cache_lock:
+                cached = self._board_cache.get(board_id)
+                if cached and cached[0] == version:
+                    self._board_cache.move_to_end(board_id)
+                    return version, self._copy_tasks(cached[1])
+            
+            tasks = self._fetch_tasks(cursor, 'WHERE tasks.board_id = ? ORDER BY status, rank', (board_id,))
+        
+        with self._cache_lock:
+            self._board_cache[board_id] = (version, tasks)
+            self._board_cache.move_to_end(board_id)
+            while len(self._board_cache) > self.BOARD_CACHE_SIZE:
+                self._board_cache.popitem(last=False)
+        return version, self._copy_tasks(tasks)
     
-    def get_all_tasks(self):
-        """Get all tasks from SQLite."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks')
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+    @staticmethod
+    def _copy_tasks(tasks):
+        """Copy cached tasks, down to their label lists, so callers cannot change the cache."""
+        return [dict(task, labels=list(task['labels'])) for task in tasks]
+    
+    def get_task_changes(self, board_id=DEFAULT_BOARD_ID, since=None):
+        """
+        Get what changed on a board after a given board version, for delta sync.
+        
+        Args:
+            board_id (int, optional): The board to read. Defaults to DEFAULT_BOARD_ID.
+            since (int, optional): The board version the client already has; None for everything.
+        
+        Returns:
+            dict: The current `version`, the `changed` tasks, the IDs of `deleted` tasks, and
+            `reset`, which is true when `changed` is the whole board and replaces the client's
+            copy (for a full load, or a `since` from a different database). None if the board
+            does not exist.
+        """
+        if since is not None:
+            with self._read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                cursor.execute('SELECT version FROM boards WHERE id = ?', (board_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                version = row['version']
+                if since <= version:
+                    changed, deleted = [], []
+                    if since < version:
+                        changed = self._fetch_tasks(
+                            cursor, 'WHERE tasks.board_id = ? AND tasks.changed_seq > ?', (board_id, since)
+                        )
+                        cursor.execute(
+                            'SELECT task_id FROM task_tombstones WHERE board_id = ? AND deleted_seq > ?',
+                            (board_id, since)
+                        )
+                        deleted = [row[0] for row in cursor.fetchall()]
+                    return {"version": version, "changed": changed, "deleted": deleted, "reset": False}
+        
+        version, tasks = self._board_snapshot(board_id)
+        if version is None:
+            return None
+        return {"version": version, "changed": tasks, "deleted": [], "reset": True}
     
-    def update_task(self, task_id, **kwargs):
-        """Update an existing task."""
+    def update_task(self, task_id, board_id=DEFAULT_BOARD_ID, expected_version=None, **kwargs):
+        """
+        Update an existing task, incrementing its version.
+        
+        With `expected_version` the update is a compare-and-swap: it only
+        applies if the row is still at that version, checked in the UPDATE
+        itself, so no lock is held between reading and writing the task.
+        `labels`, if given, replaces the task's labels.
+        
+        Raises:
+            ValueError: If a field is not updatable or its value or the labels are invalid.
+            VersionConflictError: If the task is not at `expected_version`.
+        """
         if not kwargs:
             return None
+        labels = kwargs.pop('labels', None)
+        if labels is not None:
+            labels = normalize_labels(labels)
+        canonical_fields(kwargs)
+        if 'status' in kwargs:
+            kwargs['status'] = TaskDAO._string_to_status(kwargs['status']).value
+        if 'priority' in kwargs:
+            kwargs['priority'] = TaskDAO._string_to_priority(kwargs['priority']).value
+        if 'due_date' in kwargs:
+            kwargs['due_date'] = normalize_due_date(kwargs['due_date'])
         
-        conn = self._get_connection()
-        try:
+        def work(cursor):
+            if 'status' in kwargs and 'rank' not in kwargs:
+                # A card that changes column goes to the bottom of the new one
+                cursor.execute('SELECT status FROM tasks WHERE id = ? AND board_id = ?', (task_id, board_id))
+                row = cursor.fetchone()
+                if row and row[0] != kwargs['status']:
+                    last_rank = self._last_rank(cursor, board_id, kwargs['status'])
+                    kwargs['rank'] = ranking.key_between(last_rank, None)
+            
+            # The same set of fields always maps to the same cached SQL text
+            columns = canonical_fields(kwargs, TASK_UPDATE_COLUMNS)
+            values = [kwargs[column] for column in columns]
+            values.extend([task_id, board_id])
+            if expected_version is not None:
+                values.append(expected_version)
+            cursor.execute(self._statements.update_task(columns, expected_version is not None), values)
+            if cursor.rowcount:
+                self._bump_board_version(cursor, board_id)
+                if labels is not None:
+                    return self._replace_labels(cursor, board_id, task_id, labels)
+            elif expected_version is not None:
+                # Tell a lost race apart from a missing task
+                current = self._fetch_tasks(cursor, 'WHERE tasks.id = ? AND tasks.board_id = ?', (task_id, board_id))
+                if current:
+                    raise VersionConflictError(current[0])
+            return None
+        
+        label_change = self._write(work)
+        if label_change is not None:
+            self._label_indexes.labels_changed(board_id, task_id=task_id, **label_change)
+        return self.get_task(task_id, board_id)
+    
+    def delete_task(self, task_id, board_id=DEFAULT_BOARD_ID):
+        """Delete a task, along with its dependency links and labels."""
+        def work(cursor):
+            cursor.execute('DELETE FROM tasks WHERE id = ? AND board_id = ?', (task_id, board_id))
+            if not cursor.rowcount:
+                return False, None, None
+            cursor.execute(
+                "INSERT INTO task_transitions (board_id, task_id, status, at) "
+                "VALUES (?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))",
+                (board_id, task_id, REMOVED)
+            )
+            self._bump_board_version(cursor, board_id)
+            cursor.execute('DELETE FROM task_links WHERE blocker_id = ? OR blocked_id = ?', (task_id, task_id))
+            link_version = self._bump_link_version(cursor, board_id) if cursor.rowcount else None
+            return True, link_version, self._replace_labels(cursor, board_id, task_id, [])
+        
+        deleted, link_version, label_change = self._write(work)
+        if link_version is not None:
+            self._closures.task_removed(board_id, task_id, link_version)
+        if label_change is not None:
+            self._label_indexes.labels_changed(board_id, task_id=task_id, **label_change)
+        return deleted
+    
+    @staticmethod
+    def _bump_link_version(cursor, board_id):
+        """Record that a board's links changed; returns the link version they changed from."""
+        cursor.execute('SELECT link_version FROM boards WHERE id = ?', (board_id,))
+        version = cursor.fetchone()[0]
+        cursor.execute('UPDATE boards SET link_version = link_version + 1 WHERE id = ?', (board_id,))
+        return version
+    
+    def _closure(self, cursor, board_id, task_id, direction, version):
+        """Get a task's closure in one direction at a link version, from the cache or the database."""
+        closure = self._closures.get(board_id, direction, task_id, version)
+        if closure is None:
+            cursor.execute(CLOSURE_SQL[direction], (task_id,))
+            closure = closure_from_links(task_id, direction, cursor.fetchall())
+            self._closures.put(board_id, direction, task_id, version, closure)
+        return closure
+    
+    def add_link(self, blocker_id, blocked_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Record that one task blocks another.
+        
+        Args:
+            blocker_id (int): The task that has to be done first.
+            blocked_id (int): The task it blocks.
+            board_id (int, optional): The board of both tasks. Defaults to DEFAULT_BOARD_ID.
+        
+        Returns:
+            bool: True if the link exists now, False if either task was not found.
+        
+        Raises:
+            ValueError: If both IDs are the same task.
+            LinkCycleError: If the blocked task already blocks the blocker.
+        """
+        if blocker_id == blocked_id:
+            raise ValueError("A task cannot block itself")
+        
+        def work(cursor):
+            cursor.execute(
+                'SELECT COUNT(*) FROM tasks WHERE id IN (?, ?) AND board_id = ?', (blocker_id, blocked_id, board_id)
+            )
+            if cursor.fetchone()[0] < 2:
+                return False, None
+            cursor.execute('SELECT link_version FROM boards WHERE id = ?', (board_id,))
+            blocked_blocks, _ = self._closure(cursor, board_id, blocked_id, BLOCKS, cursor.fetchone()[0])
+            if blocker_id in blocked_blocks:
+                raise LinkCycleError(blocker_id, blocked_id)
+            cursor.execute(
+                'INSERT OR IGNORE INTO task_links (blocker_id, blocked_id) VALUES (?, ?)', (blocker_id, blocked_id)
+            )
+            return True, self._bump_link_version(cursor, board_id) if cursor.rowcount else None
+        
+        linked, version = self._write(work)
+        if version is not None:
+            self._closures.link_changed(board_id, blocker_id, blocked_id, version)
+        return linked
+    
+    def remove_link(self, blocker_id, blocked_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Remove a dependency link.
+        
+        Returns:
+            bool: True if the link was removed, False if it did not exist.
+        """
+        def work(cursor):
+            cursor.execute(
+                'DELETE FROM task_links WHERE blocker_id = ? AND blocked_id = ? '
+                'AND blocker_id IN (SELECT id FROM tasks WHERE board_id = ?)',
+                (blocker_id, blocked_id, board_id)
+            )
+            return self._bump_link_version(cursor, board_id) if cursor.rowcount else None
+        
+        version = self._write(work)
+        if version is None:
+            return False
+        self._closures.link_changed(board_id, blocker_id, blocked_id, version)
+        return True
+    
+    def get_task_graph(self, task_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Get everything a task transitively blocks and is blocked by.
+        
+        Both closures come from the closure cache while the board's links
+        are unchanged; otherwise each is one recursive query.
+        
+        Returns:
+            dict: The graph as built by links.task_graph(), or None if the task was not found.
+        """
+        with self._read_connection() as conn:
             cursor = conn.cursor()
+            # One read transaction, so both closures match the link version they are cached under
+            cursor.execute('BEGIN')
+            cursor.execute(
+                'SELECT boards.link_version FROM tasks JOIN boards ON boards.id = tasks.board_id '
+                'WHERE tasks.id = ? AND tasks.board_id = ?',
+                (task_id, board_id)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            blocks = self._closure(cursor, board_id, task_id, BLOCKS, row[0])
+            blocked_by = self._closure(cursor, board_id, task_id, BLOCKED_BY, row[0])
+        return task_graph(task_id, blocks, blocked_by)
+    
+    @staticmethod
+    def _replace_labels(cursor, board_id, task_id, labels):
+        """
+        Replace a task's labels inside the writing transaction.
+        
+        Returns:
+            dict: The label `version` the board changed from and the labels
+            `added` and `removed`, for LabelIndexCache.labels_changed(); None if nothing changed.
+        """
+        cursor.execute('SELECT label FROM task_labels WHERE task_id = ?', (task_id,))
+        current = {row[0] for row in cursor.fetchall()}
+        added = [label for label in labels if label not in current]
+        removed = sorted(current.difference(labels))
+        if not (added or removed):
+            return None
+        cursor.executemany(
+            'DELETE FROM task_labels WHERE task_id = ? AND label = ?', ((task_id, label) for label in removed)
+        )
+        cursor.executemany(
+            'INSERT INTO task_labels (task_id, label, board_id) VALUES (?, ?, ?)',
+            ((task_id, label, board_id) for label in added)
+        )
+        cursor.execute('SELECT label_version FROM boards WHERE id = ?', (board_id,))
+        version = cursor.fetchone()[0]
+        cursor.execute('UPDATE boards SET label_version = label_version + 1 WHERE id = ?', (board_id,))
+        return {"version": version, "added": added, "removed": removed}
+    
+    @staticmethod
+    def _build_label_index(cursor, board_id):
+        """Build a board's label bitmaps from the task_labels index, one label at a time."""
+        cursor.execute('SELECT DISTINCT label FROM task_labels WHERE board_id = ?', (board_id,))
+        bitmaps = {}
+        for (label,) in cursor.fetchall():
+            cursor.execute(
+                'SELECT task_id FROM task_labels WHERE board_id = ? AND label = ? ORDER BY task_id', (board_id, label)
+            )
+            bitmaps[label] = Bitmap.from_sorted([row[0] for row in cursor.fetchall()])
+        return LabelIndex(bitmaps)
+    
+    def get_tasks_by_labels(self, labels, mode=AND, board_id=DEFAULT_BOARD_ID):
+        """
+        Get the tasks of a board that carry all (mode 'and') or any (mode 'or') of some labels.
+        
+        The matching IDs come from the board's label bitmaps, intersected or
+        united in memory; only the matching tasks are then read, by primary
+        key. The bitmaps are built on the first filter and kept in the label
+        index cache, where this process's own label changes are applied in
+        place; a change from another process moves the board's label version
+        on and leads to a rebuild.
+        
+        Args:
+            labels (list): The labels to filter by.
+            mode (str, optional): 'and' or 'or'. Defaults to 'and'.
+            board_id (int, optional): The board to read. Defaults to DEFAULT_BOARD_ID.
+        
+        Returns:
+            list: The matching tasks in board order, or None if the board does not exist.
+        
+        Raises:
+            ValueError: If `mode` is not 'and' or 'or'.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            # One read transaction, so the bitmaps match the label version they are cached under
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT label_version FROM boards WHERE id = ?', (board_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            version = row[0]
+            task_ids = self._label_indexes.match(board_id, version, labels, mode)
+            if task_ids is None:
+                index = self._build_label_index(cursor, board_id)
+                task_ids = index.match(labels, mode)
+                self._label_indexes.put(board_id, version, index)
+            if not task_ids:
+                return []
+            # Look the matches up by primary key; the unary + keeps SQLite from
+            # walking the whole board by board_id instead. Archived tasks keep
+            # their labels, so some IDs may no longer be on the board.
+            return self._fetch_tasks(
+                cursor,
+                'WHERE tasks.id IN (SELECT value FROM json_each(?)) AND +tasks.board_id = ? ORDER BY status, rank',
+                (json.dumps(list(task_ids)), board_id)
+            )
+    
+    def create_tasks_bulk(self, rows, board_id=DEFAULT_BOARD_ID):
+        """
+        Insert many validated task rows in a single transaction.
+        
+        A row's rank, from an export, is kept unless another card in its
+        column already has it, so an exported board imports in the same
+        order; rows without one go below their column's last card.
+        """
+        def work(cursor):
+            # Keep the imported ranks that are still free in their column
+            ranks = [row[6] for row in rows]
+            ranked = {}
+            for index, row in enumerate(rows):
+                if ranks[index] is not None:
+                    ranked.setdefault(row[2], []).append(index)
+            for status, indexes in ranked.items():
+                cursor.execute(
+                    'SELECT rank FROM tasks WHERE board_id = ? AND status = ? '
+                    'AND rank IN (SELECT value FROM json_each(?))',
+                    (board_id, status, json.dumps([ranks[index] for index in indexes]))
+                )
+                taken = {row[0] for row in cursor.fetchall()}
+                for index in indexes:
+                    if ranks[index] in taken:
+                        ranks[index] = None
+                    else:
+                        taken.add(ranks[index])
+            
+            # Append the other cards of each status below that column's current last card
+            for status in {row[2] for row in rows}:
+                indexes = [index for index, row in enumerate(rows) if row[2] == status and ranks[index] is None]
+                if indexes:
+                    last_rank = self._last_rank(cursor, board_id, status)
+                    for index, key in zip(indexes, ranking.keys_between(last_rank, None, len(indexes))):
+                        ranks[index] = key
+            
+            # Setting changed_seq up front spares the insert trigger a write per row
+            cursor.execute('SELECT version + 1 FROM boards WHERE id = ?', (board_id,))
+            changed_seq = cursor.fetchone()[0]
+            cursor.executemany('''
+            INSERT INTO tasks (board_id, title, description, status, priority, due_date, rank, changed_seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ((board_id,) + tuple(row[:5]) + (rank, changed_seq) for row, rank in zip(rows, ranks)))
+            self._bump_board_version(cursor, board_id)
+            
+            if any(row[5] for row in rows):
+                # The new rows are the only ones at this changed_seq, in insert order
+                cursor.execute(
+                    'SELECT id FROM tasks WHERE board_id = ? AND changed_seq = ? ORDER BY id', (board_id, changed_seq)
+                )
+                task_ids = [row[0] for row in cursor.fetchall()]
+                cursor.executemany(
+                    'INSERT INTO task_labels (task_id, label, board_id) VALUES (?, ?, ?)',
+                    ((task_id, label, board_id) for task_id, row in zip(task_ids, rows) for label in row[5])
+                )
+                # Cached label indexes are rebuilt at the new label version
+                cursor.execute('UPDATE boards SET label_version = label_version + 1 WHERE id = ?', (board_id,))
+        
+        self._write(work)
+        return len(rows)
+    
+    def iter_tasks(self, chunk_size=1000, board_id=DEFAULT_BOARD_ID):
+        """
+        Iterate over all tasks of a board in ID order, one chunk at a time.
+        
+        Each chunk is a separate short query keyed on the last ID seen, so a
+        long export never holds a read transaction open against writers.
+        """
+        last_id = 0
+        while True:
+            with self._read_connection() as conn:
+                tasks = self._fetch_tasks(
+                    conn.cursor(),
+                    'WHERE tasks.board_id = ? AND tasks.id > ? ORDER BY tasks.id LIMIT ?',
+                    (board_id, last_id, chunk_size)
+                )
+            if not tasks:
+                return
+            yield tasks
+            last_id = tasks[-1]['id']
+    
+    def move_task(self, task_id, status=None, before_id=None, after_id=None, board_id=DEFAULT_BOARD_ID,
+                  expected_version=None):
+        """
+        Move a task within its column or to another column.
+        
+        The task is placed directly before `before_id` or directly after
+        `after_id`; with neither it goes to the bottom of the column. Only
+        the moved row is written: its new rank is generated between the
+        ranks of its new neighbours.
+        
+        Args:
+            task_id (int): The task to move.
+            status (str, optional): The column to move to. Defaults to the anchor's or the task's current column.
+            before_id (int, optional): The task to place this one before.
+            after_id (int, optional): The task to place this one after.
+            board_id (int, optional): The board of the task. Defaults to DEFAULT_BOARD_ID.
+            expected_version (int, optional): Only move the task if it is still at this version.
             
-            # Build the update query dynamically
-            set_clause = ', '.join([f"{key} = ?" for key in kwargs.keys()])
-            values = list(kwargs.values())
-            values.append(task_id)
+        Returns:
+            dict: The moved task, or None if the task was not found.
             
-            query = f"UPDATE tasks SET {set_clause} WHERE id = ?"
-            cursor.execute(query, values)
+        Raises:
+            ValueError: If `status` is not a valid status, or the anchor task does not
+                exist or is in a different column than `status`.
+            VersionConflictError: If the task is not at `expected_version`.
+        """
+        if before_id is not None and after_id is not None:
+            raise ValueError("Provide either before or after, not both")
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id == task_id:
+            raise ValueError("A task cannot be moved relative to itself")
+        if status is not None:
+            status = TaskDAO._string_to_status(status).value
+        
+        def work(cursor):
+            cursor.execute('SELECT status, version FROM tasks WHERE id = ? AND board_id = ?', (task_id, board_id))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            if expected_version is not None and row[1] != expected_version:
+                # Checked and written by the one writer thread, so nothing can change in between
+                raise VersionConflictError(
+                    self._fetch_tasks(cursor, 'WHERE tasks.id = ? AND tasks.board_id = ?', (task_id, board_id))[0]
+                )
+            target_status = status or row[0]
             
-            conn.commit()
+            anchor = None
+            if anchor_id is not None:
+                cursor.execute(
+                    'SELECT status, rank FROM tasks WHERE id = ? AND board_id = ?', (anchor_id, board_id)
+                )
+                anchor = cursor.fetchone()
+                if anchor is None:
+                    raise ValueError(f"Task {anchor_id} not found")
+                if status and anchor[0] != status:
+                    raise ValueError(f"Task {anchor_id} is not in the '{status}' column")
+                target_status = anchor[0]
             
-            return self.get_task(task_id)
-        finally:
-            conn.close()
+            rank = self._rank_for_move(cursor, board_id, task_id, target_status, anchor, before_id is not None)
+            cursor.execute(
+                'UPDATE tasks SET status = ?, rank = ?, version = version + 1 WHERE id = ?',
+                (target_status, rank, task_id)
+            )
+            self._bump_board_version(cursor, board_id)
+            return target_status, rank
+        
+        moved = self._write(work)
+        if moved is None:
+            return None
+        target_status, rank = moved
+        if len(rank) > ranking.REBALANCE_LENGTH:
+            self._schedule_rebalance(board_id, target_status)
+        
+        return self.get_task(task_id, board_id)
     
-    def delete_task(self, task_id):
-        """Delete a task."""
-        conn = self._get_connection()
+    def _rank_for_move(self, cursor, board_id, task_id, status, anchor, before):
+        """Find the rank between the moved task's new neighbours."""
+        if anchor is None:
+            return ranking.key_between(self._last_rank(cursor, board_id, status, task_id), None)
+        
+        anchor_rank = anchor[1]
+        if before:
+            cursor.execute(
+                'SELECT rank FROM tasks WHERE board_id = ? AND status = ? AND rank < ? AND id != ? '
+                'ORDER BY rank DESC LIMIT 1',
+                (board_id, status, anchor_rank, task_id)
+            )
+            neighbour = cursor.fetchone()
+            lower, upper = (neighbour[0] if neighbour else None), anchor_rank
+        else:
+            cursor.execute(
+                'SELECT rank FROM tasks WHERE board_id = ? AND status = ? AND rank > ? AND id != ? '
+                'ORDER BY rank LIMIT 1',
+                (board_id, status, anchor_rank, task_id)
+            )
+            neighbour = cursor.fetchone()
+            lower, upper = anchor_rank, (neighbour[0] if neighbour else None)
+        return ranking.key_between(lower, upper)
+    
+    def archive_done_tasks(self, older_than, board_id=DEFAULT_BOARD_ID, chunk_size=1000):
+        """
+        Move Done tasks completed before a cutoff from the tasks table to tasks_archive.
+        
+        Tasks are moved in chunks, each in its own short transaction, so a
+        large backlog never holds up other writes for long. Their dependency
+        links are deleted, as when a task is deleted.
+        
+        Args:
+            older_than (timedelta): Archive tasks completed at least this long ago.
+            board_id (int, optional): The board to archive. Defaults to DEFAULT_BOARD_ID.
+            chunk_size (int, optional): Tasks moved per transaction.
+            
+        Returns:
+            int: The number of tasks archived.
+        """
         try:
+            cutoff = (datetime.now(timezone.utc) - older_than).strftime('%Y-%m-%d %H:%M:%S')
+        except OverflowError:
+            # Before year 1: nothing was completed that long ago
+            return 0
+        columns = ', '.join(self.ARCHIVE_COLUMNS)
+        condition = "board_id = ? AND status = 'Done' AND COALESCE(completed_at, created_at) < ?"
+        
+        def work(cursor):
+            cursor.execute(
+                f'SELECT MAX(id) FROM (SELECT id FROM tasks WHERE {condition} ORDER BY id LIMIT ?)',
+                (board_id, cutoff, chunk_size)
+            )
+            last_id = cursor.fetchone()[0]
+            if last_id is None:
+                return 0, [], None
+            params = (board_id, cutoff, last_id)
+            cursor.execute(
+                f'SELECT id FROM tasks WHERE {condition} AND id <= ? '
+                'AND (id IN (SELECT blocker_id FROM task_links) OR id IN (SELECT blocked_id FROM task_links))',
+                params
+            )
+            unlinked = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                f'INSERT INTO tasks_archive ({columns}) SELECT {columns} FROM tasks WHERE {condition} AND id <= ?',
+                params
+            )
+            cursor.execute(f'DELETE FROM tasks WHERE {condition} AND id <= ?', params)
+            moved = cursor.rowcount
+            self._bump_board_version(cursor, board_id)
+            link_version = None
+            if unlinked:
+                cursor.executemany(
+                    'DELETE FROM task_links WHERE blocker_id = ? OR blocked_id = ?',
+                    ((task_id, task_id) for task_id in unlinked)
+                )
+                link_version = self._bump_link_version(cursor, board_id)
+            return moved, unlinked, link_version
+        
+        archived = 0
+        while True:
+            moved, unlinked, link_version = self._write(work)
+            if link_version is not None:
+                self._closures.tasks_removed(board_id, unlinked, link_version)
+            if not moved:
+                return archived
+            archived += moved
+    
+    def get_transitions(self, board_id=DEFAULT_BOARD_ID, after_id=0):
+        """
+        Get a board's status transitions recorded after a given one, for flow analytics.
+        
+        Args:
+            board_id (int, optional): The board to read. Defaults to DEFAULT_BOARD_ID.
+            after_id (int, optional): Only return transitions with higher IDs; the last one already loaded.
+        
+        Returns:
+            tuple: The board version and (id, task_id, status, at) tuples in ID
+            order, read in one transaction; (None, []) if the board does not exist.
+        """
+        with self._read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
\ No newline at end of file
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT version FROM boards WHERE id = ?', (board_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None, []
+            cursor.row_factory = None
+            cursor.execute(
+                'SELECT id, task_id, status, at FROM task_transitions WHERE board_id = ? AND id > ? ORDER BY id',
+                (board_id, after_id)
+            )
+            return row['version'], cursor.fetchall()
+    
+    def get_archived_tasks(self, board_id=DEFAULT_BOARD_ID, before_id=None, limit=100):
+        """
+        Get one page of archived tasks, newest first.
+        
+        Args:
+            board_id (int, optional): The board to read. Defaults to DEFAULT_BOARD_ID.
+            before_id (int, optional): Return tasks with IDs below this one; the previous page's last ID.
+            limit (int, optional): The page size.
+            
+        Returns:
+            list: Archived task dictionaries, with the labels they had.
+        """
+        if before_id is None:
+            condition = 'WHERE board_id = ? ORDER BY id DESC LIMIT ?'
+            params = (board_id, limit)
+        else:
+            condition = 'WHERE board_id = ? AND id < ? ORDER BY id DESC LIMIT ?'
+            params = (board_id, before_id, limit)
+        with self._read_connection() as conn:
+            return self._fetch_tasks(conn.cursor(), condition, params, select=self.ARCHIVE_SELECT)
+    
+    def restore_task(self, task_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Move an archived task back to the board, at the bottom of the Done column.
+        
+        Its links were deleted when it was archived, so it comes back without
+        any; the link version still moves on so no closure cached while it
+        was archived is served for it.
+        
+        Returns:
+            dict: The restored task, or None if no such task is archived.
+        """
+        columns = ', '.join(self.ARCHIVE_COLUMNS)
+        # Everything is copied back except the rank, which is assigned afresh
+        values = ', '.join('?' if column == 'rank' else column for column in self.ARCHIVE_COLUMNS)
+        
+        def work(cursor):
+            cursor.execute(
+                'SELECT status FROM tasks_archive WHERE id = ? AND board_id = ?', (task_id, board_id)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            rank = ranking.key_between(self._last_rank(cursor, board_id, row[0]), None)
+            cursor.execute(
+                f'INSERT INTO tasks ({columns}) SELECT {values} FROM tasks_archive WHERE id = ?',
+                (rank, task_id)
+            )
+            cursor.execute('DELETE FROM tasks_archive WHERE id = ?', (task_id,))
+            cursor.execute('DELETE FROM task_tombstones WHERE task_id = ?', (task_id,))
+            self._bump_board_version(cursor, board_id)
+            return self._bump_link_version(cursor, board_id)
+        
+        link_version = self._write(work)
+        if link_version is None:
+            return None
+        self._closures.task_removed(board_id, task_id, link_version)
+        return self.get_task(task_id, board_id)
@@ -0,0 +1,33 @@
+"""
+Exceptions raised by the task DAOs.
+"""
+
+
+class VersionConflictError(Exception):
+    """
+    Raised when a conditional update finds the task at a different version.
+
+    Attributes:
+        current (dict): The task as it is now stored, including its current version.
+    """
+
+    def __init__(self, current):
+        super().__init__(f"Task {current['id']} is at version {current['version']}")
+        self.current = current
+
+
+class LinkCycleError(Exception):
+    """
+    Raised when a dependency link would make a task transitively block itself.
+
+    Attributes:
+        blocker_id (int): The task that was to block the other one.
+        blocked_id (int): The task that already blocks it, directly or through other tasks.
+    """
+
+    def __init__(self, blocker_id, blocked_id):
+        super().__init__(
+            f"Task {blocked_id} already blocks task {blocker_id}, so this link would create a cycle"
+        )
+        self.blocker_id = blocker_id
+        self.blocked_id = blocked_id
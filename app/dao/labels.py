@@ -0,0 +1,158 @@
+"""
+Task labels and the bitmap indexes that filter by them.
+Each board's index holds one compressed bitmap of task IDs per label, so
+"tasks with all of these labels" is an intersection and "with any of them"
+a union of a few bitmaps, whatever the size of the board. The in-memory DAO
+keeps its indexes current as tasks change; the SQLite DAO builds them from
+the task_labels table and caches them per board label version.
+"""
+
+import threading
+from collections import OrderedDict
+
+from app.bitmap import Bitmap
+
+# Filter modes: tasks with every label, or with at least one
+AND = 'and'
+OR = 'or'
+MODES = (AND, OR)
+
+MAX_LABEL_LENGTH = 50
+
+
+def normalize_labels(labels):
+    """
+    Validate a task's labels.
+
+    Args:
+        labels (list): Label strings; surrounding whitespace is ignored.
+
+    Returns:
+        list: The distinct labels, sorted.
+
+    Raises:
+        ValueError: If `labels` is not a list of non-empty strings of at most
+            MAX_LABEL_LENGTH characters without commas.
+    """
+    if not isinstance(labels, list):
+        raise ValueError("labels must be a list of strings")
+    normalized = set()
+    for label in labels:
+        if not isinstance(label, str) or not label.strip():
+            raise ValueError("labels must be non-empty strings")
+        label = label.strip()
+        if len(label) > MAX_LABEL_LENGTH:
+            raise ValueError(f"Labels are limited to {MAX_LABEL_LENGTH} characters")
+        if ',' in label:
+            raise ValueError("Labels cannot contain commas")
+        normalized.add(label)
+    return sorted(normalized)
+
+
+class LabelIndex:
+    """One bitmap of task IDs per label, for one board."""
+
+    def __init__(self, bitmaps=None):
+        """
+        Args:
+            bitmaps (dict, optional): Maps a label to the Bitmap of its task IDs.
+        """
+        self._bitmaps = bitmaps or {}
+
+    def add(self, task_id, labels):
+        """Record that a task carries some labels."""
+        for label in labels:
+            bitmap = self._bitmaps.get(label)
+            if bitmap is None:
+                bitmap = self._bitmaps[label] = Bitmap()
+            bitmap.add(task_id)
+
+    def remove(self, task_id, labels):
+        """Record that a task no longer carries some labels."""
+        for label in labels:
+            bitmap = self._bitmaps.get(label)
+            if bitmap is not None:
+                bitmap.discard(task_id)
+                if not bitmap:
+                    del self._bitmaps[label]
+
+    def match(self, labels, mode=AND):
+        """
+        Get the tasks carrying all (AND) or any (OR) of some labels.
+
+        Args:
+            labels (list): The labels to filter by.
+            mode (str, optional): AND or OR. Defaults to AND.
+
+        Returns:
+            Bitmap: The matching task IDs.
+
+        Raises:
+            ValueError: If `mode` is not one of MODES.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        bitmaps = [self._bitmaps.get(label) for label in labels]
+        if mode == AND:
+            if None in bitmaps:
+                return Bitmap()
+            return Bitmap.intersection(bitmaps)
+        return Bitmap.union(bitmap for bitmap in bitmaps if bitmap is not None)
+
+
+class LabelIndexCache:
+    """
+    LRU cache of board label indexes, tagged with each board's label version.
+
+    Like the closure cache, an index is only used at the label version it
+    was built or last updated at. Label changes made by this process are
+    applied to the cached index in place; a version it did not expect
+    means another process changed labels too, and the index is dropped.
+    """
+
+    def __init__(self, max_boards=16):
+        """
+        Args:
+            max_boards (int, optional): Boards whose indexes are kept.
+        """
+        self.max_boards = max_boards
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def match(self, board_id, version, labels, mode=AND):
+        """
+        Filter a board's tasks by labels with its cached index.
+
+        Returns:
+            Bitmap: The matching task IDs, or None if no index is cached at `version`.
+        """
+        with self._lock:
+            entry = self._indexes.get(board_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._indexes.move_to_end(board_id)
+            return entry[1].match(labels, mode)
+
+    def put(self, board_id, version, index):
+        """Cache an index built at a board's label version; stale builds are ignored."""
+        with self._lock:
+            entry = self._indexes.get(board_id)
+            if entry is not None and entry[0] > version:
+                return
+            self._indexes[board_id] = (version, index)
+            self._indexes.move_to_end(board_id)
+            while len(self._indexes) > self.max_boards:
+                self._indexes.popitem(last=False)
+
+    def labels_changed(self, board_id, version, task_id, added=(), removed=()):
+        """Apply one task's label change, made at label version `version`, to the cached index."""
+        with self._lock:
+            entry = self._indexes.get(board_id)
+            if entry is None:
+                return
+            if entry[0] != version:
+                del self._indexes[board_id]
+                return
+            entry[1].remove(task_id, removed)
+            entry[1].add(task_id, added)
+            self._indexes[board_id] = (version + 1, entry[1])
@@ -0,0 +1,200 @@
+"""
+Task dependency links and their transitive closures.
+A link (blocker_id, blocked_id) means the blocker has to be done before the
+blocked task. The tasks a task transitively blocks, or is blocked by, are
+computed by walking the links breadth-first: with a recursive CTE in SQLite,
+over an adjacency index in memory. Neither walk recurses in Python, so
+chains thousands of tasks deep are fine.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+# Closure directions: the tasks a task blocks, and the tasks blocking it
+BLOCKS = 'blocks'
+BLOCKED_BY = 'blocked_by'
+
+# Walks the links away from one task, one join per level, visiting each task
+# once; UNION also stops the walk on cycles. Returns every link on the way.
+_CLOSURE_SQL = '''
+    WITH RECURSIVE reach(id) AS (
+        VALUES (?)
+        UNION
+        SELECT task_links.{to} FROM task_links JOIN reach ON task_links.{start} = reach.id
+    )
+    SELECT task_links.blocker_id, task_links.blocked_id
+    FROM reach JOIN task_links ON task_links.{start} = reach.id
+'''
+
+CLOSURE_SQL = {
+    BLOCKS: _CLOSURE_SQL.format(start='blocker_id', to='blocked_id'),
+    BLOCKED_BY: _CLOSURE_SQL.format(start='blocked_id', to='blocker_id'),
+}
+
+
+def closure_from_links(task_id, direction, links):
+    """
+    Get the tasks a closure walk reached from the links it returned.
+
+    Args:
+        task_id (int): The task the walk started from.
+        direction (str): BLOCKS or BLOCKED_BY.
+        links (iterable): (blocker_id, blocked_id) pairs.
+
+    Returns:
+        tuple: The reached task IDs (excluding `task_id`) as a frozenset, and the links as a tuple of pairs.
+    """
+    links = tuple((blocker_id, blocked_id) for blocker_id, blocked_id in links)
+    column = 1 if direction == BLOCKS else 0
+    nodes = frozenset(link[column] for link in links)
+    return nodes - {task_id}, links
+
+
+def walk(adjacency, task_id, direction):
+    """
+    Walk an adjacency index breadth-first from one task.
+
+    Args:
+        adjacency (dict): Maps a task ID to the set of task IDs it blocks
+            (for BLOCKS) or is blocked by (for BLOCKED_BY).
+        task_id (int): The task to start from.
+        direction (str): BLOCKS or BLOCKED_BY.
+
+    Returns:
+        tuple: The reached task IDs as a frozenset, and the traversed links
+        as a tuple of (blocker_id, blocked_id) pairs.
+    """
+    seen = {task_id}
+    links = []
+    queue = deque([task_id])
+    while queue:
+        current = queue.popleft()
+        for neighbour in adjacency.get(current, ()):
+            links.append((current, neighbour) if direction == BLOCKS else (neighbour, current))
+            if neighbour not in seen:
+                seen.add(neighbour)
+                queue.append(neighbour)
+    seen.discard(task_id)
+    return frozenset(seen), tuple(links)
+
+
+def task_graph(task_id, blocks, blocked_by):
+    """
+    Build the dependency graph response of a task from its two closures.
+
+    Args:
+        task_id (int): The task.
+        blocks (tuple): Its BLOCKS closure, as (nodes, links).
+        blocked_by (tuple): Its BLOCKED_BY closure, as (nodes, links).
+
+    Returns:
+        dict: The IDs of the tasks it transitively blocks and is blocked by,
+        and the links between all of them as [blocker_id, blocked_id] pairs.
+    """
+    return {
+        "task_id": task_id,
+        "blocks": sorted(blocks[0]),
+        "blocked_by": sorted(blocked_by[0]),
+        "links": [list(link) for link in sorted(set(blocks[1]).union(blocked_by[1]))],
+    }
+
+
+class ClosureCache:
+    """
+    LRU cache of transitive closures, tagged with each board's link version.
+
+    Entries are only served for the link version they were computed at.
+    When this process changes a link it knows the version it changed, so it
+    drops only the closures the change can affect and keeps the rest; a
+    version it did not expect means another process changed the links too,
+    and the whole board is dropped.
+    """
+
+    def __init__(self, max_links=200_000):
+        """
+        Args:
+            max_links (int, optional): Total links kept across all cached closures.
+        """
+        self.max_links = max_links
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, board_id, direction, task_id, version):
+        """
+        Get a cached closure.
+
+        Returns:
+            tuple: (nodes, links) as returned by walk() and closure_from_links(), or None on a miss.
+        """
+        with self._lock:
+            if self._versions.get(board_id) != version:
+                return None
+            key = (board_id, direction, task_id)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, board_id, direction, task_id, version, entry):
+        """Cache a closure computed at a board's link version; stale results are ignored."""
+        with self._lock:
+            known = self._versions.get(board_id)
+            if known is not None and known > version:
+                return
+            if known != version:
+                self._drop_board(board_id)
+                self._versions[board_id] = version
+            key = (board_id, direction, task_id)
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += 1 + len(entry[1])
+            while self._size > self.max_links and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def link_changed(self, board_id, blocker_id, blocked_id, version):
+        """
+        Drop the closures a link added or removed at `version` can change.
+
+        Those are the BLOCKS closures of the blocker and of every task that
+        transitively blocks it, and the BLOCKED_BY closures of the blocked
+        task and of every task it transitively blocks. The cached closures
+        predate the change, so they are the entries that start at, or
+        contain, the blocker or the blocked task respectively.
+        """
+        self._invalidate(board_id, version, lambda direction, start, nodes: (
+            (direction == BLOCKS and (start == blocker_id or blocker_id in nodes))
+            or (direction == BLOCKED_BY and (start == blocked_id or blocked_id in nodes))
+        ))
+
+    def task_removed(self, board_id, task_id, version):
+        """Drop every closure that contains or starts from a deleted task."""
+        self.tasks_removed(board_id, {task_id}, version)
+
+    def tasks_removed(self, board_id, task_ids, version):
+        """Drop every closure that contains or starts from any of several tasks whose links went at `version`."""
+        task_ids = frozenset(task_ids)
+        self._invalidate(board_id, version, lambda direction, start, nodes: (
+            start in task_ids or not task_ids.isdisjoint(nodes)
+        ))
+
+    def _invalidate(self, board_id, version, affected):
+        with self._lock:
+            if self._versions.get(board_id) != version:
+                # Changes from elsewhere happened in between; nothing cached can be trusted
+                self._drop_board(board_id)
+            else:
+                for key in [key for key, entry in self._entries.items()
+                            if key[0] == board_id and affected(key[1], key[2], entry[0])]:
+                    self._remove(key)
+            self._versions[board_id] = max(self._versions.get(board_id, 0), version + 1)
+
+    def _drop_board(self, board_id):
+        for key in [key for key in self._entries if key[0] == board_id]:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= 1 + len(entry[1])
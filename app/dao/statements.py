@@ -0,0 +1,120 @@
+"""
+SQL statement building and caching for the SQLite DAO.
+Statements whose text depends on which fields a request sets (partial
+updates) are built from a whitelist of columns in a fixed order, so the
+same set of fields always produces the same SQL text. That keeps the text
+reusable by sqlite3's per-connection prepared statement cache, and the
+built text itself is cached here.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Fields a client may change through update_task, in canonical order
+TASK_UPDATE_FIELDS = ('title', 'description', 'status', 'priority', 'due_date')
+
+# Columns the DAO itself may set on update; rank follows status changes and moves
+TASK_UPDATE_COLUMNS = TASK_UPDATE_FIELDS + ('rank',)
+
+
+def canonical_fields(fields, allowed=TASK_UPDATE_FIELDS):
+    """
+    Put a set of field names into canonical order, rejecting unknown ones.
+
+    Args:
+        fields (iterable): The field names to check.
+        allowed (tuple, optional): The permitted fields, in canonical order. Defaults to TASK_UPDATE_FIELDS.
+
+    Returns:
+        tuple: The fields, ordered as in `allowed`.
+
+    Raises:
+        ValueError: If any field is not in `allowed`.
+    """
+    fields = set(fields)
+    unknown = fields.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(map(str, unknown)))}")
+    return tuple(field for field in allowed if field in fields)
+
+
+class StatementCache:
+    """LRU cache of built SQL text, keyed by statement kind and column set."""
+
+    def __init__(self, maxsize=128):
+        """
+        Args:
+            maxsize (int, optional): The number of statements to keep.
+        """
+        self.maxsize = maxsize
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """
+        Get the statement for a key, building it on a miss.
+
+        Args:
+            key (tuple): Identifies the statement, e.g. ('update_task', columns).
+            build (callable): Called with no arguments to build the SQL text.
+
+        Returns:
+            str: The SQL text.
+        """
+        with self._lock:
+            sql = self._statements.get(key)
+            if sql is not None:
+                self.hits += 1
+                self._statements.move_to_end(key)
+                return sql
+            self.misses += 1
+
+        sql = build()
+        with self._lock:
+            self._statements[key] = sql
+            while len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return sql
+
+    def update_task(self, columns, compare_version=False):
+        """
+        Get the UPDATE statement for a canonical tuple of task columns.
+
+        The statement also increments the row's version. Parameters are the
+        column values in the same order, then the task ID and board ID, then
+        the expected version if `compare_version` is set.
+
+        Args:
+            columns (tuple): Columns from TASK_UPDATE_COLUMNS, in canonical order.
+            compare_version (bool, optional): Only update a row still at the expected version.
+
+        Returns:
+            str: The SQL text.
+        """
+        def build():
+            # Only whitelisted names are ever interpolated into the SQL text
+            canonical_fields(columns, TASK_UPDATE_COLUMNS)
+            assignments = [f"{column} = ?" for column in columns] + ["version = version + 1"]
+            sql = f"UPDATE tasks SET {', '.join(assignments)} WHERE id = ? AND board_id = ?"
+            return sql + " AND version = ?" if compare_version else sql
+
+        return self.get(('update_task', columns, compare_version), build)
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Size, capacity, hits, misses and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._statements),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
@@ -3,15 +3,75 @@ Task Data Access Object (DAO) for managing tasks in memory.
 This module simulates a database using an in-memory list of tasks.
 """
 
-from app.models import Task, TaskStatus, TaskPriority
+import threading
+
+from app.models import Task, TaskStatus, TaskPriority, DEFAULT_BOARD_ID
+from app.due_dates import normalize_due_date
+from app.dao.errors import LinkCycleError, VersionConflictError
+from app.dao.labels import AND, LabelIndex, normalize_labels
+from app.dao.links import BLOCKED_BY, BLOCKS, task_graph, walk
+from app.dao.statements import canonical_fields
 
 class TaskDAO:
     def __init__(self):
         """Initialize the TaskDAO with an empty list of tasks."""
         self.tasks = []
         self.next_id = 1  # Auto-incrementing ID for new tasks
+        self.boards = {DEFAULT_BOARD_ID: {"id": DEFAULT_BOARD_ID, "name": "Default", "version": 0}}
+        self.next_board_id = DEFAULT_BOARD_ID + 1
+        # Dependency links indexed in both directions: task ID -> set of task IDs
+        self.blocks = {}
+        self.blocked_by = {}
+        # Label bitmaps per board: board ID -> LabelIndex
+        self.label_indexes = {}
+        # Makes the version check and the update in update_task, and the cycle
+        # check and the insert in add_link, one atomic step
+        self._lock = threading.Lock()
+
+    def _bump_board_version(self, board_id):
+        """Record that a board's tasks changed."""
+        if board_id in self.boards:
+            self.boards[board_id]["version"] += 1
+
+    def create_board(self, name):
+        """
+        Create a new board.
+        
+        Args:
+            name (str): The name of the board.
+        
+        Returns:
+            dict: The newly created board.
+        """
+        board = {"id": self.next_board_id, "name": name, "version": 0}
+        self.boards[board["id"]] = board
+        self.next_board_id += 1
+        return dict(board)
+
+    def get_board(self, board_id):
+        """
+        Retrieve a board by its ID.
+        
+        Args:
+            board_id (int): The ID of the board to retrieve.
+        
+        Returns:
+            dict: The board, or None if not found.
+        """
+        board = self.boards.get(board_id)
+        return dict(board) if board else None
+
+    def get_all_boards(self):
+        """
+        Retrieve all boards.
+        
+        Returns:
+            list: A list of all boards.
+        """
+        return [dict(board) for board in self.boards.values()]
 
-    def _string_to_status(self, status_str):
+    @staticmethod
+    def _string_to_status(status_str):
         """
         Convert a string status to a TaskStatus enum.
         
@@ -31,12 +91,13 @@ class TaskDAO:
             "Done": TaskStatus.DONE
         }
         
-        if status_str in status_mapping:
+        if isinstance(status_str, str) and status_str in status_mapping:
             return status_mapping[status_str]
         else:
             raise ValueError(f"Invalid status: {status_str}")
 
-    def _string_to_priority(self, priority_str):
+    @staticmethod
+    def _string_to_priority(priority_str):
         """
         Convert a string priority to a TaskPriority enum.
         
@@ -55,12 +116,13 @@ class TaskDAO:
             "Low": TaskPriority.LOW
         }
         
-        if priority_str in priority_mapping:
+        if isinstance(priority_str, str) and priority_str in priority_mapping:
             return priority_mapping[priority_str]
         else:
             raise ValueError(f"Invalid priority: {priority_str}")
 
-    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None):
+    def create_task(self, title, description="", status="To Do", priority="Medium", due_date=None,
+                    board_id=DEFAULT_BOARD_ID, labels=None):
         """
         Create a new task and add it to the in-memory list.
         
@@ -70,80 +132,294 @@ class TaskDAO:
             status (str or TaskStatus, optional): The current status of the task. Defaults to "To Do".
             priority (str or TaskPriority, optional): The priority level of the task. Defaults to "Medium".
             due_date (str, optional): The due date for the task. Defaults to None.
+            board_id (int, optional): The board to add the task to. Defaults to DEFAULT_BOARD_ID.
+            labels (list, optional): The task's labels. Defaults to none.
         
         Returns:
             Task: The newly created task.
         """
         # Convert string status/priority to enum if needed
-        if isinstance(status, str):
+        if not isinstance(status, TaskStatus):
             status = self._string_to_status(status)
-        if isinstance(priority, str):
+        if not isinstance(priority, TaskPriority):
             priority = self._string_to_priority(priority)
+        due_date = normalize_due_date(due_date)
+        labels = normalize_labels(labels) if labels is not None else []
         
-        task = Task(self.next_id, title, description, status, priority, due_date)
+        task = Task(self.next_id, title, description, status, priority, due_date, board_id, labels)
         self.tasks.append(task)
         self.next_id += 1
+        with self._lock:
+            self.label_indexes.setdefault(board_id, LabelIndex()).add(task.id, labels)
+        self._bump_board_version(board_id)
         return task
 
-    def get_task(self, task_id):
+    def get_task(self, task_id, board_id=DEFAULT_BOARD_ID):
         """
         Retrieve a task by its ID.
         
         Args:
             task_id (int): The ID of the task to retrieve.
+            board_id (int, optional): The board the task must belong to. Defaults to DEFAULT_BOARD_ID.
         
         Returns:
             Task: The task with the specified ID, or None if not found.
         """
         for task in self.tasks:
-            if task.id == task_id:
+            if task.id == task_id and task.board_id == board_id:
                 return task
         return None
 
-    def get_all_tasks(self):
+    def get_all_tasks(self, board_id=DEFAULT_BOARD_ID):
         """
-        Retrieve all tasks.
+        Retrieve all tasks of a board.
+        
+        Args:
+            board_id (int, optional): The board to list. Defaults to DEFAULT_BOARD_ID.
         
         Returns:
-            list: A list of all tasks.
+            list: A list of all tasks on the board.
         """
-        return [task.to_dict() for task in self.tasks]
+        return [task.to_dict() for task in self.tasks if task.board_id == board_id]
 
-    def update_task(self, task_id, **kwargs):
+    def update_task(self, task_id, board_id=DEFAULT_BOARD_ID, expected_version=None, **kwargs):
         """
         Update an existing task.
         
         Args:
             task_id (int): The ID of the task to update.
+            board_id (int, optional): The board the task must belong to. Defaults to DEFAULT_BOARD_ID.
+            expected_version (int, optional): Only update if the task is still at this version.
             **kwargs: Keyword arguments representing the fields to update (e.g., title, description, status).
         
         Returns:
             Task: The updated task, or None if the task was not found.
+        
+        Raises:
+            ValueError: If a field is not updatable.
+            VersionConflictError: If the task is not at `expected_version`.
         """
-        task = self.get_task(task_id)
+        labels = kwargs.pop('labels', None)
+        if labels is not None:
+            labels = normalize_labels(labels)
+        canonical_fields(kwargs)
+        task = self.get_task(task_id, board_id)
         if task:
             # Convert string status/priority to enum if needed
-            if 'status' in kwargs and isinstance(kwargs['status'], str):
+            if 'status' in kwargs and not isinstance(kwargs['status'], TaskStatus):
                 kwargs['status'] = self._string_to_status(kwargs['status'])
-            if 'priority' in kwargs and isinstance(kwargs['priority'], str):
+            if 'priority' in kwargs and not isinstance(kwargs['priority'], TaskPriority):
                 kwargs['priority'] = self._string_to_priority(kwargs['priority'])
+            if 'due_date' in kwargs:
+                kwargs['due_date'] = normalize_due_date(kwargs['due_date'])
             
-            task.update(**kwargs)
+            with self._lock:
+                if expected_version is not None and task.version != expected_version:
+                    raise VersionConflictError(task.to_dict())
+                task.update(**kwargs)
+                if labels is not None:
+                    index = self.label_indexes.setdefault(board_id, LabelIndex())
+                    index.remove(task_id, set(task.labels).difference(labels))
+                    index.add(task_id, set(labels).difference(task.labels))
+                    task.labels = labels
+                task.version += 1
+            self._bump_board_version(board_id)
             return task
         return None
 
-    def delete_task(self, task_id):
+    def delete_task(self, task_id, board_id=DEFAULT_BOARD_ID):
         """
         Delete a task by its ID.
         
         Args:
             task_id (int): The ID of the task to delete.
+            board_id (int, optional): The board the task must belong to. Defaults to DEFAULT_BOARD_ID.
         
         Returns:
             bool: True if the task was deleted, False otherwise.
         """
-        task = self.get_task(task_id)
+        task = self.get_task(task_id, board_id)
         if task:
             self.tasks.remove(task)
+            with self._lock:
+                for blocked_id in self.blocks.pop(task_id, ()):
+                    self.blocked_by[blocked_id].discard(task_id)
+                for blocker_id in self.blocked_by.pop(task_id, ()):
+                    self.blocks[blocker_id].discard(task_id)
+                if board_id in self.label_indexes:
+                    self.label_indexes[board_id].remove(task_id, task.labels)
+            self._bump_board_version(board_id)
             return True
         return False
+
+    def create_tasks_bulk(self, rows, board_id=DEFAULT_BOARD_ID):
+        """
+        Create many tasks at once.
+        
+        Args:
+            rows (list): Tuples of (title, description, status, priority, due_date, labels, rank)
+                as returned by bulk.validate_record(). Ranks are ignored: the
+                list order is the card order, so tasks are added in row order.
+            board_id (int, optional): The board to add the tasks to. Defaults to DEFAULT_BOARD_ID.
+        
+        Returns:
+            int: The number of tasks created.
+        """
+        for title, description, status, priority, due_date, labels, _rank in rows:
+            self.create_task(title, description, status, priority, due_date, board_id, labels)
+        return len(rows)
+
+    def iter_tasks(self, chunk_size=1000, board_id=DEFAULT_BOARD_ID):
+        """
+        Iterate over all tasks of a board in card order, one chunk at a time.
+        
+        The list order is the order of the cards within their columns, so
+        importing the tasks back in this order keeps each column's order.
+        
+        Args:
+            chunk_size (int, optional): Maximum number of tasks per chunk. Defaults to 1000.
+            board_id (int, optional): The board to iterate. Defaults to DEFAULT_BOARD_ID.
+        
+        Yields:
+            list: Task dictionaries, at most chunk_size per chunk.
+        """
+        tasks = [task for task in self.tasks if task.board_id == board_id]
+        for start in range(0, len(tasks), chunk_size):
+            yield [task.to_dict() for task in tasks[start:start + chunk_size]]
+
+    def move_task(self, task_id, status=None, before_id=None, after_id=None, board_id=DEFAULT_BOARD_ID,
+                  expected_version=None):
+        """
+        Move a task within its column or to another column.
+        
+        The in-memory list order is the card order, so the task is removed
+        and reinserted next to the anchor task.
+        
+        Args:
+            task_id (int): The task to move.
+            status (str or TaskStatus, optional): The column to move to.
+            before_id (int, optional): The task to place this one before.
+            after_id (int, optional): The task to place this one after.
+            board_id (int, optional): The board of the task. Defaults to DEFAULT_BOARD_ID.
+            expected_version (int, optional): Only move the task if it is still at this version.
+        
+        Returns:
+            Task: The moved task, or None if the task was not found.
+        
+        Raises:
+            ValueError: If the anchor task does not exist or is in a different column than `status`.
+            VersionConflictError: If the task is not at `expected_version`.
+        """
+        if before_id is not None and after_id is not None:
+            raise ValueError("Provide either before or after, not both")
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id == task_id:
+            raise ValueError("A task cannot be moved relative to itself")
+        
+        task = self.get_task(task_id, board_id)
+        if task is None:
+            return None
+        if expected_version is not None and task.version != expected_version:
+            raise VersionConflictError(task.to_dict())
+        if status is not None and not isinstance(status, TaskStatus):
+            status = self._string_to_status(status)
+        
+        anchor = None
+        if anchor_id is not None:
+            anchor = self.get_task(anchor_id, board_id)
+            if anchor is None:
+                raise ValueError(f"Task {anchor_id} not found")
+            if status and anchor.status != status:
+                raise ValueError(f"Task {anchor_id} is not in the '{status.value}' column")
+            status = anchor.status
+        
+        self.tasks.remove(task)
+        task.status = status or task.status
+        task.version += 1
+        if anchor is None:
+            self.tasks.append(task)
+        else:
+            position = self.tasks.index(anchor)
+            self.tasks.insert(position if before_id is not None else position + 1, task)
+        self._bump_board_version(board_id)
+        return task
+
+    def add_link(self, blocker_id, blocked_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Record that one task blocks another.
+        
+        Args:
+            blocker_id (int): The task that has to be done first.
+            blocked_id (int): The task it blocks.
+            board_id (int, optional): The board of both tasks. Defaults to DEFAULT_BOARD_ID.
+        
+        Returns:
+            bool: True if the link exists now, False if either task was not found.
+        
+        Raises:
+            ValueError: If both IDs are the same task.
+            LinkCycleError: If the blocked task already blocks the blocker.
+        """
+        if blocker_id == blocked_id:
+            raise ValueError("A task cannot block itself")
+        if self.get_task(blocker_id, board_id) is None or self.get_task(blocked_id, board_id) is None:
+            return False
+        
+        with self._lock:
+            if blocker_id in walk(self.blocks, blocked_id, BLOCKS)[0]:
+                raise LinkCycleError(blocker_id, blocked_id)
+            self.blocks.setdefault(blocker_id, set()).add(blocked_id)
+            self.blocked_by.setdefault(blocked_id, set()).add(blocker_id)
+        return True
+    
+    def remove_link(self, blocker_id, blocked_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Remove a dependency link.
+        
+        Returns:
+            bool: True if the link was removed, False if it did not exist.
+        """
+        if self.get_task(blocker_id, board_id) is None:
+            return False
+        with self._lock:
+            if blocked_id not in self.blocks.get(blocker_id, ()):
+                return False
+            self.blocks[blocker_id].discard(blocked_id)
+            self.blocked_by[blocked_id].discard(blocker_id)
+        return True
+    
+    def get_task_graph(self, task_id, board_id=DEFAULT_BOARD_ID):
+        """
+        Get everything a task transitively blocks and is blocked by.
+        
+        The closures are walked from the adjacency index on every call;
+        each walk touches only the tasks it returns.
+        
+        Returns:
+            dict: The graph as built by links.task_graph(), or None if the task was not found.
+        """
+        if self.get_task(task_id, board_id) is None:
+            return None
+        with self._lock:
+            return task_graph(
+                task_id, walk(self.blocks, task_id, BLOCKS), walk(self.blocked_by, task_id, BLOCKED_BY)
+            )
+    
+    def get_tasks_by_labels(self, labels, mode=AND, board_id=DEFAULT_BOARD_ID):
+        """
+        Get the tasks of a board that carry all (mode 'and') or any (mode 'or') of some labels.
+        
+        The matching IDs come from the board's label bitmaps, which are kept
+        current as tasks are created, updated and deleted.
+        
+        Returns:
+            list: The matching tasks in board order, or None if the board does not exist.
+        
+        Raises:
+            ValueError: If `mode` is not 'and' or 'or'.
+        """
+        if board_id not in self.boards:
+            return None
+        with self._lock:
+            task_ids = self.label_indexes.get(board_id, LabelIndex()).match(labels, mode)
+        return [task.to_dict() for task in self.tasks if task.board_id == board_id and task.id in task_ids]
@@ -0,0 +1,197 @@
+"""
+Query tracing for the SQLite DAO.
+Connections are opened with TracingConnection, whose cursors time every
+statement (execute plus fetches), count the rows it returns or changes and
+aggregate both per SQL shape. The query plan of each shape is captured once
+with EXPLAIN QUERY PLAN to flag full-table scans, and statements slower than
+the threshold are logged together with their plan.
+"""
+
+import itertools
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Transaction control and pragmas have no query plan
+_UNPLANNED = ('BEGIN', 'COMMIT', 'ROLLBACK', 'END', 'SAVEPOINT', 'RELEASE', 'PRAGMA', 'EXPLAIN')
+
+# "SCAN tasks" (or "SCAN TABLE tasks" before SQLite 3.36) reads every row;
+# "SCAN tasks USING INDEX ..." walks an index instead
+_FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+
+def _shape(sql):
+    """Normalize whitespace so the same statement always maps to the same key."""
+    return ' '.join(sql.split())
+
+
+class QueryTracer:
+    """Aggregated timings and plans of the statements run through traced connections."""
+
+    def __init__(self, slow_query_ms=100):
+        """
+        Args:
+            slow_query_ms (float, optional): Statements taking longer are logged with their plan.
+        """
+        self.slow_query_ms = slow_query_ms
+        self._stats = {}
+        self._shapes = {}
+        self._lock = threading.Lock()
+
+    def begin(self, cursor, sql, params):
+        """Register one execution of a statement; returns its shape."""
+        shape = self._shapes.get(sql)
+        if shape is None:
+            shape = self._shapes.setdefault(sql, _shape(sql))
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                stats = self._stats[shape] = {
+                    "sql": shape, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "slow_calls": 0, "plan": None, "full_scan": False,
+                }
+            stats["calls"] += 1
+            needs_plan = stats["plan"] is None
+        if needs_plan and not shape.upper().startswith(_UNPLANNED):
+            plan = self._explain(cursor.connection, sql, params)
+            with self._lock:
+                stats["plan"] = plan
+                stats["full_scan"] = any(_FULL_SCAN.match(step) for step in plan)
+        return shape
+
+    def record(self, shape, params, elapsed_ms, total_ms, rows):
+        """
+        Add the time and rows of one step (execute or fetch) of a statement.
+
+        Args:
+            shape (str): The statement's shape, from begin().
+            params: The statement's parameters, logged if it turns slow.
+            elapsed_ms (float): Time spent in this step.
+            total_ms (float): Time spent on this execution so far, including this step.
+            rows (int): Rows returned or changed by this step.
+        """
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                # Reset while the statement was running; its remaining steps go uncounted
+                return
+            stats["total_ms"] += elapsed_ms
+            stats["rows"] += rows
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            turned_slow = total_ms >= self.slow_query_ms > total_ms - elapsed_ms
+            if turned_slow:
+                stats["slow_calls"] += 1
+
+        if turned_slow:
+            plan = stats["plan"] or []
+            logger.warning(
+                "Slow query (%.1f ms so far): %s\n  params: %r\n  plan:\n    %s",
+                total_ms, shape, params, '\n    '.join(plan) or '(none)'
+            )
+
+    @staticmethod
+    def _explain(conn, sql, params):
+        """Get the EXPLAIN QUERY PLAN steps of a statement, without tracing the EXPLAIN itself."""
+        try:
+            cursor = conn.cursor(sqlite3.Cursor)
+            cursor.row_factory = None
+            rows = cursor.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+        return [row[3] for row in rows]
+
+    def stats(self):
+        """
+        Get the per-statement statistics, most total time first.
+
+        Returns:
+            list: One dictionary per statement shape.
+        """
+        with self._lock:
+            stats = [dict(entry, plan=list(entry["plan"] or [])) for entry in self._stats.values()]
+        for entry in stats:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["calls"], 3) if entry["calls"] else 0
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        stats.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return stats
+
+    def reset(self):
+        """Forget all statistics and plans."""
+        with self._lock:
+            self._stats.clear()
+            self._shapes.clear()
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that reports every execute and fetch to its connection's tracer."""
+
+    _trace = None
+
+    def _step(self, started, rows):
+        shape, params, total_ms = self._trace
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        total_ms += elapsed_ms
+        self._trace = (shape, params, total_ms)
+        self.connection.tracer.record(shape, params, elapsed_ms, total_ms, rows)
+
+    def execute(self, sql, params=()):
+        shape = self.connection.tracer.begin(self, sql, params)
+        self._trace = (shape, params, 0.0)
+        started = time.perf_counter()
+        super().execute(sql, params)
+        self._step(started, max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        # Peek at the first row without materializing a generator; the plan
+        # does not depend on the values, so it stands for every row
+        seq_of_params = iter(seq_of_params)
+        first = next(seq_of_params, None)
+        shape = self.connection.tracer.begin(self, sql, () if first is None else first)
+        self._trace = (shape, first, 0.0)
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_params if first is None else itertools.chain((first,), seq_of_params))
+        self._step(started, max(self.rowcount, 0))
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        if self._trace is not None:
+            self._step(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._trace is not None:
+            self._step(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        if self._trace is not None:
+            self._step(started, len(rows))
+        return rows
+
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors are traced by `self.tracer`."""
+
+    tracer = None
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    # sqlite3's shortcuts create plain cursors internally, so route them through cursor()
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
@@ -0,0 +1,112 @@
+"""
+Due date parsing and normalization.
+Due dates are stored as ISO 8601 text so that they sort correctly and can
+be range-scanned through an index: "YYYY-MM-DD" for plain dates and
+"YYYY-MM-DDTHH:MM:SSZ" (UTC) for dates with a time.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+# Formats accepted in addition to ISO 8601, tried in order
+_DATE_FORMATS = [
+    '%Y/%m/%d',
+    '%d/%m/%Y',
+    '%d.%m.%Y',
+    '%d-%m-%Y',
+    '%d %b %Y',
+    '%d %B %Y',
+    '%b %d %Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+]
+
+ISO_DATE_LENGTH = len('YYYY-MM-DD')
+
+
+def normalize_due_date(value):
+    """
+    Convert a due date to its canonical ISO form.
+
+    Args:
+        value (str, date, datetime or None): The due date as entered.
+
+    Returns:
+        str: "YYYY-MM-DD" or "YYYY-MM-DDTHH:MM:SSZ", or None if no due date was given.
+
+    Raises:
+        ValueError: If the value cannot be understood as a date.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    try:
+        if len(text) == ISO_DATE_LENGTH:
+            return date.fromisoformat(text).isoformat()
+        return _format_datetime(datetime.fromisoformat(text))
+    except ValueError:
+        pass
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+
+    raise ValueError(f"Invalid due date: {value}")
+
+
+def _format_datetime(value):
+    """Format a datetime as UTC; naive datetimes are taken to be UTC already."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def due_instant(due_date):
+    """
+    Get the moment a normalized due date passes.
+
+    A plain date is due until the end of that day (UTC), so it becomes
+    overdue at midnight at the start of the next day.
+
+    Args:
+        due_date (str): A normalized due date.
+
+    Returns:
+        datetime: An aware UTC datetime, or None if the value is not a normalized due date.
+    """
+    try:
+        if len(due_date) == ISO_DATE_LENGTH:
+            day = date.fromisoformat(due_date) + timedelta(days=1)
+            return datetime.combine(day, time.min, tzinfo=timezone.utc)
+        return datetime.fromisoformat(due_date).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def scan_bounds(start, end):
+    """
+    Get text bounds covering every normalized due date whose instant lies in a time range.
+
+    The bounds are whole days, so they can be compared directly against the
+    due_date column through its index; callers filter the exact range with
+    due_instant().
+
+    Args:
+        start (datetime): Start of the range.
+        end (datetime): End of the range.
+
+    Returns:
+        tuple: (lower, upper) strings for `due_date >= lower AND due_date < upper`.
+    """
+    lower = (start - timedelta(days=1)).date().isoformat()
+    upper = (end + timedelta(days=1)).date().isoformat()
+    return lower, upper
@@ -5,6 +5,9 @@ This module defines the data structures used in the application.
 
 from enum import Enum
 
+# Board used by the unscoped /tasks routes and by data created before boards existed
+DEFAULT_BOARD_ID = 1
+
 class TaskStatus(Enum):
     """
     Enum representing the possible statuses of a task.
@@ -33,9 +36,13 @@ class Task:
         status (TaskStatus): The current status of the task (e.g., TaskStatus.TO_DO, TaskStatus.IN_PROGRESS, TaskStatus.DONE).
         priority (TaskPriority): The priority level of the task (e.g., TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW).
         due_date (str, optional): The due date for the task.
+        board_id (int): The board the task belongs to.
+        labels (list): The task's labels, sorted.
+        version (int): Incremented on every update; used for conditional updates.
     """
     
-    def __init__(self, id, title, description="", status=TaskStatus.TO_DO, priority=TaskPriority.MEDIUM, due_date=None):
+    def __init__(self, id, title, description="", status=TaskStatus.TO_DO, priority=TaskPriority.MEDIUM, due_date=None,
+                 board_id=DEFAULT_BOARD_ID, labels=None):
         """
         Initialize a new Task instance.
         
@@ -46,13 +53,18 @@ class Task:
             status (TaskStatus, optional): The current status of the task. Defaults to TaskStatus.TO_DO.
             priority (TaskPriority, optional): The priority level of the task. Defaults to TaskPriority.MEDIUM.
             due_date (str, optional): The due date for the task. Defaults to None.
+            board_id (int, optional): The board the task belongs to. Defaults to DEFAULT_BOARD_ID.
+            labels (list, optional): The task's labels. Defaults to none.
         """
         self.id = id
+        self.version = 1
+        self.board_id = board_id
         self.title = title
         self.description = description
         self.status = status
         self.priority = priority
         self.due_date = due_date
+        self.labels = list(labels or [])
     
     def to_dict(self):
         """
@@ -63,11 +75,14 @@ class Task:
         """
         return {
             "id": self.id,
+            "board_id": self.board_id,
             "title": self.title,
             "description": self.description,
             "status": self.status.value if isinstance(self.status, TaskStatus) else self.status,
             "priority": self.priority.value if isinstance(self.priority, TaskPriority) else self.priority,
-            "due_date": self.due_date
+            "due_date": self.due_date,
+            "labels": list(self.labels),
+            "version": self.version
         }
     
     def update(self, **kwargs):
@@ -0,0 +1,222 @@
+"""
+On-demand request profiling.
+A request is profiled when it carries a valid signed X-Profile token or is
+picked by PROFILE_SAMPLE_RATE. Tokens are signed with SECRET_KEY and refused
+while it is the development default; they also unlock the profile listing
+and downloads and the /admin/stats endpoints. Each profiled request writes
+two files to instance/profiles: a cProfile dump (.pstats) and a
+collapsed-stack file (.collapsed) from a sampling thread, which
+flamegraph.pl or speedscope turn into a flame graph. Requests that are not profiled pay for one random
+number and a header lookup.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_EXTENSIONS = ('.pstats', '.collapsed')
+
+# Only one cProfile profiler can be active at a time (Python 3.12+), so
+# concurrent profiled requests fall back to sampling alone
+_cprofile_lock = threading.Lock()
+
+
+# The fallback SECRET_KEY in create_app; anyone can sign tokens with it
+DEFAULT_SECRET_KEY = 'dev'
+
+# The admin endpoints that take a token are never profiled themselves
+UNPROFILED_ENDPOINTS = {'main.list_profiles', 'main.download_profile', 'main.statement_stats',
+                        'main.query_stats', 'main.admission_stats'}
+
+
+def _serializer(app):
+    return URLSafeTimedSerializer(app.secret_key, salt='miniban-profile')
+
+
+def tokens_enabled(app):
+    """Tell whether profiling tokens can be used: only with a SECRET_KEY of one's own."""
+    return bool(app.secret_key) and app.secret_key != DEFAULT_SECRET_KEY
+
+
+def make_token(app):
+    """
+    Create a token that enables profiling of the requests that send it in X-Profile.
+
+    Returns:
+        str: The signed token; it expires after PROFILE_TOKEN_MAX_AGE seconds.
+
+    Raises:
+        RuntimeError: If SECRET_KEY is not set, so tokens could be forged.
+    """
+    if not tokens_enabled(app):
+        raise RuntimeError("Set SECRET_KEY to use profiling tokens; the default key lets anyone forge them")
+    return _serializer(app).dumps('profile')
+
+
+def token_is_valid(app, token):
+    """Check a token from make_token(); always False while SECRET_KEY is the default."""
+    if not token or not tokens_enabled(app):
+        return False
+    try:
+        _serializer(app).loads(token, max_age=app.config['PROFILE_TOKEN_MAX_AGE'])
+    except BadSignature:
+        return False
+    return True
+
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        """
+        Args:
+            thread_id (int): The thread to sample.
+            interval (float): Seconds between samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                if code is RequestProfiler.finish.__code__:
+                    # The request is over and the profiler itself is running
+                    return
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def write(self, path):
+        """Write the samples in collapsed-stack format: `frame;frame;frame count` per line."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Profiles one request with cProfile and a stack sampler."""
+
+    def __init__(self, interval):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{_slug(request.path)}-{uuid.uuid4().hex[:6]}"
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self.profile = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+        self._finished = False
+
+    def start(self):
+        self.sampler.start()
+        if self.profile is not None:
+            self.profile.enable()
+
+    def finish(self, directory, keep):
+        """Stop profiling and write the profile files, keeping only the newest `keep` profiles."""
+        if self._finished:
+            return
+        self._finished = True
+        self.sampler.stop()
+        if self.profile is not None:
+            self.profile.disable()
+            _cprofile_lock.release()
+
+        os.makedirs(directory, exist_ok=True)
+        self.sampler.write(os.path.join(directory, self.id + '.collapsed'))
+        if self.profile is not None:
+            self.profile.dump_stats(os.path.join(directory, self.id + '.pstats'))
+        _prune(directory, keep)
+
+
+def _slug(path):
+    return re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')[:60] or 'root'
+
+
+def _prune(directory, keep):
+    """Delete all but the newest `keep` profiles."""
+    profiles = sorted({os.path.splitext(name)[0] for name in os.listdir(directory)
+                       if name.endswith(PROFILE_EXTENSIONS)})
+    for profile_id in profiles[:-keep] if keep else profiles:
+        for ext in PROFILE_EXTENSIONS:
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory):
+    """
+    List the stored profiles, newest first.
+
+    Returns:
+        list: One dictionary per profile file with its name, size and modification time.
+    """
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(PROFILE_EXTENSIONS):
+            stat = os.stat(os.path.join(directory, name))
+            profiles.append({
+                "name": name,
+                "size": stat.st_size,
+                "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(stat.st_mtime)),
+            })
+    profiles.sort(key=lambda profile: profile['name'], reverse=True)
+    return profiles
+
+
+def init_app(app):
+    """Install the before/after request hooks that profile selected requests."""
+    directory = os.path.join(app.instance_path, 'profiles')
+    app.config.setdefault('PROFILE_DIR', directory)
+
+    @app.before_request
+    def start_profiling():
+        if request.endpoint in UNPROFILED_ENDPOINTS:
+            return
+        rate = app.config['PROFILE_SAMPLE_RATE']
+        if not token_is_valid(app, request.headers.get(PROFILE_HEADER)) and not (rate and random.random() < rate):
+            return
+        g.profiler = RequestProfiler(app.config['PROFILE_INTERVAL_MS'] / 1000)
+        g.profiler.start()
+
+    @app.after_request
+    def stop_profiling(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        response.headers['X-Profile-Id'] = profiler.id
+        # Streamed responses are still running; stop once the body has been sent
+        response.call_on_close(
+            lambda: profiler.finish(app.config['PROFILE_DIR'], app.config['PROFILE_KEEP'])
+        )
+        return response
+
+    @app.teardown_request
+    def abandon_profiling(exc):
+        # Requests that never reached after_request still release the profiler
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.finish(app.config['PROFILE_DIR'], app.config['PROFILE_KEEP'])
@@ -0,0 +1,133 @@
+"""
+Fractional rank keys for ordering cards within a column.
+A rank is a string of base-62 digits read as a fraction in [0, 1), so
+there is always room for a new key between two existing ones and moving
+a card only ever rewrites that card's row.
+"""
+
+# Digits in ASCII order, so SQLite's default BINARY collation sorts keys correctly
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+_DIGIT_VALUES = {digit: value for value, digit in enumerate(DIGITS)}
+
+# Keys longer than this trigger a rebalance of their column
+REBALANCE_LENGTH = 16
+
+# Appends and prepends step by one unit at this many digits instead of
+# halving the gap, so adding cards at either end keeps keys short
+OPEN_LENGTH = 4
+
+
+def _to_int(key, length):
+    """Read a key as an integer numerator over BASE ** length."""
+    value = 0
+    for digit in key.ljust(length, DIGITS[0]):
+        value = value * BASE + _DIGIT_VALUES[digit]
+    return value
+
+
+def _to_key(value, length):
+    """Write an integer numerator over BASE ** length as a key."""
+    digits = []
+    for _ in range(length):
+        value, remainder = divmod(value, BASE)
+        digits.append(DIGITS[remainder])
+    # Trailing zeros do not change the value; dropping them keeps keys canonical
+    return ''.join(reversed(digits)).rstrip(DIGITS[0])
+
+
+def validate_key(key):
+    """
+    Check that a string is a canonical rank key.
+
+    Args:
+        key (str): The key to check.
+
+    Raises:
+        ValueError: If the key is empty, has trailing zeros or contains invalid digits.
+    """
+    if not key or key.endswith(DIGITS[0]) or any(digit not in _DIGIT_VALUES for digit in key):
+        raise ValueError(f"Invalid rank key: {key!r}")
+
+
+def _keys_beside(lower, upper, count):
+    """
+    Generate keys one unit apart next to a single bound.
+
+    Returns:
+        list: The keys in ascending order, or None if there is no room at OPEN_LENGTH digits.
+    """
+    if upper is None:
+        # Round lower down to OPEN_LENGTH digits; one unit above that is already past it
+        start = _to_int(lower[:OPEN_LENGTH], OPEN_LENGTH)
+        if start + count >= BASE ** OPEN_LENGTH:
+            return None
+        return [_to_key(start + i, OPEN_LENGTH) for i in range(1, count + 1)]
+
+    # Round upper up to OPEN_LENGTH digits and count down from there
+    end = _to_int(upper[:OPEN_LENGTH], OPEN_LENGTH)
+    if len(upper) > OPEN_LENGTH:
+        end += 1
+    if end - count < 1:
+        return None
+    return [_to_key(end - i, OPEN_LENGTH) for i in range(count, 0, -1)]
+
+
+def keys_between(lower, upper, count):
+    """
+    Generate evenly spaced keys strictly between two keys.
+
+    Next to a single bound (appending or prepending) keys are one unit apart
+    at OPEN_LENGTH digits. Between two bounds the shortest key length that
+    leaves room for `count` keys is used, so repeated inserts at the same
+    spot grow keys by about one digit every six inserts.
+
+    Args:
+        lower (str or None): The key to sort after, or None for the start of the column.
+        upper (str or None): The key to sort before, or None for the end of the column.
+        count (int): The number of keys to generate.
+
+    Returns:
+        list: `count` keys in ascending order.
+
+    Raises:
+        ValueError: If lower does not sort before upper.
+    """
+    if lower is not None:
+        validate_key(lower)
+    if upper is not None:
+        validate_key(upper)
+    if lower is not None and upper is not None and lower >= upper:
+        raise ValueError(f"Rank {lower!r} does not sort before {upper!r}")
+    if count < 1:
+        return []
+
+    if (lower is None) != (upper is None):
+        keys = _keys_beside(lower, upper, count)
+        if keys:
+            return keys
+
+    length = max(len(lower or ''), len(upper or ''), 1)
+    while True:
+        low = _to_int(lower, length) if lower is not None else 0
+        high = _to_int(upper, length) if upper is not None else BASE ** length
+        if high - low > count:
+            break
+        length += 1
+
+    step = (high - low) // (count + 1)
+    return [_to_key(low + step * i, length) for i in range(1, count + 1)]
+
+
+def key_between(lower, upper):
+    """
+    Generate a single key strictly between two keys.
+
+    Args:
+        lower (str or None): The key to sort after, or None for the start of the column.
+        upper (str or None): The key to sort before, or None for the end of the column.
+
+    Returns:
+        str: The new key.
+    """
+    return keys_between(lower, upper, 1)[0]
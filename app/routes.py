@@ -3,11 +3,60 @@ Routes for the Miniban application.
 This module defines all the URL routes and their handlers.
 """
 
-from flask import Blueprint, request, jsonify, render_template, current_app
+import io
+from datetime import timedelta
+
+from flask import Blueprint, Response, request, jsonify, current_app, send_from_directory, stream_with_context
+
+from app import admission, bulk, profiling
+from app.assets import IMMUTABLE
+from app.dao.errors import LinkCycleError, VersionConflictError
+from app.serializers import respond
+from app.models import DEFAULT_BOARD_ID
 
 # Create a blueprint for the main application routes
 bp = Blueprint('main', __name__)
 
+# Every task route is served twice: unscoped under /tasks for the default
+# board, and under /boards/<board_id>/tasks for any board.
+
+def _board_not_found(task_dao, board_id):
+    """Return a 404 response if the board does not exist, otherwise None."""
+    if task_dao.get_board(board_id) is None:
+        return jsonify({"error": "Board not found"}), 404
+    return None
+
+def _labels_unsupported(task_dao):
+    """Return a 501 response if the backend has no labels, otherwise None."""
+    if not hasattr(task_dao, 'get_tasks_by_labels'):
+        return jsonify({"error": "Labels are not supported by this database backend"}), 501
+    return None
+
+def _etag(task):
+    """Return headers carrying a task's version as its ETag."""
+    return {"ETag": f'"{task["version"]}"'}
+
+def _expected_version():
+    """
+    Get the task version a request's If-Match header requires.
+    
+    Returns:
+        int: The required version (0, which never matches, for ETags that are
+        not task versions), or None if any version will do.
+    
+    Raises:
+        ValueError: If the header lists more than one ETag.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    # Weak ETags never match in If-Match, so only strong ones are considered
+    tags = if_match.as_set()
+    if len(tags) > 1:
+        raise ValueError("If-Match must contain a single ETag")
+    tag = next(iter(tags), '')
+    return int(tag) if tag.isdigit() else 0
+
 @bp.route('/')
 def hello_world():
     """Simple hello world endpoint."""
@@ -15,62 +64,421 @@ def hello_world():
 
 @bp.route('/kanban')
 def kanban_board():
-    """Serve the Kanban board UI."""
-    return render_template('kanban.html')
+    """
+    Serve the Kanban board UI with the default board's tasks embedded, so the
+    first paint needs no second request; the page is cached per board version
+    and revalidated by ETag.
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    return current_app.extensions['assets'].board_page(task_dao, DEFAULT_BOARD_ID).response('no-cache')
+
+@bp.route('/assets/<filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted CSS/JS bundle."""
+    asset = current_app.extensions['assets'].get(filename)
+    if asset is None:
+        return jsonify({"error": "Asset not found"}), 404
+    return asset.response(IMMUTABLE)
 
-@bp.route('/tasks', methods=['GET'])
-def get_all_tasks():
-    """Retrieve all tasks."""
+@bp.route('/boards', methods=['GET'])
+def get_all_boards():
+    """Retrieve all boards."""
     task_dao = current_app.extensions.get('task_dao')
-    tasks = task_dao.get_all_tasks()
-    return jsonify(tasks)
+    return respond(task_dao.get_all_boards())
+
+@bp.route('/boards', methods=['POST'])
+@admission.limit(admission.INTERACTIVE)
+def create_board():
+    """Create a new board."""
+    task_dao = current_app.extensions.get('task_dao')
+    data = request.get_json(silent=True) or {}
+    name = data.get('name')
+    if not name:
+        return jsonify({"error": "Board name is required"}), 400
+    return respond(task_dao.create_board(name), 201)
+
+@bp.route('/boards/<int:board_id>', methods=['GET'])
+def get_board(board_id):
+    """Retrieve a specific board by ID."""
+    task_dao = current_app.extensions.get('task_dao')
+    board = task_dao.get_board(board_id)
+    if board:
+        return respond(board)
+    else:
+        return jsonify({"error": "Board not found"}), 404
+
+@bp.route('/tasks', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks', methods=['GET'])
+def get_all_tasks(board_id):
+    """
+    Retrieve all tasks of a board.
+    
+    With SQLite the response carries the board version in X-Board-Version.
+    A client that kept the tasks can pass that version back as `since` to
+    get only what changed after it: {"version", "changed", "deleted", "reset"},
+    where `reset` means `changed` is the whole board.
+    
+    `labels=a,b` lists only the tasks carrying all of those labels, or any
+    of them with `mode=or`.
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    since = request.args.get('since')
+    if since is not None and not since.isdigit():
+        return jsonify({"error": "since must be a board version"}), 400
+    
+    if 'labels' in request.args:
+        if since is not None:
+            return jsonify({"error": "since cannot be combined with labels"}), 400
+        return _tasks_with_labels(task_dao, board_id)
+    
+    if not hasattr(task_dao, 'get_task_changes'):
+        not_found = _board_not_found(task_dao, board_id)
+        if not_found:
+            return not_found
+        tasks = task_dao.get_all_tasks(board_id)
+        return respond(tasks)
+    
+    changes = task_dao.get_task_changes(board_id, int(since) if since is not None else None)
+    if changes is None:
+        return jsonify({"error": "Board not found"}), 404
+    headers = {"X-Board-Version": str(changes["version"])}
+    return respond(changes if since is not None else changes["changed"], headers=headers)
+
+def _tasks_with_labels(task_dao, board_id):
+    """List the tasks matching the request's `labels` and `mode` from the DAO's label bitmaps."""
+    unsupported = _labels_unsupported(task_dao)
+    if unsupported:
+        return unsupported
+    labels = [label.strip() for label in request.args['labels'].split(',') if label.strip()]
+    if not labels:
+        return jsonify({"error": "labels must name at least one label"}), 400
+    try:
+        tasks = task_dao.get_tasks_by_labels(labels, request.args.get('mode', 'and'), board_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if tasks is None:
+        return jsonify({"error": "Board not found"}), 404
+    return respond(tasks)
 
-@bp.route('/tasks', methods=['POST'])
-def create_task():
+@bp.route('/tasks', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks', methods=['POST'])
+@admission.limit(admission.INTERACTIVE)
+def create_task(board_id):
     """Create a new task."""
     task_dao = current_app.extensions.get('task_dao')
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
     data = request.get_json()
     title = data.get('title')
     description = data.get('description', '')
     status = data.get('status', 'To Do')
     priority = data.get('priority', 'Medium')
     due_date = data.get('due_date')
+    labels = {}
+    if 'labels' in data:
+        unsupported = _labels_unsupported(task_dao)
+        if unsupported:
+            return unsupported
+        labels['labels'] = data['labels']
+    
+    try:
+        task = task_dao.create_task(title, description, status, priority, due_date, board_id, **labels)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return respond(task, 201, _etag(task))
+
+@bp.route('/tasks/import', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/import', methods=['POST'])
+@admission.limit(admission.BULK)
+def import_tasks(board_id):
+    """
+    Bulk import tasks from a CSV or NDJSON request body.
+    
+    Query parameters:
+    - format: "csv" or "ndjson" (defaults to the request Content-Type)
+    - offset: Number of leading records to skip, to resume an interrupted import
+    - chunk_size: Records committed per transaction
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
+    try:
+        fmt = bulk.detect_format(request.args.get('format'), request.content_type)
+        offset = request.args.get('offset', 0, type=int)
+        chunk_size = request.args.get('chunk_size', bulk.DEFAULT_CHUNK_SIZE, type=int)
+        if offset < 0 or chunk_size < 1:
+            raise ValueError("offset must be >= 0 and chunk_size must be >= 1")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Decode the body as it arrives instead of buffering it in memory
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    summary = bulk.import_tasks(
+        task_dao, bulk.iter_records(stream, fmt), chunk_size, offset, board_id=board_id
+    )
+    
+    if 'error' in summary:
+        return jsonify(summary), 400
+    return jsonify(summary), 200
+
+@bp.route('/tasks/export', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/export', methods=['GET'])
+def export_tasks(board_id):
+    """
+    Stream all tasks as CSV or NDJSON.
+    
+    Query parameters:
+    - format: "csv" or "ndjson" (defaults to "ndjson")
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
+    try:
+        fmt = bulk.detect_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    task = task_dao.create_task(title, description, status, priority, due_date)
-    return jsonify(task), 201
+    chunks = bulk.export_tasks(task_dao, fmt, board_id=board_id)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=bulk.FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{fmt}"}
+    )
 
-@bp.route('/tasks/<int:task_id>', methods=['GET'])
-def get_task(task_id):
+@bp.route('/tasks/archive', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/archive', methods=['GET'])
+def get_archived_tasks(board_id):
+    """
+    Retrieve archived tasks, newest first, one page at a time.
+    
+    Query parameters:
+    - before: Only return tasks with a lower ID (pass the previous page's `next_before`)
+    - limit: Page size (default 100, at most 1000)
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'get_archived_tasks'):
+        return jsonify({"error": "Archiving is not supported by this database backend"}), 501
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
+    before_id = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    
+    tasks = task_dao.get_archived_tasks(board_id, before_id, limit)
+    next_before = tasks[-1]['id'] if len(tasks) == limit else None
+    return respond({"tasks": tasks, "next_before": next_before})
+
+@bp.route('/tasks/archive/<int:task_id>/restore', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/archive/<int:task_id>/restore', methods=['POST'])
+@admission.limit(admission.INTERACTIVE)
+def restore_task(task_id, board_id):
+    """Move an archived task back to the bottom of its board's Done column."""
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'restore_task'):
+        return jsonify({"error": "Archiving is not supported by this database backend"}), 501
+    task = task_dao.restore_task(task_id, board_id)
+    if task:
+        return respond(task)
+    else:
+        return jsonify({"error": "Archived task not found"}), 404
+
+@bp.route('/tasks/<int:task_id>', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>', methods=['GET'])
+def get_task(task_id, board_id):
     """Retrieve a specific task by ID."""
     task_dao = current_app.extensions.get('task_dao')
-    task = task_dao.get_task(task_id)
+    task = task_dao.get_task(task_id, board_id)
     if task:
-        return jsonify(task)
+        if request.if_none_match.contains_weak(str(task['version'])):
+            return Response(status=304, headers=_etag(task))
+        return respond(task, headers=_etag(task))
     else:
         return jsonify({"error": "Task not found"}), 404
 
-@bp.route('/tasks/<int:task_id>', methods=['PUT'])
-def update_task(task_id):
-    """Update an existing task."""
+@bp.route('/tasks/<int:task_id>', methods=['PUT'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>', methods=['PUT'])
+@admission.limit(admission.INTERACTIVE)
+def update_task(task_id, board_id):
+    """
+    Update an existing task.
+    
+    With an `If-Match: "<version>"` header the update only applies if the
+    task is still at that version (its ETag); otherwise 412 is returned
+    along with the task as it is now.
+    """
     task_dao = current_app.extensions.get('task_dao')
     data = request.get_json()
-    task = task_dao.update_task(task_id, **data)
+    # The board comes from the URL; tasks cannot be moved between boards here
+    data.pop('board_id', None)
+    if 'labels' in data:
+        unsupported = _labels_unsupported(task_dao)
+        if unsupported:
+            return unsupported
+    try:
+        task = task_dao.update_task(task_id, board_id=board_id, expected_version=_expected_version(), **data)
+    except VersionConflictError as e:
+        return jsonify({
+            "error": "Task was changed by someone else",
+            "current": e.current
+        }), 412, _etag(e.current)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     if task:
-        return jsonify(task)
+        return respond(task, headers=_etag(task))
     else:
         return jsonify({"error": "Task not found"}), 404
 
-@bp.route('/tasks/<int:task_id>', methods=['DELETE'])
-def delete_task(task_id):
+@bp.route('/tasks/<int:task_id>/move', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>/move', methods=['POST'])
+@admission.limit(admission.INTERACTIVE)
+def move_task(task_id, board_id):
+    """
+    Move a task to a position within a column.
+    
+    Parameters (JSON):
+    - status: Column to move the task to (optional, defaults to the anchor's column)
+    - before: ID of the task to place this task directly before (optional)
+    - after: ID of the task to place this task directly after (optional)
+    
+    With neither before nor after, the task goes to the bottom of the column.
+    As with updates, an `If-Match: "<version>"` header makes the move
+    conditional, and 412 is returned with the current task on a mismatch.
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'move_task'):
+        return jsonify({"error": "Reordering is not supported by this database backend"}), 501
+    
+    data = request.get_json(silent=True) or {}
+    for anchor in ('before', 'after'):
+        anchor_id = data.get(anchor)
+        if anchor_id is not None and (not isinstance(anchor_id, int) or isinstance(anchor_id, bool)):
+            return jsonify({"error": f"{anchor} must be a task ID"}), 400
+    try:
+        task = task_dao.move_task(
+            task_id,
+            status=data.get('status'),
+            before_id=data.get('before'),
+            after_id=data.get('after'),
+            board_id=board_id,
+            expected_version=_expected_version()
+        )
+    except VersionConflictError as e:
+        return jsonify({
+            "error": "Task was changed by someone else",
+            "current": e.current
+        }), 412, _etag(e.current)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if task:
+        return respond(task, headers=_etag(task))
+    else:
+        return jsonify({"error": "Task not found"}), 404
+
+@bp.route('/tasks/<int:task_id>/links', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>/links', methods=['POST'])
+@admission.limit(admission.INTERACTIVE)
+def add_task_link(task_id, board_id):
+    """
+    Record that a task blocks another one.
+    
+    Parameters (JSON):
+    - blocks: ID of the task that cannot be done before this one
+    
+    Links that would make a task transitively block itself are refused with 409.
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'add_link'):
+        return jsonify({"error": "Task links are not supported by this database backend"}), 501
+    
+    data = request.get_json(silent=True) or {}
+    blocked_id = data.get('blocks')
+    if not isinstance(blocked_id, int) or isinstance(blocked_id, bool):
+        return jsonify({"error": "blocks must be a task ID"}), 400
+    try:
+        linked = task_dao.add_link(task_id, blocked_id, board_id)
+    except LinkCycleError as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if linked:
+        return jsonify({"blocker_id": task_id, "blocked_id": blocked_id}), 201
+    else:
+        return jsonify({"error": "Task not found"}), 404
+
+@bp.route('/tasks/<int:task_id>/links/<int:blocked_id>', methods=['DELETE'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>/links/<int:blocked_id>', methods=['DELETE'])
+@admission.limit(admission.INTERACTIVE)
+def remove_task_link(task_id, blocked_id, board_id):
+    """Remove the link that makes one task block another."""
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'remove_link'):
+        return jsonify({"error": "Task links are not supported by this database backend"}), 501
+    if task_dao.remove_link(task_id, blocked_id, board_id):
+        return jsonify({"message": "Link deleted successfully"}), 200
+    else:
+        return jsonify({"error": "Link not found"}), 404
+
+@bp.route('/tasks/<int:task_id>/graph', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>/graph', methods=['GET'])
+def get_task_graph(task_id, board_id):
+    """
+    Get the tasks a task transitively blocks and is blocked by.
+    
+    The response lists both sets of task IDs and every link between them.
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'get_task_graph'):
+        return jsonify({"error": "Task links are not supported by this database backend"}), 501
+    graph = task_dao.get_task_graph(task_id, board_id)
+    if graph is None:
+        return jsonify({"error": "Task not found"}), 404
+    return respond(graph)
+
+@bp.route('/analytics/flow', methods=['GET'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/analytics/flow', methods=['GET'])
+def get_flow_analytics(board_id):
+    """
+    Get a board's flow metrics from its status history.
+    
+    Query parameters:
+    - days: Length of the window, ending now (default 90)
+    - interval: "day" or "hour" between WIP and cumulative flow points (default "day")
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    flow_analytics = current_app.extensions.get('flow_analytics')
+    if not hasattr(task_dao, 'get_transitions') or flow_analytics is None:
+        return jsonify({"error": "Flow analytics need SQLite and NumPy"}), 501
+    days = request.args.get('days', '90')
+    if not days.isdigit():
+        return jsonify({"error": "days must be a whole number"}), 400
+    try:
+        flow = flow_analytics.flow(task_dao, board_id, int(days), request.args.get('interval', 'day'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if flow is None:
+        return jsonify({"error": "Board not found"}), 404
+    return respond(flow)
+
+@bp.route('/tasks/<int:task_id>', methods=['DELETE'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/tasks/<int:task_id>', methods=['DELETE'])
+@admission.limit(admission.INTERACTIVE)
+def delete_task(task_id, board_id):
     """Delete a task."""
     task_dao = current_app.extensions.get('task_dao')
-    if task_dao.delete_task(task_id):
+    if task_dao.delete_task(task_id, board_id):
         return jsonify({"message": "Task deleted successfully"}), 200
     else:
         return jsonify({"error": "Task not found"}), 404
 
-@bp.route('/admin/cleanup-done', methods=['DELETE'])
-def cleanup_done_tasks():
+@bp.route('/admin/cleanup-done', methods=['DELETE'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/admin/cleanup-done', methods=['DELETE'])
+@admission.limit(admission.BULK)
+def cleanup_done_tasks(board_id):
     """
     Admin endpoint for cleaning up Done tasks.
     
@@ -85,6 +493,9 @@ def cleanup_done_tasks():
     - If neither is provided: Delete all Done tasks
     """
     task_dao = current_app.extensions.get('task_dao')
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
     
     # Get JSON data - if no JSON provided, use empty dict
     data = request.get_json(silent=True) or {}
@@ -99,7 +510,7 @@ def cleanup_done_tasks():
         }), 400
     
     # Get all Done tasks
-    all_tasks = task_dao.get_all_tasks()
+    all_tasks = task_dao.get_all_tasks(board_id)
     done_tasks = [task for task in all_tasks if task['status'] == 'Done']
     
     if not done_tasks:
@@ -139,7 +550,7 @@ def cleanup_done_tasks():
     failed_deletions = []
     
     for task in tasks_to_delete:
-        if task_dao.delete_task(task['id']):
+        if task_dao.delete_task(task['id'], board_id):
             deleted_count += 1
         else:
             failed_deletions.append(task['id'])
@@ -165,4 +576,98 @@ def cleanup_done_tasks():
     else:
         response["operation"] = "all_done_tasks"
     
-    return jsonify(response), 200
\ No newline at end of file
+    return jsonify(response), 200
+
+@bp.route('/admin/archive', methods=['POST'], defaults={'board_id': DEFAULT_BOARD_ID})
+@bp.route('/boards/<int:board_id>/admin/archive', methods=['POST'])
+@admission.limit(admission.BULK)
+def archive_done_tasks(board_id):
+    """
+    Admin endpoint for moving old Done tasks to the archive.
+    
+    Unlike cleanup-done nothing is deleted: archived tasks can be listed
+    through /tasks/archive and restored.
+    
+    Parameters (JSON):
+    - older_than_days: Archive tasks completed at least this many days ago (default: ARCHIVE_AFTER_DAYS)
+    """
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'archive_done_tasks'):
+        return jsonify({"error": "Archiving is not supported by this database backend"}), 501
+    not_found = _board_not_found(task_dao, board_id)
+    if not_found:
+        return not_found
+    
+    data = request.get_json(silent=True) or {}
+    days = data.get('older_than_days', current_app.config['ARCHIVE_AFTER_DAYS'])
+    # Also rejects NaN and infinity, and anything timedelta cannot hold
+    if not isinstance(days, (int, float)) or isinstance(days, bool) or not 0 <= days <= timedelta.max.days:
+        return jsonify({"error": f"older_than_days must be a number from 0 to {timedelta.max.days}"}), 400
+    
+    archived = task_dao.archive_done_tasks(timedelta(days=days), board_id)
+    return jsonify({"archived": archived, "older_than_days": days}), 200
+
+def _admin_token_required():
+    """Return a 401/403 response unless the request carries a valid profiling token, otherwise None."""
+    if not profiling.tokens_enabled(current_app):
+        return jsonify({"error": "Admin statistics and profiles are unavailable until SECRET_KEY is set"}), 403
+    if not profiling.token_is_valid(current_app, request.headers.get(profiling.PROFILE_HEADER)):
+        return jsonify({"error": f"A valid {profiling.PROFILE_HEADER} token is required"}), 401
+    return None
+
+@bp.route('/admin/stats/statements', methods=['GET'])
+def statement_stats():
+    """Report hit and miss counts of the SQL statement cache; needs a profiling token in X-Profile."""
+    denied = _admin_token_required()
+    if denied:
+        return denied
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'statement_stats'):
+        return jsonify({"error": "Statement statistics are not available for this database backend"}), 501
+    return jsonify(task_dao.statement_stats())
+
+@bp.route('/admin/stats/queries', methods=['GET', 'DELETE'])
+def query_stats():
+    """Report per-statement timings, row counts and query plans, or reset them with DELETE; needs a token."""
+    denied = _admin_token_required()
+    if denied:
+        return denied
+    task_dao = current_app.extensions.get('task_dao')
+    if not hasattr(task_dao, 'query_stats'):
+        return jsonify({"error": "Query statistics are not available for this database backend"}), 501
+    if request.method == 'DELETE':
+        task_dao.reset_query_stats()
+        return '', 204
+    return jsonify(task_dao.query_stats())
+
+@bp.route('/admin/stats/admission', methods=['GET', 'DELETE'])
+def admission_stats():
+    """Report write slot usage, queue lengths, waits and rejections, or reset the counts with DELETE; needs a token."""
+    denied = _admin_token_required()
+    if denied:
+        return denied
+    controller = current_app.extensions.get('admission')
+    if controller is None:
+        return jsonify({"error": "Admission control is disabled (ADMISSION_CONCURRENCY=0)"}), 501
+    if request.method == 'DELETE':
+        controller.reset_stats()
+        return '', 204
+    return jsonify(controller.stats())
+
+@bp.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """List recent request profiles, newest first; needs a profiling token in X-Profile."""
+    denied = _admin_token_required()
+    if denied:
+        return denied
+    return jsonify(profiling.list_profiles(current_app.config['PROFILE_DIR']))
+
+@bp.route('/admin/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Download a profile file (.pstats for pstats/snakeviz, .collapsed for flamegraph.pl/speedscope)."""
+    denied = _admin_token_required()
+    if denied:
+        return denied
+    if not name.endswith(profiling.PROFILE_EXTENSIONS):
+        return jsonify({"error": "Profile not found"}), 404
+    return send_from_directory(current_app.config['PROFILE_DIR'], name, as_attachment=True)
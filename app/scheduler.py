@@ -0,0 +1,299 @@
+"""
+Background scheduler for due date reminders and overdue notifications.
+
+Only deadlines inside a short look-ahead window are kept in memory, in a
+min-heap ordered by when they fire. The window is refilled with a range
+scan over the due_date index, so the cost of a refresh depends on how many
+tasks fall due soon, not on how many dated tasks exist.
+
+Every worker process starts a scheduler, but only the holder of a lease
+row in the database emits events, so each deadline fires once per
+deployment. The lease row also records how far events have been emitted,
+which lets a new leader pick up where the previous one stopped. Listeners
+run on a separate delivery thread, so a slow webhook never holds a database
+connection or keeps the leader from renewing its lease.
+"""
+
+import heapq
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.due_dates import due_instant, scan_bounds
+
+logger = logging.getLogger(__name__)
+
+DUE_SOON = 'task.due_soon'
+OVERDUE = 'task.overdue'
+
+
+class WebhookNotifier:
+    """Event listener that POSTs each event as JSON to a URL."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, event):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(event).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except OSError as e:
+            logger.warning("Due date webhook to %s failed: %s", self.url, e)
+
+
+class DueDateScheduler:
+    """Emit due-soon and overdue events for tasks in a SQLite database."""
+
+    LEASE_NAME = 'due_dates'
+
+    def __init__(self, db_path, reminder_lead=timedelta(days=1), refresh_interval=60, lease_ttl=30):
+        """
+        Args:
+            db_path (str): Path to the SQLite database.
+            reminder_lead (timedelta, optional): How long before the deadline to emit a due-soon event.
+            refresh_interval (int, optional): Seconds between window refreshes.
+            lease_ttl (int, optional): Seconds a leader holds the lease without renewing it.
+        """
+        self.db_path = db_path
+        self.reminder_lead = reminder_lead
+        self.refresh_interval = refresh_interval
+        self.lease_ttl = lease_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._listeners = []
+        self._heap = []
+        self._queued = set()
+        # Events fired recently, so a refresh does not queue them again
+        self._fired = {}
+        self._window_end = None
+        self._resume_from = None
+        self._is_leader = False
+        self._lease_expires = 0
+        self._stop = threading.Event()
+        self._thread = None
+        # Events waiting for the listeners; None tells the delivery thread to finish
+        self._events = queue.Queue()
+        self._delivery = None
+
+    def subscribe(self, listener):
+        """Register a callable that receives every emitted event dictionary."""
+        self._listeners.append(listener)
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='due-date-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread, give up the lease and deliver the events still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._is_leader:
+            with self._connection() as conn:
+                conn.execute(
+                    'UPDATE scheduler_leases SET expires_at = 0 WHERE name = ? AND owner = ?',
+                    (self.LEASE_NAME, self.owner)
+                )
+        if self._delivery is not None:
+            self._events.put(None)
+            self._delivery.join()
+            self._delivery = None
+
+    @contextmanager
+    def _connection(self):
+        """Open a short-lived connection and commit on success."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.tick()
+            except sqlite3.Error as e:
+                logger.warning("Due date scheduler error: %s", e)
+                delay = self.lease_ttl / 3
+            self._stop.wait(delay)
+
+    def tick(self, now=None):
+        """
+        Do one round of work.
+
+        Returns:
+            float: Seconds to wait before the next round.
+        """
+        now = now or datetime.now(timezone.utc)
+
+        if not self._hold_lease(now):
+            return self.lease_ttl / 2
+
+        if self._window_end is None or now + timedelta(seconds=self.refresh_interval) >= self._window_end:
+            self._refresh_window(now)
+
+        self._fire_due(now)
+
+        next_wake = self.lease_ttl / 3
+        if self._heap:
+            until_next = (self._heap[0][0] - now).total_seconds()
+            next_wake = min(next_wake, max(until_next, 0))
+        return next_wake
+
+    def _hold_lease(self, now):
+        """Acquire or renew the lease; returns True while this process is the leader."""
+        timestamp = now.timestamp()
+        if self._is_leader and timestamp < self._lease_expires - self.lease_ttl * 2 / 3:
+            return True
+
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO scheduler_leases (name, owner, expires_at) VALUES (?, NULL, 0)',
+                (self.LEASE_NAME,)
+            )
+            cursor = conn.execute(
+                'UPDATE scheduler_leases SET owner = ?, expires_at = ? '
+                'WHERE name = ? AND (owner = ? OR owner IS NULL OR expires_at < ?)',
+                (self.owner, timestamp + self.lease_ttl, self.LEASE_NAME, self.owner, timestamp)
+            )
+            acquired = cursor.rowcount == 1
+            if acquired and not self._is_leader:
+                row = conn.execute(
+                    'SELECT high_water FROM scheduler_leases WHERE name = ?', (self.LEASE_NAME,)
+                ).fetchone()
+                # Resume after the previous leader; a first run starts from now
+                # rather than announcing every historical deadline
+                self._resume_from = datetime.fromisoformat(row['high_water']) if row['high_water'] else now
+                self._window_end = None
+
+        if not acquired and self._is_leader:
+            logger.info("Due date scheduler lost its lease")
+            self._heap.clear()
+            self._queued.clear()
+            self._fired.clear()
+        self._is_leader = acquired
+        self._lease_expires = timestamp + self.lease_ttl if acquired else 0
+        return acquired
+
+    def _refresh_window(self, now):
+        """
+        Queue every deadline firing before the end of the next window.
+
+        The first scan after taking the lease starts at the previous leader's
+        high-water mark, to catch up on anything missed while no process was
+        leading. Later scans look back one window, so a deadline that was
+        added just before it passed still fires, late, instead of being missed.
+        """
+        lookback = timedelta(seconds=self.refresh_interval * 2)
+        window_end = now + lookback
+        if self._resume_from is not None:
+            window_start, self._resume_from = self._resume_from, None
+        else:
+            window_start = now - lookback
+        for key, fire_at in list(self._fired.items()):
+            if fire_at <= window_start:
+                del self._fired[key]
+        lower, upper = scan_bounds(window_start, window_end + self.reminder_lead)
+
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, board_id, due_date FROM tasks "
+                "WHERE due_date IS NOT NULL AND due_date >= ? AND due_date < ? AND status != 'Done'",
+                (lower, upper)
+            ).fetchall()
+            # Everything up to the start of this window has been handled
+            self._save_high_water(conn, window_start)
+
+        for row in rows:
+            deadline = due_instant(row['due_date'])
+            if deadline is None:
+                continue
+            for kind, fire_at in ((DUE_SOON, deadline - self.reminder_lead), (OVERDUE, deadline)):
+                key = (kind, row['id'], row['due_date'])
+                if window_start < fire_at <= window_end and key not in self._queued and key not in self._fired:
+                    self._queued.add(key)
+                    heapq.heappush(self._heap, (fire_at, kind, row['id'], row['due_date']))
+        self._window_end = window_end
+
+    def _fire_due(self, now):
+        """Emit every queued event whose time has come, in order."""
+        fired_up_to = None
+        events = []
+        with self._connection() as conn:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, kind, task_id, due_date = heapq.heappop(self._heap)
+                key = (kind, task_id, due_date)
+                self._queued.discard(key)
+                self._fired[key] = fire_at
+                fired_up_to = max(fire_at, fired_up_to or fire_at)
+
+                # The task may have been edited, completed or deleted since it was queued
+                task = conn.execute(
+                    'SELECT id, board_id, title, status, due_date FROM tasks WHERE id = ?', (task_id,)
+                ).fetchone()
+                if task is None or task['due_date'] != due_date or task['status'] == 'Done':
+                    continue
+
+                events.append({
+                    "type": kind,
+                    "task_id": task['id'],
+                    "board_id": task['board_id'],
+                    "title": task['title'],
+                    "due_date": task['due_date'],
+                    "fired_at": now.isoformat(),
+                })
+
+            if fired_up_to is not None:
+                self._save_high_water(conn, fired_up_to)
+
+        # Only now that the connection is closed
+        for event in events:
+            self._dispatch(event)
+
+    def _save_high_water(self, conn, value):
+        """Persist how far events have been emitted, never moving it backwards."""
+        conn.execute(
+            'UPDATE scheduler_leases SET high_water = ? '
+            'WHERE name = ? AND owner = ? AND (high_water IS NULL OR high_water < ?)',
+            (value.isoformat(), self.LEASE_NAME, self.owner, value.isoformat())
+        )
+
+    def _dispatch(self, event):
+        """Queue an event for the listeners, starting the delivery thread on first use."""
+        if self._delivery is None:
+            self._delivery = threading.Thread(target=self._deliver, name='due-date-delivery', daemon=True)
+            self._delivery.start()
+        self._events.put(event)
+
+    def _deliver(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            self._emit(event)
+
+    def _emit(self, event):
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Due date listener failed for %s", event)
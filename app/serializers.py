@@ -0,0 +1,181 @@
+"""
+Response serialization for Miniban.
+This module provides a fast JSON provider for Flask, MessagePack content
+negotiation and gzip/brotli response compression. orjson, msgpack and
+brotli are used when installed; without them the stdlib json encoder and
+gzip are used and MessagePack is not offered.
+"""
+
+import gzip
+import json
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Responses smaller than this are sent uncompressed by default
+DEFAULT_COMPRESS_MIN_SIZE = 1024
+
+_COMPRESSIBLE_MIMETYPES = {
+    JSON_MIMETYPE,
+    'application/javascript',
+    'image/svg+xml',
+} | set(MSGPACK_MIMETYPES)
+
+
+def _default(value):
+    """Encode values the encoders do not know natively (dates, enums, ...) as strings."""
+    return str(getattr(value, 'value', value))
+
+
+def encode_json(payload):
+    """
+    Encode a payload as compact JSON.
+
+    Args:
+        payload: Any JSON-serializable object.
+
+    Returns:
+        bytes: UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def encode_msgpack(payload):
+    """
+    Encode a payload as MessagePack.
+
+    Args:
+        payload: Any JSON-serializable object.
+
+    Returns:
+        bytes: The packed payload.
+    """
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that skips key sorting and indentation.
+
+    Installed as `app.json`, so every `jsonify` call goes through orjson when
+    it is available, in debug mode too.
+    """
+
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj), mimetype=self.mimetype)
+
+
+def negotiate_format():
+    """
+    Pick the response format from the request's Accept header.
+
+    Returns:
+        str: The chosen mimetype; JSON unless the client prefers MessagePack and it is available.
+    """
+    if msgpack is None:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+
+
+def respond(payload, status=200, headers=None):
+    """
+    Build a response in the format the client asked for.
+
+    Args:
+        payload: The data to send.
+        status (int, optional): HTTP status code. Defaults to 200.
+        headers (dict, optional): Extra response headers.
+
+    Returns:
+        Response: A JSON or MessagePack response.
+    """
+    mimetype = negotiate_format()
+    body = encode_json(payload) if mimetype == JSON_MIMETYPE else encode_msgpack(payload)
+    response = current_app.response_class(body, status=status, mimetype=mimetype, headers=headers)
+    response.vary.add('Accept')
+    return response
+
+
+def choose_encoding():
+    """Pick the best compression the client accepts: brotli, then gzip."""
+    encodings = request.accept_encodings
+    if brotli is not None and encodings['br']:
+        return 'br'
+    if encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """
+    Compress a response body with brotli or gzip when it is worth it.
+
+    Registered as an `after_request` handler. Streaming responses, bodies
+    that are already encoded and bodies below COMPRESS_MIN_SIZE are left
+    untouched.
+
+    Args:
+        response (Response): The outgoing response.
+
+    Returns:
+        Response: The same response, possibly with a compressed body.
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or not (response.mimetype.startswith('text/') or response.mimetype in _COMPRESSIBLE_MIMETYPES)
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    min_size = current_app.config.get('COMPRESS_MIN_SIZE', DEFAULT_COMPRESS_MIN_SIZE)
+    if response.content_length is not None and response.content_length < min_size:
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if encoding == 'br':
+        # Quality 5 compresses JSON about as well as gzip -9 at a fraction of the cost
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,822 @@
+// Client-side task store.
+// serverTasks holds the last state confirmed by the API; pendingOps holds
+// optimistic changes that have been applied locally but not yet confirmed.
+// The board always renders serverTasks with pendingOps replayed on top, so
+// a failed request only has to drop its own op to roll back.
+//
+// Both are also kept in IndexedDB. On load the board is drawn from the copy
+// embedded in the page, or from the stored one when that is newer (a page
+// the browser kept in its cache), and in that case only the tasks changed
+// since the stored board version are fetched. Ops are sent one at a time in the order they were made;
+// while the server cannot be reached they stay queued, across reloads too,
+// and are sent once it can.
+const serverTasks = new Map();
+const pendingOps = new Map();
+const cardCache = new Map();
+let boardVersion = null;
+let nextOpId = 1;
+let nextTempId = 1;
+let renderScheduled = false;
+let saveScheduled = false;
+let outboxReady = false;
+let flushing = false;
+let offline = false;
+let retryTimer = null;
+let busyTimer = null;
+
+const BOARD_URL = '/tasks';
+// Keys and temporary IDs of ops restored from an earlier visit never clash with new ones
+const sessionStart = Date.now();
+
+const columnIds = {
+    'To Do': 'todo-column',
+    'Planned': 'planned-column',
+    'In Progress': 'in-progress-column',
+    'Done': 'done-column'
+};
+
+// IndexedDB copy of the board and of unsent ops; resolves to null where
+// storage is unavailable (e.g. some private browsing modes), in which case
+// the board simply works online only
+const localStore = openLocalStore();
+
+function openLocalStore() {
+    return new Promise(resolve => {
+        if (!window.indexedDB) {
+            resolve(null);
+            return;
+        }
+        const request = indexedDB.open('miniban', 1);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore('boards', {keyPath: 'url'});
+            request.result.createObjectStore('outbox', {keyPath: 'key'});
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => resolve(null);
+        request.onblocked = () => resolve(null);
+    });
+}
+
+// Run one request against an object store and resolve with its result
+async function withStore(name, mode, action) {
+    const db = await localStore;
+    if (!db) {
+        return undefined;
+    }
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(name, mode);
+        const request = action(transaction.objectStore(name));
+        transaction.oncomplete = () => resolve(request.result);
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+// The board as embedded in the page when it was rendered, or null
+function readBootstrap() {
+    const element = document.getElementById('board-data');
+    if (!element) {
+        return null;
+    }
+    try {
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        console.error('Error reading the embedded board:', error);
+        return null;
+    }
+}
+
+// Show the board at once, from the page itself or from the stored copy,
+// then catch up with the server if that copy may be behind
+async function fetchAndDisplayTasks() {
+    const bootstrap = readBootstrap();
+    if (bootstrap) {
+        bootstrap.tasks.forEach(task => serverTasks.set(task.id, task));
+        boardVersion = bootstrap.version;
+        scheduleRender();
+        scheduleSave();
+    }
+
+    let restored = false;
+    try {
+        restored = await restoreLocalState(bootstrap);
+    } catch (error) {
+        console.error('Error reading the stored board:', error);
+    }
+    outboxReady = true;
+
+    if (bootstrap && !restored) {
+        // The page was rendered from the current board; only queued ops remain to be sent
+        flushOutbox();
+        return;
+    }
+    try {
+        await syncTasks();
+    } catch (error) {
+        console.error('Error fetching tasks:', error);
+        if (restored) {
+            setOffline(true);
+        } else {
+            // Display error message to user
+            Object.values(columnIds).forEach(colId => {
+                const column = document.getElementById(colId);
+                column.innerHTML = '<div class="empty-column">Error loading tasks. Please refresh the page.</div>';
+            });
+        }
+    }
+    flushOutbox();
+}
+
+// Load queued ops, and the stored board unless the embedded one is at least as new.
+// Resolves to whether the stored board was used.
+async function restoreLocalState(bootstrap) {
+    const [stored, ops] = await Promise.all([
+        withStore('boards', 'readonly', store => store.get(BOARD_URL)),
+        withStore('outbox', 'readonly', store => store.getAll())
+    ]);
+    const board = stored && (!bootstrap || (bootstrap.version !== null && stored.version !== null
+        && stored.version > bootstrap.version)) ? stored : null;
+    if (board) {
+        serverTasks.clear();
+        board.tasks.forEach(task => serverTasks.set(task.id, task));
+        boardVersion = board.version;
+    }
+    if (ops && ops.length) {
+        // Ops from earlier visits go before any made while they were loading
+        const newer = Array.from(pendingOps.values());
+        pendingOps.clear();
+        ops.concat(newer).forEach(op => pendingOps.set(op.key, op));
+    }
+    scheduleRender();
+    return Boolean(board);
+}
+
+// Bring serverTasks up to date: only what changed after boardVersion if
+// there is one, otherwise the whole board
+async function syncTasks() {
+    const url = boardVersion === null ? BOARD_URL : `${BOARD_URL}?since=${boardVersion}`;
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error('Failed to fetch tasks');
+    }
+    const body = await response.json();
+    // Backends without delta sync always answer with the whole board
+    const changes = Array.isArray(body) ? {changed: body, deleted: [], reset: true} : body;
+    if (changes.reset) {
+        serverTasks.clear();
+    }
+    changes.changed.forEach(task => {
+        const known = serverTasks.get(task.id);
+        // One of our own requests may have confirmed a newer row meanwhile
+        if (!known || !(known.version > task.version)) {
+            serverTasks.set(task.id, task);
+        }
+    });
+    changes.deleted.forEach(taskId => serverTasks.delete(taskId));
+    const version = response.headers.get('X-Board-Version');
+    boardVersion = version === null ? null : Number(version);
+    setOffline(false);
+    scheduleSave();
+    scheduleRender();
+}
+
+// Write the confirmed board to IndexedDB, at most once a second
+function scheduleSave() {
+    if (saveScheduled) {
+        return;
+    }
+    saveScheduled = true;
+    setTimeout(() => {
+        saveScheduled = false;
+        withStore('boards', 'readwrite', store => store.put({
+            url: BOARD_URL,
+            version: boardVersion,
+            tasks: Array.from(serverTasks.values())
+        })).catch(error => console.error('Error saving the board:', error));
+    }, 1000);
+}
+
+function setOffline(value) {
+    offline = value;
+    updateSyncStatus();
+    if (offline && retryTimer === null) {
+        retryTimer = setTimeout(reconnect, 10000);
+    }
+}
+
+// Send what was queued while offline, then fetch what changed meanwhile
+async function reconnect() {
+    clearTimeout(retryTimer);
+    retryTimer = null;
+    await flushOutbox();
+    try {
+        await syncTasks();
+    } catch (error) {
+        setOffline(true);
+    }
+}
+
+function updateSyncStatus() {
+    const status = document.getElementById('sync-status');
+    if (!status) {
+        return;
+    }
+    status.hidden = !offline;
+    status.textContent = pendingOps.size
+        ? `Offline: ${pendingOps.size} unsaved change(s) will be sent when the connection is back`
+        : 'Offline: showing the board as last loaded';
+}
+
+// What the user sees of a task once an op is applied to it
+function applyOp(task, op) {
+    switch (op.change.type) {
+        case 'create':
+            return {...op.change.fields, id: op.taskId, pending: true};
+        case 'delete':
+            return null;
+        default:
+            return task && {...task, ...op.change.fields};
+    }
+}
+
+// Compute the tasks the user should currently see
+function viewTasks() {
+    const tasks = new Map(serverTasks);
+    for (const op of pendingOps.values()) {
+        const current = tasks.get(op.taskId);
+        const next = applyOp(current, op);
+        if (next) {
+            tasks.set(op.taskId, next);
+        } else {
+            tasks.delete(op.taskId);
+        }
+    }
+    return tasks;
+}
+
+// Coalesce renders into one per animation frame
+function scheduleRender() {
+    if (renderScheduled) {
+        return;
+    }
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+        renderScheduled = false;
+        displayTasks(Array.from(viewTasks().values()));
+        updateSyncStatus();
+    });
+}
+
+function displayTasks(tasks) {
+    // Group tasks by status
+    const tasksByStatus = {
+        'To Do': [],
+        'Planned': [],
+        'In Progress': [],
+        'Done': []
+    };
+
+    tasks.forEach(task => {
+        if (tasksByStatus[task.status]) {
+            tasksByStatus[task.status].push(task);
+        }
+    });
+    Object.values(tasksByStatus).forEach(columnTasks => columnTasks.sort(compareRanks));
+
+    // Reuse cards whose task has not changed since they were built
+    const seen = new Set();
+    for (const [status, columnTasks] of Object.entries(tasksByStatus)) {
+        const column = document.getElementById(columnIds[status]);
+        const cards = columnTasks.map(task => {
+            seen.add(task.id);
+            const cached = cardCache.get(task.id);
+            if (cached && cached.task === task) {
+                return cached.card;
+            }
+            const card = createTaskCard(task);
+            cardCache.set(task.id, {task: task, card: card});
+            return card;
+        });
+
+        if (cards.length === 0) {
+            if (!column.querySelector('.empty-column') || column.children.length !== 1) {
+                column.innerHTML = '<div class="empty-column">No tasks</div>';
+            }
+        } else if (!sameChildren(column, cards)) {
+            // Only touch columns whose cards actually changed, so an
+            // in-progress title edit elsewhere keeps its focus
+            column.replaceChildren(...cards);
+        }
+    }
+
+    for (const taskId of Array.from(cardCache.keys())) {
+        if (!seen.has(taskId)) {
+            cardCache.delete(taskId);
+        }
+    }
+}
+
+function sameChildren(column, cards) {
+    if (column.children.length !== cards.length) {
+        return false;
+    }
+    return cards.every((card, index) => column.children[index] === card);
+}
+
+// Apply a change locally and queue its request to the server.
+// change: {type: 'create' | 'update' | 'delete', fields}
+// request: {method, path (with {id} for the task ID), body, ifMatch}
+// The op is stored before it is sent, so it survives a reload while offline.
+function mutateTask(taskId, change, request, label) {
+    const key = `${sessionStart}:${String(nextOpId++).padStart(9, '0')}`;
+    const op = {key: key, taskId: taskId, change: change, request: request, label: label};
+    pendingOps.set(key, op);
+    scheduleRender();
+    withStore('outbox', 'readwrite', store => store.put(op))
+        .catch(error => console.error('Error storing change:', error))
+        .finally(flushOutbox);
+}
+
+// Send queued ops in order until none are left or the server is unreachable
+async function flushOutbox() {
+    if (flushing || !outboxReady) {
+        return;
+    }
+    flushing = true;
+    try {
+        // Ops queued while this runs are picked up by the same loop
+        for (const op of pendingOps.values()) {
+            let response;
+            try {
+                response = await sendOp(op);
+            } catch (error) {
+                // Network failure: this op and every later one wait for the next attempt
+                setOffline(true);
+                return;
+            }
+            setOffline(false);
+            if (response.status === 503) {
+                // Too many writes in progress: keep this op and every later one
+                // queued, and send them again when the server says to
+                const seconds = Number(response.headers.get('Retry-After'));
+                retryFlushAfter(seconds > 0 ? seconds * 1000 : 1000);
+                return;
+            }
+            try {
+                await settleOp(op, response);
+            } catch (error) {
+                console.error(`Error trying to ${op.label}:`, error);
+            }
+            // Either the confirmed row replaces the op, or the op is
+            // dropped and the previous state shows through again
+            pendingOps.delete(op.key);
+            withStore('outbox', 'readwrite', store => store.delete(op.key))
+                .catch(error => console.error('Error removing sent change:', error));
+            scheduleSave();
+            scheduleRender();
+        }
+    } finally {
+        flushing = false;
+    }
+}
+
+function retryFlushAfter(delay) {
+    if (busyTimer !== null) {
+        return;
+    }
+    busyTimer = setTimeout(() => {
+        busyTimer = null;
+        flushOutbox();
+    }, delay);
+}
+
+function sendOp(op) {
+    const headers = {
+        'Content-Type': 'application/json',
+    };
+    if (op.request.ifMatch !== null) {
+        headers['If-Match'] = `"${op.request.ifMatch}"`;
+    }
+    return fetch(op.request.path.replace('{id}', op.taskId), {
+        method: op.request.method,
+        headers: headers,
+        body: op.request.body === null ? undefined : JSON.stringify(op.request.body)
+    });
+}
+
+// Reconcile serverTasks with the server's answer to an op
+async function settleOp(op, response) {
+    if (response.status === 412) {
+        // Someone else changed the task first: show their version instead of ours
+        const conflict = await response.json();
+        storeServerTask(conflict.current);
+        alert('This task was changed elsewhere. Its latest version is now shown.');
+        return;
+    }
+    if (response.status === 404 && op.change.type !== 'create') {
+        // Deleted elsewhere; that is all a delete wanted anyway
+        serverTasks.delete(op.taskId);
+        if (op.change.type !== 'delete') {
+            alert('This task was deleted elsewhere.');
+        }
+        return;
+    }
+    if (!response.ok) {
+        console.error(`Error trying to ${op.label}: status ${response.status}`);
+        alert(`Failed to ${op.label}. Please try again.`);
+        return;
+    }
+
+    const result = await response.json();
+    if (op.change.type === 'delete') {
+        serverTasks.delete(op.taskId);
+        return;
+    }
+    const previous = serverTasks.get(op.taskId);
+    storeServerTask(result);
+    rebaseOps(op, previous, result);
+}
+
+// Point later ops at what an op just produced: the real ID of a task that
+// was created under a temporary one, and the version our own change moved
+// the task to, so it is not mistaken for someone else's edit
+function rebaseOps(op, previous, result) {
+    for (const later of pendingOps.values()) {
+        if (later === op || later.taskId !== op.taskId) {
+            continue;
+        }
+        later.taskId = result.id;
+        if (previous && later.request.ifMatch === previous.version) {
+            later.request.ifMatch = result.version;
+        }
+        withStore('outbox', 'readwrite', store => store.put(later))
+            .catch(error => console.error('Error storing change:', error));
+    }
+}
+
+function createTaskCard(task) {
+    const card = document.createElement('div');
+    card.className = 'task-card';
+    card.draggable = true;
+    card.dataset.taskId = task.id;
+    card.dataset.currentStatus = task.status;
+    if (task.pending) {
+        card.classList.add('pending');
+    }
+
+    // Add drag event listeners
+    card.addEventListener('dragstart', function(e) {
+        dragStart(e, task);
+    });
+
+    card.addEventListener('dragend', function(e) {
+        dragEnd(e);
+    });
+
+    // Title element with inline editing
+    const titleContainer = document.createElement('div');
+    titleContainer.className = 'task-title';
+    titleContainer.textContent = task.title;
+
+    // Make title editable on click
+    titleContainer.addEventListener('click', function(e) {
+        e.stopPropagation(); // Prevent triggering card drag
+        startEditingTitle(card, task);
+    });
+
+    const description = document.createElement('div');
+    description.className = 'task-description';
+    description.textContent = task.description || 'No description';
+
+    const meta = document.createElement('div');
+    meta.className = 'task-meta';
+
+    // Priority badge (static, no dropdown)
+    const priorityBadge = document.createElement('span');
+    priorityBadge.className = `priority-badge priority-${task.priority.toLowerCase()}`;
+    priorityBadge.textContent = task.priority;
+
+    const dueDate = document.createElement('span');
+    dueDate.className = 'due-date';
+    dueDate.textContent = task.due_date ? `Due: ${task.due_date}` : 'No due date';
+
+    meta.appendChild(priorityBadge);
+    meta.appendChild(dueDate);
+
+    // Add delete button
+    const deleteBtn = document.createElement('button');
+    deleteBtn.className = 'delete-task-btn';
+    deleteBtn.innerHTML = '×';
+    deleteBtn.title = 'Delete this task';
+    deleteBtn.addEventListener('click', function(e) {
+        e.stopPropagation(); // Prevent triggering card drag
+        if (confirm('Are you sure you want to delete this task? This cannot be undone.')) {
+            deleteTask(task.id);
+        }
+    });
+
+    card.appendChild(deleteBtn);
+    card.appendChild(titleContainer);
+    card.appendChild(description);
+    card.appendChild(meta);
+
+    return card;
+}
+
+// Drag and Drop Functions
+let draggedTask = null;
+
+function dragStart(e, task) {
+    draggedTask = task;
+    e.target.classList.add('dragging');
+    e.dataTransfer.setData('text/plain', task.id);
+    e.dataTransfer.effectAllowed = 'move';
+}
+
+function dragEnd(e) {
+    e.target.classList.remove('dragging');
+    // Remove drag-over class from all columns
+    document.querySelectorAll('.column').forEach(col => {
+        col.classList.remove('drag-over');
+    });
+}
+
+function allowDrop(e) {
+    e.preventDefault();
+    e.dataTransfer.dropEffect = 'move';
+
+    // Add visual feedback
+    const column = e.currentTarget;
+    column.classList.add('drag-over');
+}
+
+function dropTask(e, newStatus) {
+    e.preventDefault();
+
+    // Remove drag-over class from all columns
+    document.querySelectorAll('.column').forEach(col => {
+        col.classList.remove('drag-over');
+    });
+
+    const task = draggedTask;
+    draggedTask = null;
+    if (!task || task.pending) {
+        return;
+    }
+
+    if (task.rank === undefined) {
+        // Backend without ordering support: only the column changes
+        if (task.status !== newStatus) {
+            updateTaskStatus(task.id, newStatus);
+        }
+        return;
+    }
+
+    // Drop before the card under the pointer if over its top half,
+    // after it if over its bottom half, else at the bottom of the column
+    const targetCard = e.target.closest('.task-card');
+    let placement = {};
+    if (targetCard && targetCard.dataset.taskId !== String(task.id)) {
+        const box = targetCard.getBoundingClientRect();
+        const anchorId = Number(targetCard.dataset.taskId);
+        placement = e.clientY < box.top + box.height / 2 ? {before: anchorId} : {after: anchorId};
+    } else if (targetCard || task.status === newStatus) {
+        return;
+    }
+    moveTask(task.id, newStatus, placement);
+}
+
+// Fractional ranks: the same base-62 keys the server generates, so a
+// moved card can be positioned before the server has answered
+const RANK_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz';
+
+function compareRanks(a, b) {
+    const rankA = a.rank || '~';
+    const rankB = b.rank || '~';
+    return rankA < rankB ? -1 : rankA > rankB ? 1 : 0;
+}
+
+function rankBetween(lower, upper) {
+    if (lower && upper && lower >= upper) {
+        return lower;
+    }
+    const base = BigInt(RANK_DIGITS.length);
+    const toInt = (key, length) => [...key.padEnd(length, '0')].reduce(
+        (value, digit) => value * base + BigInt(RANK_DIGITS.indexOf(digit)), 0n);
+    let length = Math.max((lower || '').length, (upper || '').length, 1);
+    let low, high;
+    while (true) {
+        low = lower ? toInt(lower, length) : 0n;
+        high = upper ? toInt(upper, length) : base ** BigInt(length);
+        if (high - low > 1n) {
+            break;
+        }
+        length++;
+    }
+    let value = low + (high - low) / 2n;
+    let key = '';
+    for (let i = 0; i < length; i++) {
+        key = RANK_DIGITS[Number(value % base)] + key;
+        value /= base;
+    }
+    return key.replace(/0+$/, '');
+}
+
+function rankForPlacement(taskId, status, placement) {
+    const column = Array.from(viewTasks().values())
+        .filter(t => t.status === status && t.id !== taskId)
+        .sort(compareRanks);
+    if (placement.before === undefined && placement.after === undefined) {
+        return rankBetween(column.length ? column[column.length - 1].rank : null, null);
+    }
+    const anchorId = placement.before !== undefined ? placement.before : placement.after;
+    const index = column.findIndex(t => t.id === anchorId);
+    const lowerIndex = placement.before !== undefined ? index - 1 : index;
+    const lower = lowerIndex >= 0 ? column[lowerIndex].rank : null;
+    const upper = lowerIndex + 1 < column.length ? column[lowerIndex + 1].rank : null;
+    return rankBetween(lower, upper);
+}
+
+function moveTask(taskId, newStatus, placement) {
+    const rank = rankForPlacement(taskId, newStatus, placement);
+    mutateTask(
+        taskId,
+        {type: 'update', fields: {status: newStatus, rank: rank}},
+        {method: 'POST', path: '/tasks/{id}/move', body: {status: newStatus, ...placement}, ifMatch: null},
+        'move task'
+    );
+}
+
+function putTask(taskId, changes, label) {
+    // Only apply the change to the version this tab last saw
+    const known = serverTasks.get(taskId);
+    const ifMatch = known && known.version !== undefined ? known.version : null;
+    mutateTask(
+        taskId,
+        {type: 'update', fields: changes},
+        {method: 'PUT', path: '/tasks/{id}', body: changes, ifMatch: ifMatch},
+        label
+    );
+}
+
+function storeServerTask(task) {
+    serverTasks.set(task.id, task);
+}
+
+function updateTaskStatus(taskId, newStatus) {
+    putTask(taskId, {status: newStatus}, 'update task status');
+}
+
+// Task Editing Functions
+function startEditingTitle(card, task) {
+    if (task.pending || card.classList.contains('editing-title')) {
+        return;
+    }
+    const titleElement = card.querySelector('.task-title');
+    const currentTitle = titleElement.textContent;
+
+    // Create input field
+    const input = document.createElement('input');
+    input.type = 'text';
+    input.className = 'task-title-input';
+    input.value = currentTitle;
+
+    // Replace title with input field
+    titleElement.textContent = '';
+    titleElement.appendChild(input);
+    input.focus();
+
+    // Add editing class to card
+    card.classList.add('editing-title');
+
+    // Handle input events
+    input.addEventListener('blur', function() {
+        saveTitleEdit(card, task, input);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'Enter') {
+            input.blur();
+        } else if (e.key === 'Escape') {
+            input.value = task.title;
+            input.blur();
+        }
+    });
+}
+
+function saveTitleEdit(card, task, input) {
+    // Removing the input fires blur again, so only the first call counts
+    if (!card.classList.contains('editing-title')) {
+        return;
+    }
+    const newTitle = input.value.trim();
+    card.classList.remove('editing-title');
+    cancelTitleEdit(card, card.querySelector('.task-title'), task.title);
+    if (newTitle && newTitle !== task.title) {
+        updateTaskTitle(task.id, newTitle);
+    }
+}
+
+function cancelTitleEdit(card, titleElement, originalTitle) {
+    titleElement.textContent = originalTitle;
+    card.classList.remove('editing-title');
+}
+
+function updateTaskTitle(taskId, newTitle) {
+    putTask(taskId, {title: newTitle}, 'update task title');
+}
+
+
+
+// Task Creation Modal Functions
+function openTaskModal() {
+    const modal = document.getElementById('task-modal');
+    modal.style.display = 'block';
+}
+
+function closeTaskModal() {
+    const modal = document.getElementById('task-modal');
+    modal.style.display = 'none';
+    // Reset form
+    document.getElementById('task-form').reset();
+}
+
+// Handle form submission
+function handleTaskFormSubmit(e) {
+    e.preventDefault();
+
+    const form = e.target;
+    const formData = new FormData(form);
+
+    const taskData = {
+        title: formData.get('title'),
+        description: formData.get('description'),
+        status: 'To Do',  // Default status
+        priority: 'Medium',  // Default priority
+        due_date: null  // No due date by default
+    };
+
+    // Show the card immediately under a temporary id; it is swapped
+    // for the server row once the POST returns
+    const tempId = `tmp-${sessionStart}-${nextTempId++}`;
+    closeTaskModal();
+
+    mutateTask(
+        tempId,
+        {type: 'create', fields: taskData},
+        {method: 'POST', path: '/tasks', body: taskData, ifMatch: null},
+        'create task'
+    );
+}
+
+// Event Listeners for Modal
+document.addEventListener('DOMContentLoaded', function() {
+    const createTaskBtn = document.getElementById('create-task-btn');
+    const closeBtn = document.querySelector('.close');
+    const cancelBtn = document.getElementById('cancel-btn');
+    const taskForm = document.getElementById('task-form');
+
+    if (createTaskBtn) {
+        createTaskBtn.addEventListener('click', openTaskModal);
+    }
+
+    if (closeBtn) {
+        closeBtn.addEventListener('click', closeTaskModal);
+    }
+
+    if (cancelBtn) {
+        cancelBtn.addEventListener('click', closeTaskModal);
+    }
+
+    if (taskForm) {
+        taskForm.addEventListener('submit', handleTaskFormSubmit);
+    }
+
+    // Close modal when clicking outside
+    window.addEventListener('click', function(event) {
+        const modal = document.getElementById('task-modal');
+        if (event.target === modal) {
+            closeTaskModal();
+        }
+    });
+
+    // Load tasks when page loads
+    fetchAndDisplayTasks();
+
+    window.addEventListener('online', reconnect);
+    // Catch up with changes made elsewhere when the tab is shown again
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'visible' && outboxReady) {
+            reconnect();
+        }
+    });
+});
+
+// Delete task function
+function deleteTask(taskId) {
+    mutateTask(
+        taskId,
+        {type: 'delete', fields: null},
+        {method: 'DELETE', path: '/tasks/{id}', body: null, ifMatch: null},
+        'delete task'
+    );
+}
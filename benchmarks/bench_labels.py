@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark label filtering: bitmap indexes against SQL over task_labels.
+
+Builds a board of 1M cards carrying up to 6 of 100 labels each, with a
+skewed label popularity so both sparse (array) and dense (bitset) bitmap
+containers occur, then times AND and OR filters answered by the label
+bitmaps, by Python sets, and by GROUP BY / DISTINCT queries on an indexed
+task_labels table in SQLite.
+
+Usage:
+    python benchmarks/bench_labels.py [--cards 1000000] [--labels 100] [--no-sqlite]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.bitmap import Bitmap  # noqa: E402
+from app.dao.labels import AND, OR, LabelIndex  # noqa: E402
+
+
+def make_labels(cards, labels, seed=42):
+    """Assign labels to cards 1..cards; label i is picked with weight 1/(i+1)."""
+    rng = random.Random(seed)
+    names = [f"label-{i}" for i in range(labels)]
+    weights = [1 / (i + 1) for i in range(labels)]
+    members = {name: [] for name in names}
+    for task_id in range(1, cards + 1):
+        for name in set(rng.choices(names, weights, k=rng.randrange(7))):
+            members[name].append(task_id)
+    return members
+
+
+def timed(func, *args, repeat=5):
+    """Return (best time in ms, result) over several runs."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def load_sqlite(members):
+    """Load the assignments into an in-memory task_labels table with the DAO's index."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE task_labels (
+            task_id INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            board_id INTEGER NOT NULL,
+            PRIMARY KEY (task_id, label)
+        ) WITHOUT ROWID
+    ''')
+    conn.executemany(
+        'INSERT INTO task_labels (task_id, label, board_id) VALUES (?, ?, 1)',
+        ((task_id, name) for name, task_ids in members.items() for task_id in task_ids)
+    )
+    conn.execute('CREATE INDEX idx_task_labels_board_label ON task_labels(board_id, label, task_id)')
+    conn.commit()
+    return conn
+
+
+def sqlite_match(conn, labels, mode):
+    placeholders = ', '.join('?' * len(labels))
+    if mode == AND:
+        sql = (f'SELECT task_id FROM task_labels WHERE board_id = 1 AND label IN ({placeholders}) '
+               'GROUP BY task_id HAVING COUNT(*) = ?')
+        return conn.execute(sql, (*labels, len(labels))).fetchall()
+    sql = f'SELECT DISTINCT task_id FROM task_labels WHERE board_id = 1 AND label IN ({placeholders})'
+    return conn.execute(sql, labels).fetchall()
+
+
+def set_match(sets, labels, mode):
+    chosen = sorted((sets[label] for label in labels), key=len)
+    return set.intersection(*chosen) if mode == AND else set.union(*chosen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=1_000_000)
+    parser.add_argument('--labels', type=int, default=100)
+    parser.add_argument('--no-sqlite', action='store_true', help="skip the SQL comparison")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    members = make_labels(args.cards, args.labels)
+    rows = sum(len(task_ids) for task_ids in members.values())
+    print(f"{args.cards:,} cards, {args.labels} labels, {rows:,} task_labels rows "
+          f"(generated in {time.perf_counter() - start:.1f} s)")
+
+    build_ms, bitmaps = timed(
+        lambda: {name: Bitmap.from_sorted(task_ids) for name, task_ids in members.items()}, repeat=1
+    )
+    index = LabelIndex(bitmaps)
+    layout = [bitmap.stats() for bitmap in bitmaps.values()]
+    print(f"bitmap index: built in {build_ms:.0f} ms, "
+          f"{sum(stats['bytes'] for stats in layout) / 2**20:.1f} MiB in "
+          f"{sum(stats['arrays'] for stats in layout)} array and "
+          f"{sum(stats['bitsets'] for stats in layout)} bitset containers")
+
+    sets = {name: set(task_ids) for name, task_ids in members.items()}
+    conn = None
+    if not args.no_sqlite:
+        load_ms, conn = timed(load_sqlite, members, repeat=1)
+        print(f"sqlite: loaded in {load_ms:.0f} ms")
+
+    names = list(members)
+    queries = [
+        (AND, names[:2]), (AND, names[:3]), (AND, [names[0], names[-1]]),
+        (AND, names[-3:]), (OR, names[:2]), (OR, names[-5:]), (OR, names[:10]),
+    ]
+    print(f"{'mode':<4} {'labels':<28} {'matches':>9} {'bitmap ms':>10} {'set ms':>8} {'sqlite ms':>10}")
+    for mode, labels in queries:
+        bitmap_ms, matches = timed(index.match, labels, mode)
+        set_ms, expected = timed(set_match, sets, labels, mode)
+        assert list(matches) == sorted(expected)
+        sqlite_ms = ''
+        if conn is not None:
+            elapsed, result = timed(sqlite_match, conn, labels, mode, repeat=3)
+            assert len(result) == len(matches)
+            sqlite_ms = f"{elapsed:.1f}"
+        label_text = ','.join(label.replace('label-', '') for label in labels)
+        print(f"{mode:<4} {label_text:<28} {len(matches):>9,} {bitmap_ms:>10.2f} {set_ms:>8.2f} {sqlite_ms:>10}")
+
+
+if __name__ == '__main__':
+    main()
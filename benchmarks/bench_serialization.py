@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark task list serialization: encode time and bytes on the wire.
+
+Compares Flask's stock JSON settings (sorted keys), the fast JSON encoder
+and MessagePack, each uncompressed and with gzip/brotli, for boards of
+1k and 100k tasks.
+
+Usage:
+    python benchmarks/bench_serialization.py [--sizes 1000 100000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import serializers  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+
+
+def make_tasks(count):
+    """Build task rows shaped like the ones SQLiteTaskDAO returns."""
+    statuses = ['To Do', 'Planned', 'In Progress', 'Done']
+    priorities = ['High', 'Medium', 'Low']
+    ranks = keys_between(None, None, count)
+    return [
+        {
+            "id": i,
+            "board_id": 1,
+            "title": f"Task {i}",
+            "description": "Implement API endpoint for filtering tasks by status and priority",
+            "status": statuses[i % len(statuses)],
+            "priority": priorities[i % len(priorities)],
+            "due_date": "2024-06-30" if i % 2 else None,
+            "created_at": "2024-06-01 12:00:00",
+            "rank": ranks[i],
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func, *args, repeat=5):
+    """Return (best time in ms, result) over several runs."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    args = parser.parse_args()
+
+    encoders = [('json (flask default)', lambda tasks: json.dumps(tasks, sort_keys=True).encode('utf-8')),
+                ('json (fast)', serializers.encode_json)]
+    if serializers.msgpack is not None:
+        encoders.append(('msgpack', serializers.encode_msgpack))
+
+    compressors = [('identity', None), ('gzip', lambda body: gzip.compress(body, compresslevel=6, mtime=0))]
+    if serializers.brotli is not None:
+        compressors.append(('br', lambda body: serializers.brotli.compress(body, quality=5)))
+
+    print(f"orjson: {'yes' if serializers.orjson else 'no'}, "
+          f"msgpack: {'yes' if serializers.msgpack else 'no'}, "
+          f"brotli: {'yes' if serializers.brotli else 'no'}")
+    print(f"{'tasks':>8}  {'encoder':<22} {'encoding':<9} {'encode ms':>10} {'compress ms':>12} {'bytes':>12}")
+
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        for encoder_name, encode in encoders:
+            encode_ms, body = timed(encode, tasks)
+            for compressor_name, compress in compressors:
+                compress_ms, wire = (0.0, body) if compress is None else timed(compress, body, repeat=3)
+                print(f"{size:>8}  {encoder_name:<22} {compressor_name:<9} "
+                      f"{encode_ms:>10.1f} {compress_ms:>12.1f} {len(wire):>12,}")
+
+
+if __name__ == '__main__':
+    main()
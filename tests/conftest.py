@@ -0,0 +1,46 @@
+"""
+Shared fixtures: DAOs and Flask test clients backed by a temporary SQLite database.
+"""
+
+import sqlite3
+
+import pytest
+
+from app import create_app
+from app.dao.database_factory import DatabaseFactory, SQLiteTaskDAO
+from app.dao.task_dao import TaskDAO
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh SQLite database with the full schema; DATABASE points at it."""
+    path = str(tmp_path / 'miniban.sqlite')
+    monkeypatch.setenv('DATABASE', path)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    conn = sqlite3.connect(path, isolation_level=None)
+    DatabaseFactory._initialize_sqlite_schema(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def sqlite_dao(db_path):
+    return SQLiteTaskDAO(db_path)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def task_dao(request):
+    """Each DAO backend in turn."""
+    if request.param == 'memory':
+        return TaskDAO()
+    return request.getfixturevalue('sqlite_dao')
+
+
+@pytest.fixture
+def app(db_path):
+    return create_app({'TESTING': True})
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
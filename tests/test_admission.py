@@ -0,0 +1,81 @@
+"""
+Tests for write admission control.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from app.admission import BULK, INTERACTIVE, AdmissionController, Overloaded
+
+
+def _wait_for(controller, request_class, waiting):
+    deadline = time.monotonic() + 5
+    while controller.stats()['classes'][request_class]['waiting'] != waiting:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def _acquire_in_thread(controller, request_class, admitted):
+    def run():
+        controller.acquire(request_class)
+        admitted.append(request_class)
+    thread = threading.Thread(target=run)
+    thread.start()
+    _wait_for(controller, request_class, 1)
+    return thread
+
+
+def test_bulk_never_takes_the_last_slot():
+    controller = AdmissionController(2, max_waits={BULK: 0.05})
+    controller.acquire(BULK)
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire(BULK)
+    assert rejected.value.reason == 'deadline'
+
+    # The reserved slot is still free for an interactive edit
+    controller.acquire(INTERACTIVE)
+    stats = controller.stats()
+    assert (stats['running'], stats['classes'][BULK]['slots']) == (2, 1)
+
+
+def test_single_slot_is_shared():
+    controller = AdmissionController(1)
+    granted = controller.acquire(BULK)
+    controller.release(BULK, granted)
+    controller.acquire(INTERACTIVE)
+
+
+def test_slots_go_to_interactive_waiters_first():
+    controller = AdmissionController(2)
+    first_interactive = controller.acquire(INTERACTIVE)
+    first_bulk = controller.acquire(BULK)
+    admitted = []
+    threads = [_acquire_in_thread(controller, BULK, admitted),
+               _acquire_in_thread(controller, INTERACTIVE, admitted)]
+
+    controller.release(BULK, first_bulk)
+    threads[1].join(5)
+    assert admitted == [INTERACTIVE]
+
+    # The bulk waiter only gets a slot that leaves one for interactive edits
+    controller.release(INTERACTIVE, first_interactive)
+    threads[0].join(5)
+    assert admitted == [INTERACTIVE, BULK]
+    assert controller.stats()['classes'][BULK]['running'] == 1
+
+
+def test_overloaded_writes_get_503_with_retry_after(db_path):
+    app = create_app({'ADMISSION_CONCURRENCY': 1, 'ADMISSION_MAX_WAIT_INTERACTIVE': 0.05})
+    controller = app.extensions['admission']
+    granted = controller.acquire(INTERACTIVE)
+
+    response = app.test_client().post('/tasks', json={'title': 'a'})
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['reason'] == 'deadline'
+
+    controller.release(INTERACTIVE, granted)
+    assert app.test_client().post('/tasks', json={'title': 'a'}).status_code == 201
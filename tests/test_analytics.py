@@ -0,0 +1,117 @@
+"""
+Tests for flow analytics: cycle and lead times, WIP and cumulative flow.
+"""
+
+import time
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app.analytics import REMOVED, STATUSES, FlowAnalytics, compute_flow  # noqa: E402
+
+TODO, PLANNED, IN_PROGRESS, DONE = range(len(STATUSES))
+HOUR = 3600
+
+
+def _flow(transitions, start=0, end=4 * HOUR, step=HOUR):
+    task_ids, statuses, times = (np.array(column, dtype=np.int64) for column in zip(*transitions))
+    return compute_flow(task_ids, statuses.astype(np.int8), times, start, end, step)
+
+
+# (task, status entered, time), in recorded order
+TRANSITIONS = [
+    (5, TODO, -9000), (5, DONE, -5000),                       # finished before the window
+    (1, TODO, -1000), (1, IN_PROGRESS, 1000),
+    (2, TODO, 100), (2, IN_PROGRESS, HOUR),
+    (1, DONE, 4600),
+    (3, TODO, 5000), (3, DONE, 9000), (3, REMOVED, 9500),     # skipped In Progress, then cleaned up
+    (4, TODO, 20000),                                         # after the window
+]
+
+
+def test_status_counts_per_point():
+    flow = _flow(TRANSITIONS)
+    assert flow['timestamps'] == [
+        '1970-01-01T01:00:00Z', '1970-01-01T02:00:00Z', '1970-01-01T03:00:00Z', '1970-01-01T04:00:00Z'
+    ]
+    # Transitions before the window show in the first point; the one after it is dropped
+    assert flow['cumulative_flow'] == {
+        'To Do': [0, 1, 0, 0],
+        'Planned': [0, 0, 0, 0],
+        'In Progress': [2, 1, 1, 1],
+        'Done': [1, 2, 2, 2],
+    }
+    assert flow['wip'] == [2, 1, 1, 1]
+
+
+def test_cycle_and_lead_time_percentiles():
+    flow = _flow(TRANSITIONS)
+    # Task 1: lead 5600 s, cycle 3600 s; task 3: lead 4000 s, cycle 0 s
+    assert flow['lead_time'] == {"count": 2, "mean": 1.33, "p50": 1.33, "p85": 1.49, "p95": 1.53}
+    assert flow['cycle_time'] == {"count": 2, "mean": 0.5, "p50": 0.5, "p85": 0.85, "p95": 0.95}
+
+
+def test_empty_board():
+    flow = compute_flow(np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0, np.int64), 0, 2 * HOUR, HOUR)
+    assert flow['wip'] == [0, 0]
+    assert flow['lead_time'] == {"count": 0, "mean": None, "p50": None, "p85": None, "p95": None}
+
+
+def test_counts_match_a_replay():
+    rng = np.random.default_rng(7)
+    transitions, seen = [], set()
+    for at in sorted(rng.integers(-5 * HOUR, 30 * HOUR, 400).tolist()):
+        task = int(rng.integers(0, 40))
+        # Every task starts in To Do, then moves around or is removed at random
+        status = int(rng.choice([REMOVED, *range(len(STATUSES))])) if task in seen else TODO
+        seen.add(task)
+        transitions.append((task, status, at))
+    flow = _flow(transitions, start=0, end=24 * HOUR)
+
+    for index, point in enumerate(range(HOUR, 24 * HOUR + 1, HOUR)):
+        current = {}
+        for task, status, at in transitions:
+            if at <= point:
+                current[task] = status
+        for code, name in enumerate(STATUSES):
+            assert flow['cumulative_flow'][name][index] == sum(1 for status in current.values() if status == code)
+
+
+def test_hourly_points_and_caching(sqlite_dao):
+    analytics = FlowAnalytics()
+    task_id = sqlite_dao.create_task('a')['id']
+    # Ahead of every transition the test makes, even across an hour boundary
+    now = time.time() + 60
+
+    flow = analytics.flow(sqlite_dao, 1, days=1, interval='hour', now=now)
+    assert len(flow['timestamps']) == 24
+    assert flow['wip'][-1] == 0
+    assert analytics.flow(sqlite_dao, 1, days=1, interval='hour', now=now) is flow
+
+    # A new board version means new transitions and a fresh result
+    sqlite_dao.move_task(task_id, status='In Progress')
+    updated = analytics.flow(sqlite_dao, 1, days=1, interval='hour', now=now)
+    assert updated is not flow
+    assert updated['version'] > flow['version']
+    assert updated['wip'][-1] == 1
+    assert analytics.flow(sqlite_dao, 99, now=now) is None
+
+
+def test_invalid_windows():
+    analytics = FlowAnalytics()
+    with pytest.raises(ValueError):
+        analytics.flow(None, 1, interval='week')
+    with pytest.raises(ValueError):
+        analytics.flow(None, 1, days=0)
+    with pytest.raises(ValueError):
+        analytics.flow(None, 1, days=1000, interval='hour')
+
+
+def test_flow_route(client):
+    client.post('/tasks', json={'title': 'a', 'status': 'In Progress'})
+    flow = client.get('/analytics/flow?days=2&interval=hour').get_json()
+    assert (len(flow['wip']), flow['wip'][-1], flow['unit']) == (48, 1, 'hours')
+    assert client.get('/analytics/flow?days=x').status_code == 400
+    assert client.get('/analytics/flow?interval=week').status_code == 400
+    assert client.get('/boards/99/analytics/flow').status_code == 404
@@ -0,0 +1,60 @@
+"""
+Tests for archiving Done tasks, paging through the archive and restoring tasks.
+"""
+
+import sqlite3
+
+import pytest
+
+
+def _archived_board(client, db_path, count):
+    """Create `count` Done tasks completed long ago, and one recent one; returns their IDs."""
+    ids = []
+    for i in range(count + 1):
+        task = client.post('/tasks', json={'title': f't{i}', 'status': 'Done', 'labels': [f'l{i}']}).get_json()
+        ids.append(task['id'])
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("UPDATE tasks SET completed_at = '2000-01-01 00:00:00' WHERE id != ?", (ids[-1],))
+    conn.close()
+    return ids
+
+
+def test_archive_page_and_restore(client, db_path):
+    ids = _archived_board(client, db_path, 3)
+    response = client.post('/admin/archive', json={'older_than_days': 30})
+    assert response.get_json() == {"archived": 3, "older_than_days": 30}
+    assert [task['id'] for task in client.get('/tasks').get_json()] == ids[-1:]
+
+    page = client.get('/tasks/archive?limit=2').get_json()
+    assert [task['id'] for task in page['tasks']] == [ids[2], ids[1]]
+    assert page['tasks'][0]['labels'] == ['l2']
+    assert page['next_before'] == ids[1]
+    page = client.get(f"/tasks/archive?limit=2&before={page['next_before']}").get_json()
+    assert ([task['id'] for task in page['tasks']], page['next_before']) == ([ids[0]], None)
+
+    restored = client.post(f'/tasks/archive/{ids[0]}/restore')
+    assert restored.status_code == 200
+    assert (restored.get_json()['status'], restored.get_json()['labels']) == ('Done', ['l0'])
+    # Restored tasks go to the bottom of the Done column
+    assert [task['id'] for task in client.get('/tasks').get_json()] == [ids[-1], ids[0]]
+    assert client.post(f'/tasks/archive/{ids[0]}/restore').status_code == 404
+    assert [task['id'] for task in client.get('/tasks/archive').get_json()['tasks']] == [ids[2], ids[1]]
+
+
+def test_archive_keeps_recent_and_unfinished_tasks(client, db_path):
+    _archived_board(client, db_path, 1)
+    client.post('/tasks', json={'title': 'open'})
+    assert client.post('/admin/archive', json={'older_than_days': 10 ** 6}).get_json()['archived'] == 0
+    assert client.post('/admin/archive', json={}).get_json()['archived'] == 1
+    assert len(client.get('/tasks').get_json()) == 2
+
+
+@pytest.mark.parametrize('days', [-1, 10 ** 12, 1e300, 'x', True, None])
+def test_invalid_ages_get_400(client, days):
+    response = client.post('/admin/archive', json={'older_than_days': days})
+    assert response.status_code == 400
+
+
+def test_archive_of_a_missing_board(client):
+    assert client.post('/boards/99/admin/archive', json={}).status_code == 404
+    assert client.get('/boards/99/tasks/archive').status_code == 404
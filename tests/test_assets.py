@@ -0,0 +1,102 @@
+"""
+Tests for the asset pipeline's minifiers and the rendered board page.
+"""
+
+import json
+import re
+
+from app.assets import minify_js
+
+
+def test_minify_js_strips_indentation_blank_lines_and_comments():
+    source = "function f() {\n    // say hi\n\n    return 'hi';   \n}\n"
+    assert minify_js(source) == "function f() {\nreturn 'hi';\n}"
+
+
+def test_minify_js_keeps_multiline_template_literals():
+    source = (
+        "const page = `<ul>\n"
+        "    // not a comment\n"
+        "\n"
+        "    <li>${items.map(item => `\n"
+        "        ${item}   \n"
+        "    `).join('')}</li>   \n"
+        "</ul>`;\n"
+        "    // a comment\n"
+        "    const done = true;\n"
+    )
+    assert minify_js(source) == (
+        "const page = `<ul>\n"
+        "    // not a comment\n"
+        "\n"
+        "    <li>${items.map(item => `\n"
+        "        ${item}   \n"
+        "    `).join('')}</li>   \n"
+        "</ul>`;\n"
+        "const done = true;"
+    )
+
+
+def test_minify_js_is_not_fooled_by_quotes_in_strings_comments_and_regexes():
+    source = (
+        "    const tick = '`';\n"
+        "    // it's a `comment`\n"
+        "    const trimmed = key.replace(/`+$/, '');\n"
+        "    const joined = \"a\\\n"
+        "    b\";\n"
+        "    const last = 1;\n"
+    )
+    assert minify_js(source) == (
+        "const tick = '`';\n"
+        "const trimmed = key.replace(/`+$/, '');\n"
+        "const joined = \"a\\\n"
+        "    b\";\n"
+        "const last = 1;"
+    )
+
+
+def _bootstrap(response):
+    html = response.get_data(as_text=True)
+    return json.loads(re.search(r'<script id="board-data" type="application/json">(.*?)</script>', html, re.S).group(1))
+
+
+def test_board_page_bootstrap_cannot_close_its_script_element(client):
+    title = '</script><script>alert(1)</script><!--'
+    client.post('/tasks', json={'title': title})
+    response = client.get('/kanban')
+    assert title not in response.get_data(as_text=True)
+    data = _bootstrap(response)
+    assert [task['title'] for task in data['tasks']] == [title]
+    assert (data['board_id'], data['version']) == (1, client.get('/boards/1').get_json()['version'])
+
+
+def test_board_page_is_cached_until_the_board_changes(app, client):
+    client.post('/tasks', json={'title': 'a'})
+    with app.test_request_context('/kanban'):
+        pipeline, task_dao = app.extensions['assets'], app.extensions['task_dao']
+        page = pipeline.board_page(task_dao, 1)
+        assert pipeline.board_page(task_dao, 1) is page
+        task_dao.create_task('b')
+        assert pipeline.board_page(task_dao, 1) is not page
+
+    response = client.get('/kanban')
+    assert [task['title'] for task in _bootstrap(response)['tasks']] == ['a', 'b']
+    etag = response.headers['ETag']
+    assert client.get('/kanban').headers['ETag'] == etag
+    client.post('/tasks', json={'title': 'c'})
+    response = client.get('/kanban')
+    assert response.headers['ETag'] != etag
+    assert [task['title'] for task in _bootstrap(response)['tasks']] == ['a', 'b', 'c']
+
+
+def test_board_page_revalidates_by_etag(client):
+    response = client.get('/kanban')
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+    response = client.get('/kanban', headers={'If-None-Match': etag})
+    assert (response.status_code, response.headers['ETag'], response.data) == (304, etag, b'')
+
+    client.post('/tasks', json={'title': 'a'})
+    response = client.get('/kanban', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [task['title'] for task in _bootstrap(response)['tasks']] == ['a']
@@ -0,0 +1,65 @@
+"""
+Tests for the compressed bitmaps behind label filters.
+"""
+
+import random
+
+from app.bitmap import ARRAY_LIMIT, Bitmap
+
+
+def test_add_discard_and_membership():
+    bitmap = Bitmap()
+    for value in (5, 1, 70000, 5):
+        bitmap.add(value)
+    assert list(bitmap) == [1, 5, 70000]
+    assert 70000 in bitmap and 2 not in bitmap
+    assert len(bitmap) == 3
+
+    bitmap.discard(1)
+    bitmap.discard(2)
+    bitmap.discard(70000)
+    assert list(bitmap) == [5]
+    # Emptied containers are dropped
+    assert bitmap.stats()['arrays'] == 1
+
+    bitmap.discard(5)
+    assert not bitmap
+    assert bitmap == Bitmap()
+
+
+def test_containers_switch_at_array_limit():
+    bitmap = Bitmap.from_sorted(list(range(ARRAY_LIMIT)))
+    assert (bitmap.stats()['arrays'], bitmap.stats()['bitsets']) == (1, 0)
+
+    bitmap.add(ARRAY_LIMIT)
+    assert (bitmap.stats()['arrays'], bitmap.stats()['bitsets']) == (0, 1)
+    assert bitmap == Bitmap(range(ARRAY_LIMIT + 1))
+
+    bitmap.discard(0)
+    assert (bitmap.stats()['arrays'], bitmap.stats()['bitsets']) == (1, 0)
+    assert list(bitmap) == list(range(1, ARRAY_LIMIT + 1))
+
+
+def test_and_or_match_sets():
+    rng = random.Random(42)
+    # Dense and sparse containers, some keys shared and some not
+    sets = [
+        set(rng.sample(range(3 * 65536), 20000)),
+        set(rng.sample(range(65536, 2 * 65536), 3000)),
+        set(range(0, 4 * 65536, 7)),
+    ]
+    bitmaps = [Bitmap(values) for values in sets]
+
+    for first, first_set in zip(bitmaps, sets):
+        for second, second_set in zip(bitmaps, sets):
+            assert list(first & second) == sorted(first_set & second_set)
+            assert list(first | second) == sorted(first_set | second_set)
+    assert list(Bitmap.intersection(bitmaps)) == sorted(set.intersection(*sets))
+    assert list(Bitmap.union(bitmaps)) == sorted(set.union(*sets))
+    assert not Bitmap.intersection([])
+
+    # Results are canonical and independent of their operands
+    assert bitmaps[0] & bitmaps[2] == Bitmap(sets[0] & sets[2])
+    result = bitmaps[1] | Bitmap()
+    result.add(1)
+    assert 1 not in bitmaps[1]
@@ -0,0 +1,49 @@
+"""
+Tests for board scoping: a task is only reachable through its own board.
+"""
+
+
+def _dict(task):
+    return task if isinstance(task, dict) else task.to_dict()
+
+
+def test_dao_methods_only_see_the_given_board(task_dao):
+    board_id = task_dao.create_board('other')['id']
+    task_id = _dict(task_dao.create_task('theirs', board_id=board_id, labels=['x']))['id']
+    mine = _dict(task_dao.create_task('mine'))['id']
+
+    assert task_dao.get_task(task_id) is None
+    assert [_dict(task)['id'] for task in task_dao.get_all_tasks()] == [mine]
+    assert task_dao.update_task(task_id, title='changed') is None
+    assert task_dao.update_task(task_id, expected_version=1, title='changed') is None
+    assert task_dao.move_task(task_id, status='Done') is None
+    assert not task_dao.delete_task(task_id)
+
+    task = _dict(task_dao.get_task(task_id, board_id))
+    assert (task['title'], task['status'], task['labels'], task['version']) == ('theirs', 'To Do', ['x'], 1)
+
+
+def test_routes_only_reach_tasks_of_their_board(client):
+    assert client.post('/boards', json={'name': 'other'}).get_json()['id'] == 2
+    task_id = client.post('/boards/2/tasks', json={'title': 'theirs'}).get_json()['id']
+
+    # /boards/1/... redirects to the unscoped route, which serves the default board
+    for prefix in ('', '/boards/1'):
+        url = f'{prefix}/tasks/{task_id}'
+        assert client.get(url, follow_redirects=True).status_code == 404
+        assert client.put(url, json={'title': 'changed'}, follow_redirects=True).status_code == 404
+        assert client.post(f'{url}/move', json={'status': 'Done'}, follow_redirects=True).status_code == 404
+        assert client.delete(url, follow_redirects=True).status_code == 404
+        assert client.get(f'{prefix}/tasks', follow_redirects=True).get_json() == []
+
+    # A board_id in the body cannot move the task to another board either
+    response = client.put(f'/boards/2/tasks/{task_id}', json={'title': 'kept', 'board_id': 1})
+    assert response.status_code == 200
+    assert client.get('/tasks').get_json() == []
+    task = client.get(f'/boards/2/tasks/{task_id}').get_json()
+    assert (task['title'], task['status'], task['board_id']) == ('kept', 'To Do', 2)
+
+
+def test_missing_boards_get_404(client):
+    assert client.get('/boards/99/tasks').status_code == 404
+    assert client.post('/boards/99/tasks', json={'title': 'a'}).status_code == 404
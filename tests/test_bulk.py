@@ -0,0 +1,76 @@
+"""
+Tests for bulk import and export.
+"""
+
+import io
+
+from app import bulk
+from app.dao.task_dao import TaskDAO
+
+
+def _id(task):
+    return task['id'] if isinstance(task, dict) else task.id
+
+
+def _board(task_dao, board_id=1):
+    return [(task['title'], task['status'], task['labels']) for task in task_dao.get_all_tasks(board_id)]
+
+
+def test_export_import_keeps_labels_and_card_order(task_dao):
+    first = task_dao.create_task('first', labels=['bug', 'ui'])
+    task_dao.create_task('second')
+    third = task_dao.create_task('third', labels=['ui'])
+    task_dao.create_task('done', status='Done', labels=['release'])
+    task_dao.move_task(_id(third), before_id=_id(first))
+
+    for fmt in bulk.FORMATS:
+        board_id = task_dao.create_board(fmt)['id']
+        data = ''.join(bulk.export_tasks(task_dao, fmt))
+        summary = bulk.import_tasks(task_dao, bulk.iter_records(io.StringIO(data), fmt), chunk_size=2,
+                                    board_id=board_id)
+        assert summary == {"imported": 4, "next_offset": 4}
+        assert _board(task_dao, board_id) == _board(task_dao)
+
+
+def test_sqlite_import_keeps_exported_ranks(sqlite_dao):
+    a = sqlite_dao.create_task('a', labels=['x'])
+    sqlite_dao.create_task('b')
+    c = sqlite_dao.create_task('c', labels=['x', 'y'])
+    sqlite_dao.move_task(c['id'], before_id=a['id'])
+    data = ''.join(bulk.export_tasks(sqlite_dao, 'csv'))
+
+    board_id = sqlite_dao.create_board('copy')['id']
+    summary = bulk.import_tasks(sqlite_dao, bulk.iter_records(io.StringIO(data), 'csv'), chunk_size=1,
+                                board_id=board_id)
+    assert summary == {"imported": 3, "next_offset": 3}
+    assert _board(sqlite_dao, board_id) == _board(sqlite_dao)
+    assert [task['title'] for task in sqlite_dao.get_tasks_by_labels(['x'], board_id=board_id)] == ['c', 'a']
+
+    # Importing the same export again cannot reuse the ranks; the copies go to the bottom
+    bulk.import_tasks(sqlite_dao, bulk.iter_records(io.StringIO(data), 'csv'), board_id=board_id)
+    assert [task['title'] for task in sqlite_dao.get_all_tasks(board_id)] == ['c', 'a', 'b', 'a', 'b', 'c']
+
+
+def test_validate_record():
+    assert bulk.validate_record({"title": "t", "labels": "b,a,,b", "rank": "V"}) == (
+        "t", "", "To Do", "Medium", None, ["a", "b"], "V"
+    )
+    assert bulk.validate_record({"title": "t", "labels": ["x"], "rank": ""})[5:] == (["x"], None)
+    summary = bulk.import_tasks(TaskDAO(), [{"title": "ok"}, {"title": "bad", "rank": "a0"}])
+    assert summary["imported"] == 1
+    assert summary["error"].startswith("Record 2: Invalid rank key")
+
+
+def test_unreadable_bodies_get_400_with_a_resume_point(client):
+    oversized = 'title\nfirst\nsecond\n"' + 'x' * 200000 + '"\nlast\n'
+    response = client.post('/tasks/import?format=csv', data=oversized, content_type='text/csv')
+    assert response.status_code == 400
+    assert response.get_json()['next_offset'] == 2
+    assert response.get_json()['error'].startswith('Record 3: invalid CSV')
+
+    not_utf8 = '{"title": "third"}\n'.encode() + b'{"title": "\xff"}\n'
+    response = client.post('/tasks/import?format=ndjson', data=not_utf8, content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert response.get_json()['next_offset'] == 0
+    assert 'UTF-8' in response.get_json()['error']
+    assert [task['title'] for task in client.get('/tasks').get_json()] == ['first', 'second']
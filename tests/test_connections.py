@@ -0,0 +1,77 @@
+"""
+Tests for SQLite connection handling: the read-only pool, the writer thread and the board cache.
+"""
+
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.dao.database_factory import SQLiteTaskDAO
+
+
+def test_pooled_connections_are_read_only_and_reused(sqlite_dao):
+    sqlite_dao.create_task('a')
+    with sqlite_dao._read_connection() as conn:
+        assert conn.execute('PRAGMA query_only').fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO boards (name) VALUES ('x')")
+        # Even with query_only off, the file is opened read-only
+        conn.execute('PRAGMA query_only = OFF')
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            conn.execute("INSERT INTO boards (name) VALUES ('x')")
+        conn.execute('PRAGMA query_only = ON')
+    with sqlite_dao._read_connection() as again:
+        assert again is conn
+    assert [board['name'] for board in sqlite_dao.get_all_boards()] == ['Default']
+
+
+def test_read_only_connections_never_create_the_file(tmp_path):
+    dao = SQLiteTaskDAO(str(tmp_path / 'missing.sqlite'))
+    with pytest.raises(sqlite3.OperationalError):
+        dao._connect(read_only=True)
+    assert not (tmp_path / 'missing.sqlite').exists()
+
+
+def test_writes_run_on_one_thread_and_roll_back_on_error(sqlite_dao):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        names = set(pool.map(lambda _: sqlite_dao._write(lambda cursor: threading.current_thread().name), range(32)))
+        list(pool.map(lambda i: sqlite_dao.create_task(f'task {i}'), range(40)))
+    assert len(names) == 1 and names.pop().startswith('sqlite-writer')
+    assert len(sqlite_dao.get_all_tasks()) == 40
+
+    def failing(cursor):
+        cursor.execute("INSERT INTO boards (name) VALUES ('half-written')")
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        sqlite_dao._write(failing)
+    assert [board['name'] for board in sqlite_dao.get_all_boards()] == ['Default']
+
+
+def test_connections_from_a_parent_process_are_dropped(sqlite_dao):
+    sqlite_dao.create_task('a')
+    parent_writer = sqlite_dao._writer
+    with sqlite_dao._read_connection() as parent_conn:
+        pass
+
+    # As if this were a forked worker: nothing opened before the fork is reused
+    sqlite_dao._pid = -1
+    with sqlite_dao._read_connection() as conn:
+        assert conn is not parent_conn
+    sqlite_dao.create_task('b')
+    assert sqlite_dao._writer is not parent_writer
+    assert [task['title'] for task in sqlite_dao.get_all_tasks()] == ['a', 'b']
+    parent_writer.shutdown()
+
+
+def test_board_reads_cannot_change_the_cache(sqlite_dao):
+    sqlite_dao.create_task('a', labels=['x'])
+    for _ in range(2):
+        tasks = sqlite_dao.get_all_tasks()
+        tasks[0]['title'] = 'changed'
+        tasks[0]['labels'].append('y')
+        tasks.append({})
+    assert [(task['title'], task['labels']) for task in sqlite_dao.get_all_tasks()] == [('a', ['x'])]
+    assert sqlite_dao.get_task_changes()['changed'][0]['labels'] == ['x']
@@ -0,0 +1,146 @@
+"""
+Tests for due date normalization, the due_date migration and the due date scheduler.
+"""
+
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.dao.database_factory import DatabaseFactory
+from app.due_dates import due_instant, normalize_due_date, scan_bounds
+from app.scheduler import DUE_SOON, OVERDUE, DueDateScheduler
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-06-30', '2024-06-30'),
+    (' 30/06/2024 ', '2024-06-30'),
+    ('2024/06/30', '2024-06-30'),
+    ('30.06.2024', '2024-06-30'),
+    ('Jun 30, 2024', '2024-06-30'),
+    ('30 June 2024', '2024-06-30'),
+    ('2024-06-30T12:30:00+02:00', '2024-06-30T10:30:00Z'),
+    ('2024-06-30T12:30:00', '2024-06-30T12:30:00Z'),
+    (date(2024, 6, 30), '2024-06-30'),
+    (datetime(2024, 6, 30, 23, 0, tzinfo=timezone(timedelta(hours=-2))), '2024-07-01T01:00:00Z'),
+    (None, None),
+    ('  ', None),
+])
+def test_normalize_due_date(value, expected):
+    assert normalize_due_date(value) == expected
+
+
+@pytest.mark.parametrize('value', ['next week', '2024-02-30', '31/31/2024'])
+def test_unparseable_due_dates_are_rejected(value):
+    with pytest.raises(ValueError):
+        normalize_due_date(value)
+
+
+def test_due_instant_and_scan_bounds():
+    # A plain date is due until the end of the day
+    assert due_instant('2024-06-30') == datetime(2024, 7, 1, tzinfo=timezone.utc)
+    assert due_instant('2024-06-30T10:30:00Z') == datetime(2024, 6, 30, 10, 30, tzinfo=timezone.utc)
+    assert due_instant('next week') is None
+    assert due_instant(None) is None
+
+    start = datetime(2024, 6, 30, 23, 0, tzinfo=timezone.utc)
+    lower, upper = scan_bounds(start, start + timedelta(hours=2))
+    assert (lower, upper) == ('2024-06-29', '2024-07-02')
+    for due_date in ('2024-06-29', '2024-06-30T23:30:00Z', '2024-07-01'):
+        assert lower <= due_date < upper
+
+
+def test_migration_normalizes_stored_due_dates(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.executemany(
+        'INSERT INTO tasks (board_id, title, status, priority, due_date) VALUES (1, ?, ?, ?, ?)',
+        [('a', 'To Do', 'Medium', '30/06/2024'), ('b', 'To Do', 'Medium', 'someday'),
+         ('c', 'To Do', 'Medium', '2024-07-01')]
+    )
+    conn.execute('PRAGMA user_version = 0')
+    DatabaseFactory._initialize_sqlite_schema(conn)
+    due_dates = [row[0] for row in conn.execute('SELECT due_date FROM tasks ORDER BY id')]
+    assert due_dates == ['2024-06-30', 'someday', '2024-07-01']
+    assert conn.execute('PRAGMA user_version').fetchone()[0] >= 1
+    conn.close()
+
+
+def test_api_rejects_free_form_due_dates(client):
+    assert client.post('/tasks', json={'title': 'a', 'due_date': 'next week'}).status_code == 400
+    task = client.post('/tasks', json={'title': 'a', 'due_date': '30/06/2024'}).get_json()
+    assert task['due_date'] == '2024-06-30'
+    assert client.put(f"/tasks/{task['id']}", json={'due_date': 'soon'}).status_code == 400
+
+
+NOW = datetime(2024, 6, 30, 12, 0, tzinfo=timezone.utc)
+
+
+def _at(seconds):
+    return NOW + timedelta(seconds=seconds)
+
+
+def _due(seconds):
+    return _at(seconds).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@pytest.fixture
+def scheduler(db_path):
+    scheduler = DueDateScheduler(db_path, reminder_lead=timedelta(seconds=60), refresh_interval=60, lease_ttl=30)
+    events = []
+    scheduler.subscribe(events.append)
+    scheduler.events = events
+    yield scheduler
+    scheduler.stop()
+
+
+def test_scheduler_fires_reminders_and_overdue_once(scheduler, sqlite_dao):
+    task_id = sqlite_dao.create_task('a', due_date=_due(90))['id']
+    done_id = sqlite_dao.create_task('b', due_date=_due(90))['id']
+    sqlite_dao.create_task('later', due_date=_due(3600))
+
+    scheduler.tick(NOW)
+    sqlite_dao.move_task(done_id, status='Done')
+    for seconds in (31, 40, 91, 100):
+        scheduler.tick(_at(seconds))
+    scheduler.stop()
+
+    assert [(event['type'], event['task_id']) for event in scheduler.events] == [
+        (DUE_SOON, task_id), (OVERDUE, task_id)
+    ]
+    assert scheduler.events[0]['due_date'] == _due(90)
+
+
+def test_only_the_lease_holder_fires_and_a_successor_resumes(scheduler, sqlite_dao, db_path):
+    task_id = sqlite_dao.create_task('a', due_date=_due(90))['id']
+    other = DueDateScheduler(db_path, reminder_lead=timedelta(seconds=60), refresh_interval=60, lease_ttl=30)
+    other.owner = 'other-worker'
+    other_events = []
+    other.subscribe(other_events.append)
+
+    scheduler.tick(NOW)
+    assert other.tick(NOW) == other.lease_ttl / 2
+    scheduler.tick(_at(31))
+    # The first leader stops after the reminder; the next one only sends what is left
+    scheduler.stop()
+    other.tick(_at(95))
+    other.stop()
+
+    assert [event['type'] for event in scheduler.events] == [DUE_SOON]
+    assert [(event['type'], event['task_id']) for event in other_events] == [(OVERDUE, task_id)]
+
+
+def test_slow_listeners_do_not_hold_up_the_scheduler(scheduler, sqlite_dao):
+    sqlite_dao.create_task('a', due_date=_due(90))
+    release = threading.Event()
+    scheduler.subscribe(lambda event: release.wait(5))
+
+    scheduler.tick(NOW)
+    started = datetime.now()
+    scheduler.tick(_at(31))
+    scheduler.tick(_at(91))
+    assert (datetime.now() - started).total_seconds() < 1
+
+    release.set()
+    scheduler.stop()
+    assert [event['type'] for event in scheduler.events] == [DUE_SOON, OVERDUE]
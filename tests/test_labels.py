@@ -0,0 +1,37 @@
+"""
+Tests for label filters on GET /tasks.
+"""
+
+
+def _titles(response):
+    assert response.status_code == 200
+    return sorted(task['title'] for task in response.get_json())
+
+
+def test_filter_by_labels(client):
+    for title, labels in (('a', ['bug', 'ui']), ('b', ['bug']), ('c', ['ui']), ('d', [])):
+        assert client.post('/tasks', json={'title': title, 'labels': labels}).status_code == 201
+
+    assert _titles(client.get('/tasks?labels=bug,ui')) == ['a']
+    assert _titles(client.get('/tasks?labels=bug,ui&mode=and')) == ['a']
+    assert _titles(client.get('/tasks?labels=bug,ui&mode=or')) == ['a', 'b', 'c']
+    assert _titles(client.get('/tasks?labels=missing&mode=or')) == []
+
+
+def test_filters_follow_label_changes(client):
+    task_id = client.post('/tasks', json={'title': 'a', 'labels': ['bug']}).get_json()['id']
+    assert _titles(client.get('/tasks?labels=bug')) == ['a']
+
+    # The cached bitmaps are updated, not served stale
+    assert client.put(f'/tasks/{task_id}', json={'labels': ['ui']}).status_code == 200
+    assert _titles(client.get('/tasks?labels=bug')) == []
+    assert _titles(client.get('/tasks?labels=ui')) == ['a']
+
+    assert client.delete(f'/tasks/{task_id}').status_code == 200
+    assert _titles(client.get('/tasks?labels=ui')) == []
+
+
+def test_invalid_filters_are_rejected(client):
+    assert client.get('/tasks?labels=,').status_code == 400
+    assert client.get('/tasks?labels=bug&mode=xor').status_code == 400
+    assert client.get('/boards/99/tasks?labels=bug').status_code == 404
@@ -0,0 +1,74 @@
+"""
+Tests for dependency links, their cached closures and cycle detection.
+"""
+
+from datetime import timedelta
+
+from app.dao.links import BLOCKED_BY, BLOCKS
+
+
+def _chain(dao, length):
+    """Create tasks that each block the next; returns their IDs."""
+    ids = [dao.create_task(f't{i}')['id'] for i in range(length)]
+    for blocker_id, blocked_id in zip(ids, ids[1:]):
+        assert dao.add_link(blocker_id, blocked_id)
+    return ids
+
+
+def _cached(dao, direction, task_id, board_id=1):
+    with dao._read_connection() as conn:
+        version = conn.execute('SELECT link_version FROM boards WHERE id = ?', (board_id,)).fetchone()[0]
+    return dao._closures.get(board_id, direction, task_id, version)
+
+
+def test_link_changes_invalidate_affected_closures(sqlite_dao):
+    a, b, c = _chain(sqlite_dao, 3)
+    other, unrelated = _chain(sqlite_dao, 2)
+    assert sqlite_dao.get_task_graph(a)['blocks'] == [b, c]
+    assert sqlite_dao.get_task_graph(other)['blocks'] == [unrelated]
+
+    d = sqlite_dao.create_task('d')['id']
+    assert sqlite_dao.add_link(c, d)
+    # The change reaches a's closure but not the unrelated chain's
+    assert _cached(sqlite_dao, BLOCKS, a) is None
+    assert _cached(sqlite_dao, BLOCKS, other) is not None
+    assert sqlite_dao.get_task_graph(a)['blocks'] == [b, c, d]
+
+    assert sqlite_dao.remove_link(b, c)
+    assert sqlite_dao.get_task_graph(a)['blocks'] == [b]
+    assert sqlite_dao.get_task_graph(d)['blocked_by'] == [c]
+
+
+def test_archiving_removes_links_and_invalidates_closures(sqlite_dao):
+    a, b, c = _chain(sqlite_dao, 3)
+    assert sqlite_dao.get_task_graph(a)['blocks'] == [b, c]
+    assert sqlite_dao.get_task_graph(c)['blocked_by'] == [a, b]
+
+    sqlite_dao.move_task(b, status='Done')
+    assert sqlite_dao.archive_done_tasks(timedelta(days=-1)) == 1
+    assert _cached(sqlite_dao, BLOCKS, a) is None
+    assert _cached(sqlite_dao, BLOCKED_BY, c) is None
+    assert sqlite_dao.get_task_graph(a) == {"task_id": a, "blocks": [], "blocked_by": [], "links": []}
+    assert sqlite_dao.get_task_graph(c)['blocked_by'] == []
+    with sqlite_dao._read_connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM task_links').fetchone()[0] == 0
+
+    # The restored task comes back without its old links
+    assert sqlite_dao.restore_task(b)['id'] == b
+    assert sqlite_dao.get_task_graph(b)['links'] == []
+    assert sqlite_dao.add_link(b, a)
+
+
+def test_cycles_are_refused_with_409(client):
+    ids = [client.post('/tasks', json={'title': f't{i}'}).get_json()['id'] for i in range(3)]
+    for blocker_id, blocked_id in zip(ids, ids[1:]):
+        assert client.post(f'/tasks/{blocker_id}/links', json={'blocks': blocked_id}).status_code == 201
+
+    response = client.post(f'/tasks/{ids[-1]}/links', json={'blocks': ids[0]})
+    assert response.status_code == 409
+    assert client.post(f'/tasks/{ids[0]}/links', json={'blocks': ids[0]}).status_code == 400
+    assert client.get(f'/tasks/{ids[0]}/graph').get_json()['blocks'] == ids[1:]
+
+    # Once the chain is broken the link is allowed
+    assert client.delete(f'/tasks/{ids[1]}/links/{ids[2]}').status_code == 200
+    assert client.post(f'/tasks/{ids[-1]}/links', json={'blocks': ids[0]}).status_code == 201
@@ -0,0 +1,76 @@
+"""
+Tests for the responses the board UI relies on to confirm or roll back its optimistic edits.
+
+The UI replaces its copy of a task with the body of a 2xx answer, shows
+`current` from a 412, drops the task on a 404 and drops only its own change
+on any other error; 503s are covered in test_admission.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def tasks(client):
+    return [client.post('/tasks', json={'title': title}).get_json() for title in 'ab']
+
+
+def _put(client, task_id, body, version=None):
+    headers = {'If-Match': f'"{version}"'} if version is not None else {}
+    return client.put(f'/tasks/{task_id}', json=body, headers=headers)
+
+
+def _move(client, task_id, body, version=None):
+    headers = {'If-Match': f'"{version}"'} if version is not None else {}
+    return client.post(f'/tasks/{task_id}/move', json=body, headers=headers)
+
+
+def test_confirmed_changes_return_the_whole_task(client, tasks):
+    for response in (_put(client, tasks[0]['id'], {'title': 'x'}, 1),
+                     _move(client, tasks[0]['id'], {'status': 'Done'})):
+        assert response.status_code == 200
+        task = response.get_json()
+        assert {'id', 'title', 'status', 'rank', 'labels', 'version'} <= set(task)
+        assert response.headers['ETag'] == f'"{task["version"]}"'
+    assert (task['title'], task['status'], task['version']) == ('x', 'Done', 3)
+
+
+@pytest.mark.parametrize('send', [_put, _move])
+def test_stale_changes_get_412_with_the_current_task(client, tasks, send):
+    task_id = tasks[0]['id']
+    current = _put(client, task_id, {'title': 'theirs'}).get_json()
+    body = {'title': 'mine'} if send is _put else {'status': 'Done'}
+
+    response = send(client, task_id, body, version=1)
+    # 412, not 409: the UI only shows the other version for 412
+    assert response.status_code == 412
+    assert response.get_json()['current'] == current
+    assert response.headers['ETag'] == '"2"'
+    assert client.get(f'/tasks/{task_id}').get_json() == current
+
+
+@pytest.mark.parametrize('send, body', [
+    (_put, {'status': 'Bogus'}),
+    (_put, {'rank': 'V'}),
+    (_put, {'due_date': 'someday'}),
+    (_move, {'status': 'Bogus'}),
+    (_move, {'before': 99}),
+    # Task 2 is in To Do, not Done
+    (_move, {'status': 'Done', 'after': 2}),
+])
+def test_rejected_changes_get_400_and_leave_the_task_alone(client, tasks, send, body):
+    task_id = tasks[0]['id']
+    response = send(client, task_id, body, version=1)
+    assert response.status_code == 400
+    assert isinstance(response.get_json()['error'], str)
+    assert client.get(f'/tasks/{task_id}').get_json() == tasks[0]
+    assert [task['id'] for task in client.get('/tasks').get_json()] == [task['id'] for task in tasks]
+
+
+@pytest.mark.parametrize('send', [_put, _move])
+def test_changes_to_deleted_tasks_get_404(client, tasks, send):
+    client.delete(f"/tasks/{tasks[0]['id']}")
+    body = {'title': 'x'} if send is _put else {'status': 'Done'}
+    for version in (None, 1):
+        response = send(client, tasks[0]['id'], body, version)
+        assert response.status_code == 404
+        assert 'error' in response.get_json()
@@ -0,0 +1,67 @@
+"""
+Tests for request profiling tokens and the profile endpoints.
+"""
+
+import pytest
+
+from app import create_app, profiling
+
+
+@pytest.fixture
+def profiled_app(db_path, tmp_path):
+    return create_app({'SECRET_KEY': 'not-the-default', 'PROFILE_DIR': str(tmp_path / 'profiles')})
+
+
+def test_token_profiles_a_request_and_unlocks_the_profiles(profiled_app):
+    client = profiled_app.test_client()
+    token = profiling.make_token(profiled_app)
+    headers = {profiling.PROFILE_HEADER: token}
+
+    assert 'X-Profile-Id' not in client.get('/boards').headers
+    response = client.get('/boards', headers=headers)
+    profile_id = response.headers['X-Profile-Id']
+    # The profile is written once the response has been sent
+    response.close()
+
+    assert client.get('/admin/profiles').status_code == 401
+    assert client.get('/admin/profiles', headers={profiling.PROFILE_HEADER: 'forged'}).status_code == 401
+    response = client.get('/admin/profiles', headers=headers)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    names = [profile['name'] for profile in response.get_json()]
+    assert f'{profile_id}.collapsed' in names
+
+    assert client.get(f'/admin/profiles/{profile_id}.collapsed').status_code == 401
+    assert client.get(f'/admin/profiles/{profile_id}.collapsed', headers=headers).status_code == 200
+
+
+def test_default_secret_key_disables_tokens(app):
+    assert app.secret_key == profiling.DEFAULT_SECRET_KEY
+    with pytest.raises(RuntimeError):
+        profiling.make_token(app)
+
+    # A token signed with the well-known default key is not accepted
+    forged = profiling._serializer(app).dumps('profile')
+    client = app.test_client()
+    assert 'X-Profile-Id' not in client.get('/boards', headers={profiling.PROFILE_HEADER: forged}).headers
+    assert client.get('/admin/profiles', headers={profiling.PROFILE_HEADER: forged}).status_code == 403
+    assert client.get('/admin/profiles/x.pstats', headers={profiling.PROFILE_HEADER: forged}).status_code == 403
+
+
+@pytest.mark.parametrize('method, path', [
+    ('GET', '/admin/stats/statements'),
+    ('GET', '/admin/stats/queries'),
+    ('DELETE', '/admin/stats/queries'),
+    ('GET', '/admin/stats/admission'),
+    ('DELETE', '/admin/stats/admission'),
+])
+def test_admin_stats_need_a_token(profiled_app, app, method, path):
+    client = profiled_app.test_client()
+    token = profiling.make_token(profiled_app)
+    assert client.open(path, method=method).status_code == 401
+    response = client.open(path, method=method, headers={profiling.PROFILE_HEADER: token})
+    assert response.status_code in (200, 204)
+    assert 'X-Profile-Id' not in response.headers
+
+    # Without a SECRET_KEY of one's own they are not available at all
+    assert app.test_client().open(path, method=method).status_code == 403
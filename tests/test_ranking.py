@@ -0,0 +1,115 @@
+"""
+Tests for fractional rank keys, column rebalancing and moving cards.
+"""
+
+import random
+
+import pytest
+
+from app import ranking
+
+
+def test_keys_between_sort_strictly_between_bounds():
+    for lower, upper in [(None, None), (None, 'V'), ('V', None), ('V', 'V001'), ('1', '2'), ('Uzzz', 'V')]:
+        keys = ranking.keys_between(lower, upper, 5)
+        assert keys == sorted(keys) and len(set(keys)) == 5
+        assert lower is None or lower < keys[0]
+        assert upper is None or keys[-1] < upper
+        for key in keys:
+            ranking.validate_key(key)
+
+
+def test_appends_and_prepends_stay_short():
+    keys = ['V']
+    for _ in range(1000):
+        keys.append(ranking.key_between(keys[-1], None))
+        keys.insert(0, ranking.key_between(None, keys[0]))
+    assert keys == sorted(keys)
+    assert max(len(key) for key in keys) <= ranking.OPEN_LENGTH
+
+
+def test_random_inserts_keep_order():
+    rng = random.Random(7)
+    keys = ranking.keys_between(None, None, 3)
+    for _ in range(500):
+        position = rng.randrange(len(keys) + 1)
+        lower = keys[position - 1] if position else None
+        upper = keys[position] if position < len(keys) else None
+        keys.insert(position, ranking.key_between(lower, upper))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize('key', ['', 'V0', 'V-', 'ä'])
+def test_validate_key_rejects_non_canonical_keys(key):
+    with pytest.raises(ValueError):
+        ranking.validate_key(key)
+
+
+def test_keys_between_rejects_unordered_bounds():
+    with pytest.raises(ValueError):
+        ranking.keys_between('W', 'V', 1)
+
+
+def test_rebalance_ranks_keeps_order_and_shortens_keys(sqlite_dao):
+    tasks = [sqlite_dao.create_task(f'task {i}') for i in range(4)]
+    # Inserting right after the same card again and again grows the keys there,
+    # though not past REBALANCE_LENGTH, which would rebalance in the background
+    for i in range(30):
+        sqlite_dao.move_task(tasks[2 + i % 2]['id'], after_id=tasks[0]['id'])
+    before = sqlite_dao.get_all_tasks()
+    assert ranking.OPEN_LENGTH < max(len(task['rank']) for task in before) <= ranking.REBALANCE_LENGTH
+
+    assert sqlite_dao.rebalance_ranks() == 1
+    after = sqlite_dao.get_all_tasks()
+    assert [task['id'] for task in after] == [task['id'] for task in before]
+    assert max(len(task['rank']) for task in after) == 1
+
+
+def _titles(client, status='To Do'):
+    return [task['title'] for task in client.get('/tasks').get_json() if task['status'] == status]
+
+
+def test_move_route(client):
+    ids = [client.post('/tasks', json={'title': title}).get_json()['id'] for title in 'abc']
+    response = client.post(f'/tasks/{ids[2]}/move', json={'before': ids[0]})
+    assert response.status_code == 200
+    assert _titles(client) == ['c', 'a', 'b']
+
+    response = client.post(f'/tasks/{ids[0]}/move', json={'status': 'Done'})
+    assert response.get_json()['status'] == 'Done'
+    assert _titles(client) == ['c', 'b'] and _titles(client, 'Done') == ['a']
+
+
+@pytest.mark.parametrize('body', [
+    {'status': 'Bogus'},
+    {'before': [1]},
+    {'after': '2'},
+    {'before': True},
+    {'before': 2, 'after': 2},
+])
+def test_move_route_rejects_invalid_input(client, body):
+    for title in 'ab':
+        client.post('/tasks', json={'title': title})
+    response = client.post('/tasks/1/move', json=body)
+    assert response.status_code == 400
+    assert client.get('/tasks/1').get_json()['status'] == 'To Do'
+
+
+def test_put_with_an_invalid_status_keeps_the_card_in_place(client):
+    ids = [client.post('/tasks', json={'title': title}).get_json()['id'] for title in 'ab']
+    before = client.get(f'/tasks/{ids[0]}').get_json()
+    response = client.put(f'/tasks/{ids[0]}', json={'status': 'Bogus'})
+    assert response.status_code == 400
+    after = client.get(f'/tasks/{ids[0]}').get_json()
+    assert (after['status'], after['rank'], after['version']) == (before['status'], before['rank'], 1)
+    assert _titles(client) == ['a', 'b']
+
+
+@pytest.mark.parametrize('status', ['Bogus', 3, ['Done']])
+def test_move_rejects_invalid_statuses(task_dao, status):
+    task = task_dao.create_task('a')
+    task_id = task['id'] if isinstance(task, dict) else task.id
+    with pytest.raises(ValueError):
+        task_dao.move_task(task_id, status=status)
+    stored = task_dao.get_task(task_id)
+    assert (stored if isinstance(stored, dict) else stored.to_dict())['status'] == 'To Do'
@@ -0,0 +1,87 @@
+"""
+Tests for response format negotiation and compression.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from app import serializers
+
+
+@pytest.fixture
+def board(client):
+    """A board whose task list is well over the default compression threshold."""
+    for i in range(20):
+        client.post('/tasks', json={'title': f'task {i}', 'description': 'something to do ' * 4})
+    return client.get('/tasks', headers={'Accept-Encoding': 'identity'}).data
+
+
+def test_msgpack_is_sent_to_clients_that_prefer_it(client, board):
+    msgpack = pytest.importorskip('msgpack')
+    response = client.get('/tasks', headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    assert 'Accept' in response.vary
+    assert msgpack.unpackb(response.data) == json.loads(board)
+
+    accept = {'Accept': 'application/json;q=0.5, application/x-msgpack'}
+    assert client.get('/tasks', headers=accept).mimetype == 'application/x-msgpack'
+    for accept in ('application/json', '*/*', 'text/html'):
+        response = client.get('/tasks', headers={'Accept': accept})
+        assert (response.mimetype, response.data) == ('application/json', board)
+
+
+def test_json_is_sent_without_msgpack(client, board, monkeypatch):
+    monkeypatch.setattr(serializers, 'msgpack', None)
+    response = client.get('/tasks', headers={'Accept': 'application/msgpack'})
+    assert (response.mimetype, response.data) == ('application/json', board)
+
+
+def test_brotli_is_preferred_over_gzip(client, board):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/tasks', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == board
+
+    response = client.get('/tasks', headers={'Accept-Encoding': 'gzip, br;q=0'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == board
+
+
+def test_gzip_is_used_without_brotli(client, board, monkeypatch):
+    monkeypatch.setattr(serializers, 'brotli', None)
+    response = client.get('/tasks', headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == board
+
+    response = client.get('/tasks', headers={'Accept-Encoding': 'br'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == board
+
+
+def test_only_bodies_over_the_threshold_are_compressed(app, client, board):
+    app.config['COMPRESS_MIN_SIZE'] = len(board) + 1
+    response = client.get('/tasks', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == board
+    # Whether or not it was compressed, the body depends on Accept-Encoding
+    assert 'Accept-Encoding' in response.vary
+
+    app.config['COMPRESS_MIN_SIZE'] = len(board)
+    response = client.get('/tasks', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_small_and_empty_responses_are_left_alone(client):
+    response = client.get('/tasks/99', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.status_code == 404
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+    task_id = client.post('/tasks', json={'title': 'a'}).get_json()['id']
+    etag = client.get(f'/tasks/{task_id}').headers['ETag']
+    response = client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304
+    assert 'Content-Encoding' not in response.headers
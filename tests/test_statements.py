@@ -0,0 +1,80 @@
+"""
+Tests for statement building and caching, and for the fields updates accept.
+"""
+
+import pytest
+
+from app.dao.statements import TASK_UPDATE_COLUMNS, StatementCache, canonical_fields
+
+
+def test_canonical_fields_order_and_reject():
+    assert canonical_fields(['due_date', 'title', 'status']) == ('title', 'status', 'due_date')
+    assert canonical_fields({}) == ()
+    with pytest.raises(ValueError, match='rank'):
+        canonical_fields(['title', 'rank'])
+    with pytest.raises(ValueError, match='id, version'):
+        canonical_fields(['version', 'id'])
+    assert canonical_fields(['rank', 'title'], TASK_UPDATE_COLUMNS) == ('title', 'rank')
+
+
+def test_statement_cache_hits_misses_and_eviction():
+    cache = StatementCache(maxsize=2)
+    built = []
+
+    def build(sql):
+        return lambda: built.append(sql) or sql
+
+    assert cache.get('a', build('A')) == 'A'
+    assert cache.get('a', build('other')) == 'A'
+    cache.get('b', build('B'))
+    cache.get('a', build('A'))
+    # 'b' is now the least recently used
+    cache.get('c', build('C'))
+    cache.get('b', build('B'))
+    assert built == ['A', 'B', 'C', 'B']
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 4, "hit_rate": 0.3333}
+
+
+def test_update_statement_is_shared_by_field_sets():
+    cache = StatementCache()
+    sql = cache.update_task(('title', 'status'))
+    assert sql == 'UPDATE tasks SET title = ?, status = ?, version = version + 1 WHERE id = ? AND board_id = ?'
+    assert cache.update_task(('title', 'status')) is sql
+    assert cache.update_task(('title', 'status'), compare_version=True).endswith('AND version = ?')
+    with pytest.raises(ValueError):
+        cache.update_task(('title', 'id = 1; --'))
+
+
+@pytest.mark.parametrize('fields', [
+    {'status': 'Bogus'},
+    {'status': ['To Do']},
+    {'priority': 'Urgent'},
+    {'rank': 'a0'},
+    {'version': 7},
+])
+def test_update_rejects_fields_and_values(task_dao, fields):
+    task = task_dao.create_task('a')
+    task_id = task['id'] if isinstance(task, dict) else task.id
+    with pytest.raises(ValueError):
+        task_dao.update_task(task_id, **fields)
+    stored = task_dao.get_task(task_id)
+    stored = stored if isinstance(stored, dict) else stored.to_dict()
+    assert (stored['status'], stored['priority'], stored['version']) == ('To Do', 'Medium', 1)
+
+
+def test_create_rejects_invalid_values(task_dao):
+    with pytest.raises(ValueError):
+        task_dao.create_task('a', status='Bogus')
+    with pytest.raises(ValueError):
+        task_dao.create_task('a', priority='Urgent')
+    assert task_dao.get_all_tasks() == []
+
+
+def test_invalid_values_get_400(client):
+    assert client.post('/tasks', json={'title': 'a', 'status': 'Bogus'}).status_code == 400
+    task_id = client.post('/tasks', json={'title': 'a'}).get_json()['id']
+    for body in ({'status': 'Bogus'}, {'priority': 'Urgent'}, {'status': 3}):
+        response = client.put(f'/tasks/{task_id}', json=body)
+        assert response.status_code == 400
+        assert 'Invalid' in response.get_json()['error']
+    assert client.get(f'/tasks/{task_id}').get_json()['status'] == 'To Do'
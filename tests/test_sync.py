@@ -0,0 +1,40 @@
+"""
+Tests for delta sync: changed tasks and tombstones after a board version.
+"""
+
+import sqlite3
+
+from app.dao.database_factory import DatabaseFactory, SQLiteTaskDAO
+
+
+def test_delta_returns_changes_and_deletions(sqlite_dao):
+    kept = sqlite_dao.create_task('kept')['id']
+    gone = sqlite_dao.create_task('gone')['id']
+    since = sqlite_dao.get_board(1)['version']
+
+    sqlite_dao.update_task(kept, title='renamed')
+    sqlite_dao.delete_task(gone)
+    changes = sqlite_dao.get_task_changes(1, since)
+    assert [task['title'] for task in changes['changed']] == ['renamed']
+    assert changes['deleted'] == [gone]
+    assert not changes['reset']
+
+    assert sqlite_dao.get_task_changes(1, changes['version'])['changed'] == []
+
+
+def test_tasks_from_before_delta_sync_are_backfilled(db_path):
+    dao = SQLiteTaskDAO(db_path)
+    ids = [dao.create_task(title)['id'] for title in ('a', 'b')]
+
+    # As stored before the changed_seq column existed
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute('UPDATE tasks SET changed_seq = NULL')
+    conn.execute('PRAGMA user_version = 2')
+    DatabaseFactory._initialize_sqlite_schema(conn)
+    conn.close()
+
+    dao = SQLiteTaskDAO(db_path)
+    version = dao.get_board(1)['version']
+    changes = dao.get_task_changes(1, version - 1)
+    assert sorted(task['id'] for task in changes['changed']) == ids
+    assert dao.get_task_changes(1, version)['changed'] == []
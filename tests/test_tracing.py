@@ -0,0 +1,72 @@
+"""
+Tests for SQLite query tracing.
+"""
+
+import logging
+import sqlite3
+
+import pytest
+
+from app.dao.tracing import _FULL_SCAN, QueryTracer, TracingConnection
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:', isolation_level=None, factory=TracingConnection)
+    conn.tracer = QueryTracer()
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, size INTEGER)')
+    conn.executemany('INSERT INTO items (name, size) VALUES (?, ?)', [('a', 1), ('b', 2), ('c', 2)])
+    conn.tracer.reset()
+    yield conn
+    conn.close()
+
+
+def _by_sql(tracer):
+    return {entry['sql']: entry for entry in tracer.stats()}
+
+
+def test_statements_are_counted_per_shape(conn):
+    conn.execute('SELECT * FROM items WHERE size = ?', (2,)).fetchall()
+    conn.execute('SELECT *\n    FROM items   WHERE size = ?', (1,)).fetchall()
+    conn.execute('UPDATE items SET size = 3 WHERE size = ?', (2,))
+
+    stats = _by_sql(conn.tracer)
+    select = stats['SELECT * FROM items WHERE size = ?']
+    assert (select['calls'], select['rows']) == (2, 3)
+    assert stats['UPDATE items SET size = 3 WHERE size = ?']['rows'] == 2
+    assert len(stats) == 2
+
+
+def test_full_scans_are_flagged(conn):
+    conn.execute('SELECT name FROM items WHERE size = ?', (2,)).fetchall()
+    conn.execute('SELECT name FROM items WHERE id = ?', (1,)).fetchall()
+    stats = _by_sql(conn.tracer)
+    assert stats['SELECT name FROM items WHERE size = ?']['full_scan']
+    assert not stats['SELECT name FROM items WHERE id = ?']['full_scan']
+
+    assert _FULL_SCAN.match('SCAN items')
+    assert _FULL_SCAN.match('SCAN TABLE items AS i')
+    assert not _FULL_SCAN.match('SCAN items USING INDEX idx_items_size')
+    assert not _FULL_SCAN.match('SEARCH items USING INTEGER PRIMARY KEY (rowid=?)')
+
+
+def test_reset_while_a_statement_is_running(conn):
+    cursor = conn.execute('SELECT name FROM items ORDER BY id')
+    cursor.fetchone()
+    conn.tracer.reset()
+    # The remaining fetches of the statement are not counted, and do not fail
+    assert [row[0] for row in cursor.fetchall()] == ['b', 'c']
+    assert conn.tracer.stats() == []
+
+    conn.execute('SELECT name FROM items').fetchall()
+    assert [entry['calls'] for entry in conn.tracer.stats()] == [1]
+
+
+def test_slow_statements_are_logged_once(conn, caplog):
+    conn.tracer.slow_query_ms = 1e-9
+    with caplog.at_level(logging.WARNING, logger='app.dao.tracing'):
+        cursor = conn.execute('SELECT name FROM items WHERE size = ?', (2,))
+        cursor.fetchall()
+    assert _by_sql(conn.tracer)['SELECT name FROM items WHERE size = ?']['slow_calls'] == 1
+    assert len(caplog.records) == 1
+    assert 'SCAN items' in caplog.records[0].getMessage()
@@ -0,0 +1,114 @@
+"""
+Tests for task versions: compare-and-set updates, ETags and conditional requests.
+"""
+
+import pytest
+
+from app.dao.errors import VersionConflictError
+
+
+def _dict(task):
+    return task if isinstance(task, dict) else task.to_dict()
+
+
+def test_create_starts_at_version_one(task_dao):
+    assert _dict(task_dao.create_task('a'))['version'] == 1
+
+
+def test_update_with_expected_version(task_dao):
+    task_id = _dict(task_dao.create_task('a'))['id']
+    updated = _dict(task_dao.update_task(task_id, expected_version=1, title='b'))
+    assert (updated['title'], updated['version']) == ('b', 2)
+
+    with pytest.raises(VersionConflictError) as conflict:
+        task_dao.update_task(task_id, expected_version=1, title='c')
+    assert (conflict.value.current['title'], conflict.value.current['version']) == ('b', 2)
+    assert _dict(task_dao.get_task(task_id))['title'] == 'b'
+
+    # Without an expected version the update always applies
+    assert _dict(task_dao.update_task(task_id, title='d'))['version'] == 3
+
+
+def test_missing_task_is_not_a_conflict(task_dao):
+    assert task_dao.update_task(99, expected_version=1, title='x') is None
+
+
+def test_move_and_label_changes_bump_the_version(task_dao):
+    first = _dict(task_dao.create_task('a'))
+    second = _dict(task_dao.create_task('b'))
+    moved = _dict(task_dao.move_task(second['id'], before_id=first['id']))
+    assert moved['version'] == 2
+    moved = _dict(task_dao.move_task(second['id'], status='Done'))
+    assert moved['version'] == 3
+
+    labelled = _dict(task_dao.update_task(first['id'], labels=['x']))
+    assert (labelled['labels'], labelled['version']) == (['x'], 2)
+    with pytest.raises(VersionConflictError):
+        task_dao.update_task(first['id'], expected_version=1, labels=['y'])
+    assert _dict(task_dao.get_task(first['id']))['labels'] == ['x']
+
+
+def test_move_with_expected_version(task_dao):
+    first = _dict(task_dao.create_task('a'))
+    second = _dict(task_dao.create_task('b'))
+    moved = _dict(task_dao.move_task(second['id'], before_id=first['id'], expected_version=1))
+    assert moved['version'] == 2
+
+    with pytest.raises(VersionConflictError) as conflict:
+        task_dao.move_task(second['id'], status='Done', expected_version=1)
+    assert (conflict.value.current['status'], conflict.value.current['version']) == ('To Do', 2)
+    assert [_dict(task)['id'] for task in task_dao.get_all_tasks()] == [second['id'], first['id']]
+    assert task_dao.move_task(99, status='Done', expected_version=1) is None
+
+
+def test_if_match_returns_412_with_the_current_task(client):
+    response = client.post('/tasks', json={'title': 'a'})
+    assert response.headers['ETag'] == '"1"'
+    task_id = response.get_json()['id']
+
+    response = client.put(f'/tasks/{task_id}', json={'title': 'b'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+
+    response = client.put(f'/tasks/{task_id}', json={'title': 'c'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 412
+    assert response.headers['ETag'] == '"2"'
+    assert response.get_json()['current']['title'] == 'b'
+    assert client.get(f'/tasks/{task_id}').get_json()['title'] == 'b'
+
+    # Anything but a single task version never matches
+    assert client.put(f'/tasks/{task_id}', json={'title': 'c'}, headers={'If-Match': '"abc"'}).status_code == 412
+    assert client.put(f'/tasks/{task_id}', json={'title': 'c'}, headers={'If-Match': '"2", "3"'}).status_code == 400
+    assert client.put(f'/tasks/{task_id}', json={'title': 'c'}, headers={'If-Match': '*'}).status_code == 200
+
+
+def test_etag_gives_304_until_the_task_changes(client):
+    task_id = client.post('/tasks', json={'title': 'a'}).get_json()['id']
+    response = client.get(f'/tasks/{task_id}')
+    etag = response.headers['ETag']
+
+    response = client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+    client.post(f'/tasks/{task_id}/move', json={'status': 'Done'})
+    response = client.get(f'/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+
+    client.put(f'/tasks/{task_id}', json={'labels': ['x']})
+    assert client.get(f'/tasks/{task_id}', headers={'If-None-Match': '"2"'}).status_code == 200
+    assert client.get(f'/tasks/{task_id}').headers['ETag'] == '"3"'
+
+
+def test_if_match_on_move(client):
+    task_id = client.post('/tasks', json={'title': 'a'}).get_json()['id']
+    response = client.post(f'/tasks/{task_id}/move', json={'status': 'Done'}, headers={'If-Match': '"1"'})
+    assert (response.status_code, response.headers['ETag']) == (200, '"2"')
+
+    response = client.post(f'/tasks/{task_id}/move', json={'status': 'To Do'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 412
+    assert response.headers['ETag'] == '"2"'
+    assert response.get_json()['current']['status'] == 'Done'
+    assert client.get(f'/tasks/{task_id}').get_json()['status'] == 'Done'
+    assert client.post(f'/tasks/{task_id}/move', json={}, headers={'If-Match': '"1", "2"'}).status_code == 400